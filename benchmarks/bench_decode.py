@@ -0,0 +1,34 @@
+import argparse
+import os
+import sys
+import time
+import warnings
+
+# Add package to path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from catalogue.bibtex import decode
+from generate import generate_library
+
+
+def main(args):
+    warnings.simplefilter("ignore")
+    print("{:>10} {:>12} {:>16}".format("entries", "time (s)", "time/entry (us)"))
+    for size in args.sizes:
+        library = generate_library(size)
+        start = time.perf_counter()
+        decode(library)
+        elapsed = time.perf_counter() - start
+        print("{:>10} {:>12.3f} {:>16.1f}".format(size, elapsed, 1e6 * elapsed / size))
+
+
+if __name__ == "__main__":
+    desc = "Time `decode` on synthetic libraries of increasing size."
+    parser = argparse.ArgumentParser(prog="bench_decode.py", description=desc)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000],
+        help="library sizes",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,97 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add package to path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from catalogue.dedup import find_duplicates
+from generate import generate_library
+
+
+def generate(size, fraction, seed=0):
+    """Generate a library with duplicates.
+
+    The titles of the synthetic library are drawn from a small vocabulary, so
+    they are replaced by titles drawn from a larger one. A fraction of the
+    entries is then duplicated: the copy appears in another year with a
+    different ID and, for half of the copies, without the last word of the
+    title.
+
+    Args:
+        size (int): Number of entries, including the duplicates.
+        fraction (float): Fraction of the entries which are duplicates.
+        seed (int, optional): Seed for the random number generator.
+
+    Returns:
+        tuple[list[dict], set[tuple[int, int]]]: Entries and the pairs of
+            indices of the duplicates.
+    """
+    rng = random.Random(seed)
+    num_duplicates = int(fraction * size)
+    entries = generate_library(size - num_duplicates, seed=seed)
+    vocabulary = ["word{}".format(i) for i in range(20000)]
+    for entry in entries:
+        entry["title"] = " ".join(rng.sample(vocabulary, rng.randint(5, 12)))
+    pairs = set()
+    for i in rng.sample(range(len(entries)), num_duplicates):
+        copy = dict(entries[i], id="copy{}".format(len(entries)))
+        copy["year"] = entries[i].get("year", 2000) + 1
+        if rng.random() < 0.5:
+            copy["title"] = copy["title"].rsplit(" ", 1)[0]
+        pairs.add((i, len(entries)))
+        entries.append(copy)
+    return entries, pairs
+
+
+def pairs_found(groups):
+    found = set()
+    for indices, _ in groups:
+        for k, i in enumerate(indices):
+            for j in indices[k + 1 :]:
+                found.add((i, j))
+    return found
+
+
+def main(args):
+    print(
+        "{:>10} {:>12} {:>16} {:>10}".format(
+            "entries", "time (s)", "time/entry (us)", "recall"
+        )
+    )
+    for size in args.sizes:
+        entries, pairs = generate(size, args.fraction)
+        start = time.perf_counter()
+        groups = find_duplicates(entries)
+        elapsed = time.perf_counter() - start
+        print(
+            "{:>10} {:>12.3f} {:>16.1f} {:>10.3f}".format(
+                size,
+                elapsed,
+                1e6 * elapsed / size,
+                len(pairs & pairs_found(groups)) / max(len(pairs), 1),
+            )
+        )
+
+
+if __name__ == "__main__":
+    desc = (
+        "Time finding duplicates in synthetic libraries of increasing size and "
+        "measure which fraction of the duplicates is found."
+    )
+    parser = argparse.ArgumentParser(prog="bench_dedup.py", description=desc)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000],
+        help="library sizes",
+    )
+    parser.add_argument(
+        "--fraction",
+        type=float,
+        default=0.05,
+        help="fraction of the entries which are duplicates",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+import time
+import warnings
+
+# Add package to path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from catalogue.bibtex import decode, encode, encoder_cache_clear, encoder_cache_info
+from config import config
+from generate import generate_library
+
+
+def _time(f, *args):
+    start = time.perf_counter()
+    f(*args)
+    return time.perf_counter() - start
+
+
+def main(args):
+    warnings.simplefilter("ignore")
+    print(
+        "{:>10} {:>10} {:>12} {:>12} {:>12} {:>10}".format(
+            "entries", "cache", "encode (s)", "decode (s)", "again (s)", "hit rate"
+        )
+    )
+    for size in args.sizes:
+        library = generate_library(size)
+        for cache_size in [0, args.cache_size]:
+            config["encoder_cache_size"] = cache_size
+            encoder_cache_clear()
+            time_encode = _time(encode, library)
+            time_decode = _time(decode, library)
+            time_again = _time(decode, library)
+            info = encoder_cache_info()
+            hit_rate = info.hits / max(info.hits + info.misses, 1) if info else 0
+            print(
+                "{:>10} {:>10} {:>12.3f} {:>12.3f} {:>12.3f} {:>9.0f}%".format(
+                    size,
+                    cache_size,
+                    time_encode,
+                    time_decode,
+                    time_again,
+                    100 * hit_rate,
+                )
+            )
+
+
+if __name__ == "__main__":
+    desc = "Time `encode` and `decode` with and without the encoder cache."
+    parser = argparse.ArgumentParser(prog="bench_encoder_cache.py", description=desc)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000], help="library sizes"
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=100000, help="size of the cache"
+    )
+    main(parser.parse_args())
@@ -0,0 +1,70 @@
+import argparse
+import os
+import shutil
+import sys
+import time
+import warnings
+
+# Add package to path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import catalogue.bin
+from catalogue.bibtex import generate_file_name
+from catalogue.fuzzy import FuzzyMatcher, fuzzy_search
+from config import config
+from generate import generate_library
+
+
+def main(args):
+    warnings.simplefilter("ignore")
+
+    # Generate realistic file paths.
+    paths = []
+    for i, entry in enumerate(generate_library(args.size)):
+        if "title" in entry and "author" in entry:
+            paths.append(
+                "/Resources/{}/{}.pdf".format(i % 97, generate_file_name(entry))
+            )
+    has_fzf = shutil.which(config["binaries"]["fzf"]) is not None
+    matcher = FuzzyMatcher(paths)
+
+    print("{} paths".format(len(paths)))
+    print(
+        "{:>20} {:>12} {:>12} {:>12}".format(
+            "query", "fzf (ms)", "python (ms)", "warm (ms)"
+        )
+    )
+    for query in args.queries:
+        if has_fzf:
+            start = time.perf_counter()
+            list(catalogue.bin.fzf("\n".join(paths), query))
+            elapsed_fzf = "{:.1f}".format(1e3 * (time.perf_counter() - start))
+        else:
+            elapsed_fzf = "n/a"
+
+        start = time.perf_counter()
+        fuzzy_search(paths, query, limit=args.limit)
+        elapsed_python = 1e3 * (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        matcher.search(query, limit=args.limit)
+        elapsed_warm = 1e3 * (time.perf_counter() - start)
+
+        print(
+            "{:>20} {:>12} {:>12.1f} {:>12.1f}".format(
+                query, elapsed_fzf, elapsed_python, elapsed_warm
+            )
+        )
+
+
+if __name__ == "__main__":
+    desc = "Compare the built-in fuzzy matcher with `fzf`."
+    parser = argparse.ArgumentParser(prog="bench_fuzzy.py", description=desc)
+    parser.add_argument("--size", type=int, default=20000, help="number of paths")
+    parser.add_argument("--limit", type=int, default=50, help="number of results")
+    parser.add_argument(
+        "--queries",
+        nargs="+",
+        default=["gauss", "bruinsma 2020", "'kalman !1999", "deep gp pdf$"],
+        help="queries",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,51 @@
+import argparse
+import os
+import subprocess
+import sys
+
+_script = """
+import time
+
+start = time.perf_counter()
+import {modules}
+print(time.perf_counter() - start)
+"""
+
+
+def main(args):
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    script = _script.format(modules=", ".join(args.modules))
+
+    # Take the best of a number of runs in fresh interpreters.
+    times = []
+    for _ in range(args.runs):
+        out = subprocess.check_output([sys.executable, "-c", script], cwd=root)
+        times.append(float(out.decode()))
+    best = min(times)
+
+    print("import {}: {:.1f} ms".format(", ".join(args.modules), 1e3 * best))
+    if best > args.max:
+        print("Regression: import takes longer than {:.1f} ms.".format(1e3 * args.max))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    desc = "Time importing the package and fail if it is too slow."
+    parser = argparse.ArgumentParser(prog="bench_import.py", description=desc)
+    parser.add_argument(
+        "--modules",
+        nargs="+",
+        default=[
+            "catalogue",
+            "catalogue.alfred",
+            "catalogue.client",
+            "catalogue.fuzzy",
+            "catalogue.utils",
+        ],
+        help="modules to import",
+    )
+    parser.add_argument("--runs", type=int, default=10, help="number of runs")
+    parser.add_argument(
+        "--max", type=float, default=0.1, help="maximum time in seconds"
+    )
+    main(parser.parse_args())
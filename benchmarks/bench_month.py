@@ -0,0 +1,73 @@
+import argparse
+import os
+import sys
+import time
+
+# Add package to path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from catalogue.bibtex import MonthEncoder
+
+# Month spellings as they occur in BiBTeX from publishers, Google Scholar, and
+# by hand.
+_corpus = [
+    "jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov",
+    "dec", "January", "February", "March", "April", "May", "June", "July",
+    "August", "September", "October", "November", "December", "Jan", "Feb",
+    "Mar", "Apr", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec", "JAN",
+    "Jan.", "Feb.", "Aug.", "Sept.", "Oct.", "Nov.", "Dec.", "sept", "1", "2",
+    "3", "4", "5", "6", "7", "8", "9", "10", "11", "12", "01", "02", "06",
+    "09", 1, 4, 12, "1 January", "December 2019", "Summer", "jan--feb",
+]  # fmt: skip
+
+
+def _match_reference(obj):
+    # Implementation of `MonthEncoder._match` before the lookup tables.
+    for spec in MonthEncoder.specs():
+        hits = [str(month).lower() == str(obj).lower() for month in spec]
+        if sum(hits) == 1:
+            return hits.index(True)
+        hits = [str(month).lower() in str(obj).lower() for month in spec]
+        if sum(hits) == 1:
+            return hits.index(True)
+    raise RuntimeError('Could not match month "{}".'.format(obj))
+
+
+def _time(match, corpus):
+    results = []
+    start = time.perf_counter()
+    for obj in corpus:
+        try:
+            results.append(match(obj))
+        except RuntimeError:
+            results.append(None)
+    return time.perf_counter() - start, results
+
+
+def main(args):
+    corpus = _corpus * args.repeat
+    time_reference, reference = _time(_match_reference, corpus)
+    time_tables, tables = _time(MonthEncoder()._match, corpus)
+    if reference != tables:
+        raise AssertionError("Results differ from the reference implementation.")
+    print(
+        "{:>10} {:>16} {:>16} {:>10}".format(
+            "months", "reference (us)", "tables (us)", "speedup"
+        )
+    )
+    print(
+        "{:>10} {:>16.2f} {:>16.2f} {:>9.1f}x".format(
+            len(corpus),
+            1e6 * time_reference / len(corpus),
+            1e6 * time_tables / len(corpus),
+            time_reference / time_tables,
+        )
+    )
+
+
+if __name__ == "__main__":
+    desc = "Time `MonthEncoder._match` against the implementation without tables."
+    parser = argparse.ArgumentParser(prog="bench_month.py", description=desc)
+    parser.add_argument(
+        "--repeat", type=int, default=1000, help="number of passes over the corpus"
+    )
+    main(parser.parse_args())
@@ -0,0 +1,96 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+# Add package to path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from catalogue.reader import read_bibtex
+from generate import generate_bibtex
+
+
+def _measure(f):
+    # Return the time in seconds and the peak memory in MB. Tracing memory is
+    # slow, so time a separate run.
+    start = time.perf_counter()
+    f()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    f()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def _read_stream(path):
+    for _ in read_bibtex(path):
+        pass
+
+
+def _read_bibtexparser(path):
+    import bibtexparser as bp
+
+    parser = bp.bparser.BibTexParser(common_strings=True, homogenize_fields=True)
+    with open(path) as f:
+        bp.load(f, parser)
+
+
+def main(args):
+    warnings.simplefilter("ignore")
+    try:
+        import bibtexparser  # noqa: F401
+
+        compare = True
+    except ImportError:
+        compare = False
+
+    print(
+        "{:>10} {:>10} {:>14} {:>14} {:>18} {:>18}".format(
+            "entries",
+            "file (MB)",
+            "stream (s)",
+            "stream (MB)",
+            "bibtexparser (s)",
+            "bibtexparser (MB)",
+        )
+    )
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "library.bib")
+            with open(path, "w") as f:
+                f.write(generate_bibtex(size))
+            stream = _measure(lambda: _read_stream(path))
+            if compare and size <= args.max_compare_size:
+                reference = _measure(lambda: _read_bibtexparser(path))
+            else:
+                reference = (float("nan"), float("nan"))
+            print(
+                "{:>10} {:>10.1f} {:>14.3f} {:>14.1f} {:>18.3f} {:>18.1f}".format(
+                    size, os.path.getsize(path) / 1e6, *stream, *reference
+                )
+            )
+
+
+if __name__ == "__main__":
+    desc = (
+        "Time reading BiBTeX files entry by entry and measure the peak memory, "
+        "compared with `bibtexparser` if it is installed."
+    )
+    parser = argparse.ArgumentParser(prog="bench_reader.py", description=desc)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000],
+        help="library sizes",
+    )
+    parser.add_argument(
+        "--max-compare-size",
+        type=int,
+        default=1000,
+        help="largest library to read with `bibtexparser`",
+    )
+    main(parser.parse_args())
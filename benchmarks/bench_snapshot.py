@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add package to path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from catalogue.snapshot import Snapshot, sync_snapshot
+from generate import generate_library
+
+
+def _time(f):
+    start = time.perf_counter()
+    f()
+    return time.perf_counter() - start
+
+
+def main(args):
+    print(
+        "{:>10} {:>12} {:>14} {:>14} {:>14}".format(
+            "entries", "JSON (s)", "snapshot (s)", "open (ms)", "lookup (us)"
+        )
+    )
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            # Write every entry to a separate JSON file.
+            paths = []
+            for i, entry in enumerate(generate_library(size)):
+                paths.append(os.path.join(directory, "{}.json".format(i)))
+                with open(paths[-1], "w") as f:
+                    json.dump([entry], f, sort_keys=True, indent=4)
+            path_snapshot = os.path.join(directory, "library.snapshot")
+            sync_snapshot(path_snapshot, paths)
+
+            def load_json():
+                for path in paths:
+                    with open(path) as f:
+                        json.load(f)
+
+            def load_snapshot():
+                with Snapshot(path_snapshot) as snapshot:
+                    for _ in snapshot.entries():
+                        pass
+
+            def open_snapshot():
+                Snapshot(path_snapshot).close()
+
+            with Snapshot(path_snapshot) as snapshot:
+                lookup = _time(lambda: [snapshot.entry(i) for i in range(0, size, 10)])
+
+            print(
+                "{:>10} {:>12.3f} {:>14.3f} {:>14.1f} {:>14.1f}".format(
+                    size,
+                    _time(load_json),
+                    _time(load_snapshot),
+                    1e3 * _time(open_snapshot),
+                    1e6 * lookup / len(range(0, size, 10)),
+                )
+            )
+
+
+if __name__ == "__main__":
+    desc = (
+        "Time loading a synthetic library from separate JSON files and from a "
+        "snapshot."
+    )
+    parser = argparse.ArgumentParser(prog="bench_snapshot.py", description=desc)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000],
+        help="library sizes",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+import time
+
+# Add package to path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from catalogue.bibtex import StringEncoder
+
+_chunk = 'Sch{\\"o}lkopf and Garc\\\'ia~studied the {\\AA}ngstr{\\"o}m limit. '
+
+
+def main(args):
+    encoder = StringEncoder()
+    print("{:>10} {:>14} {:>14}".format("size (KB)", "encode (ms)", "decode (ms)"))
+    for size in args.sizes:
+        # Construct a field value of approximately the right size.
+        value = _chunk * max(1, (1000 * size) // len(_chunk))
+
+        start = time.perf_counter()
+        encoded = encoder.encode(value)
+        elapsed_encode = time.perf_counter() - start
+
+        start = time.perf_counter()
+        encoder.decode(encoded, None)
+        elapsed_decode = time.perf_counter() - start
+
+        print(
+            "{:>10} {:>14.1f} {:>14.1f}".format(
+                size, 1e3 * elapsed_encode, 1e3 * elapsed_decode
+            )
+        )
+
+
+if __name__ == "__main__":
+    desc = "Time `StringEncoder` on field values from 10 KB to 1 MB."
+    parser = argparse.ArgumentParser(prog="bench_string_encoder.py", description=desc)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000],
+        help="sizes of the field values in KB",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,103 @@
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+# Add package to path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from catalogue.bibtex import TitleEncoder
+from config import config
+from generate import generate_raw
+
+
+def _decode_reference(obj, protected):
+    # Implementation of `TitleEncoder.decode` before the trie and the
+    # single-pass tokeniser.
+    def process(word):
+        if len(word) > 2 and word[0] == "$" and word[-1] == "$":
+            return "{" + word + "}"
+        if word == word.upper() and word == word.lower():
+            return word
+        is_protected = any([word.startswith(x) for x in protected])
+        if (
+            word == word.upper()
+            or (len(word) > 1 and word[-1] == "s" and word[:-1] == word[:-1].upper())
+            or is_protected
+        ):
+            return "{" + word + "}"
+        else:
+            return word
+
+    def split_map_join(f, xs, splitters):
+        if len(splitters) == 0:
+            return map(f, xs)
+        else:
+            s, splitters = splitters[0], splitters[1:]
+            return [s.join(split_map_join(f, x.split(s), splitters)) for x in xs]
+
+    return split_map_join(process, [obj], [" ", "/", "-", ":", "."])[0]
+
+
+def _terms(num, seed=0):
+    rng = random.Random(seed)
+    return [
+        rng.choice(string.ascii_uppercase)
+        + "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+        for _ in range(num)
+    ]
+
+
+def main(args):
+    titles = [entry["title"] for entry in generate_raw(args.titles)]
+    encoder = TitleEncoder()
+    print(
+        "{:>10} {:>16} {:>16} {:>10}".format(
+            "terms", "reference (us)", "trie (us)", "speedup"
+        )
+    )
+    for num in args.terms:
+        terms = _terms(num)
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as f:
+            f.write("\n".join(terms))
+            f.flush()
+            config["protected_terms"] = f.name
+            encoder.decode("", None)  # Construct the trie.
+
+            protected = TitleEncoder._protected + terms
+            start = time.perf_counter()
+            reference = [_decode_reference(title, protected) for title in titles]
+            time_reference = time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = [encoder.decode(title, None) for title in titles]
+            time_trie = time.perf_counter() - start
+
+        if reference != results:
+            raise AssertionError("Results differ from the reference implementation.")
+        print(
+            "{:>10} {:>16.2f} {:>16.2f} {:>9.1f}x".format(
+                len(protected),
+                1e6 * time_reference / len(titles),
+                1e6 * time_trie / len(titles),
+                time_reference / time_trie,
+            )
+        )
+
+
+if __name__ == "__main__":
+    desc = "Time `TitleEncoder.decode` against the implementation without a trie."
+    parser = argparse.ArgumentParser(prog="bench_title.py", description=desc)
+    parser.add_argument(
+        "--titles", type=int, default=10000, help="number of titles to decode"
+    )
+    parser.add_argument(
+        "--terms",
+        type=int,
+        nargs="+",
+        default=[0, 100, 1000],
+        help="numbers of protected terms to add to the built-in ones",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,189 @@
+import random
+
+__all__ = ["generate_raw", "generate_bibtex", "generate_library"]
+
+_first_names = [
+    "Wessel",
+    "Jos\\'e",
+    "Fran{\\c{c}}ois",
+    'J{\\"u}rgen',
+    'Zo{\\"e}',
+    "Anna",
+    "H.-V.",
+    "M. L.",
+    "S{\\o}ren",
+    "Ren\\'{e}",
+    "Richard E.",
+    "Carl Edward",
+]
+_last_names = [
+    "Bruinsma",
+    "Garc{\\'i}a",
+    'M{\\"u}ller',
+    "van der Wilk",
+    "Turner",
+    "Rasmussen",
+    '{\\AA}str{\\"o}m',
+    "Hern\\'andez-Lobato",
+    "Dvo{\\v{r}}{\\'a}k",
+    "de Freitas",
+    "Ghahramani",
+    "Tebbutt",
+]
+_words = [
+    "Gaussian",
+    "processes",
+    "for",
+    "deep",
+    "learning",
+    "variational",
+    "inference",
+    "with",
+    "Kalman",
+    "filters",
+    "sparse",
+    "approximations",
+    "in",
+    "the",
+    "spectral",
+    "domain",
+    "of",
+    "Hilbert",
+    "spaces",
+    "PDE",
+    "scalable",
+    "Bayesian",
+    "non-parametric",
+    "models:",
+    "a",
+    "review",
+    "{GP}s",
+    "$n$",
+]
+_venues = [
+    "Advances in Neural Information Processing Systems",
+    "International Conference on Machine Learning",
+    "Journal of Machine Learning Research",
+    "Artificial Intelligence and Statistics",
+    "arXiv preprint arXiv",
+]
+_publishers = ["Cambridge University Press", "Springer", "MIT Press", "Wiley \\& Sons"]
+_months = ["jan", "February", "Mar", "apr", "5", "June", "jul", "Aug.", "9", "oct"]
+
+
+def _title(rng):
+    words = [rng.choice(_words) for _ in range(rng.randint(3, 10))]
+    return " ".join(words)
+
+
+def _authors(rng):
+    authors = []
+    for _ in range(rng.randint(1, 6)):
+        first, last = rng.choice(_first_names), rng.choice(_last_names)
+        if rng.random() < 0.5:
+            authors.append("{}, {}".format(last, first))
+        else:
+            authors.append("{} {}".format(first, last))
+    return " and ".join(authors)
+
+
+def generate_raw(num, seed=0):
+    """Generate a synthetic library of parsed BiBTeX entries.
+
+    Roughly one in twenty entries is a proceedings entry which is
+    cross-referenced by the entries following it.
+
+    Args:
+        num (int): Number of entries.
+        seed (int, optional): Seed for the random number generator.
+
+    Returns:
+        list[dict]: Parsed BiBTeX entries, as produced by `bibtexparser`.
+    """
+    rng = random.Random(seed)
+    entries, proceedings = [], None
+    for i in range(num):
+        year = str(rng.randint(1950, 2021))
+        if rng.random() < 0.05:
+            proceedings = "proc{}".format(i)
+            entries.append(
+                {
+                    "type": "proceedings",
+                    "id": proceedings,
+                    "title": "Proceedings of the " + rng.choice(_venues[:4]),
+                    "year": year,
+                    "publisher": rng.choice(_publishers),
+                }
+            )
+            continue
+
+        entry = {"id": "entry{}".format(i), "title": _title(rng), "year": year}
+        entry["author"] = _authors(rng)
+        if proceedings and rng.random() < 0.3:
+            entry["type"] = "inproceedings"
+            entry["crossref"] = proceedings
+            entry["booktitle"] = rng.choice(_venues)
+        elif rng.random() < 0.1:
+            entry["type"] = "book"
+            entry["publisher"] = rng.choice(_publishers)
+            entry["edition"] = str(rng.randint(1, 5))
+        else:
+            entry["type"] = "article"
+            entry["journal"] = rng.choice(_venues)
+            entry["volume"] = str(rng.randint(1, 50))
+            entry["number"] = str(rng.randint(1, 12))
+        if rng.random() < 0.8:
+            start = rng.randint(1, 2000)
+            entry["pages"] = "{}--{}".format(start, start + rng.randint(1, 40))
+        if rng.random() < 0.7:
+            entry["month"] = rng.choice(_months)
+        if rng.random() < 0.3:
+            entry["eprint"] = "{}.{:05d}".format(
+                rng.randint(1001, 2112), rng.randint(1, 20000)
+            )
+        if rng.random() < 0.3:
+            entry["doi"] = "https://doi.org/10.{}/{}".format(
+                rng.randint(1000, 9999), rng.randint(1, 10**6)
+            )
+        entries.append(entry)
+    return entries
+
+
+def generate_bibtex(num, seed=0):
+    """Generate a synthetic library as a BiBTeX string.
+
+    Args:
+        num (int): Number of entries.
+        seed (int, optional): Seed for the random number generator.
+
+    Returns:
+        str: BiBTeX.
+    """
+    out = []
+    for entry in generate_raw(num, seed=seed):
+        fields = "\n".join(
+            "    {} = {{{}}},".format(k, v)
+            for k, v in entry.items()
+            if k not in {"type", "id"}
+        )
+        out.append("@{}{{{},\n{}\n}}\n\n".format(entry["type"], entry["id"], fields))
+    return "".join(out)
+
+
+def generate_library(num, seed=0):
+    """Generate a synthetic library of encoded entries.
+
+    Args:
+        num (int): Number of entries.
+        seed (int, optional): Seed for the random number generator.
+
+    Returns:
+        list[dict]: Encoded entries.
+    """
+    from catalogue.bibtex import encode
+
+    raw = generate_raw(num, seed=seed)
+    encoded = encode(raw)
+    for entry, raw_entry in zip(encoded, raw):
+        entry["id"] = raw_entry["id"]
+    return encoded
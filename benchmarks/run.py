@@ -0,0 +1,236 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+# Add package to path.
+root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, root)
+from catalogue.bibtex import decode, encode, encoder_cache_clear, encoders
+from config import config
+from generate import generate_bibtex, generate_library, generate_raw
+
+
+def _best(f, repeat):
+    """Time a function.
+
+    Args:
+        f (function): Function to time.
+        repeat (int): Number of runs.
+
+    Returns:
+        float: Best time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _encode_values(encoder, values):
+    for value in values:
+        try:
+            encoder.encode(value)
+        except RuntimeError:
+            continue
+
+
+def _decode_values(encoder, values):
+    for value, entry in values:
+        encoder.decode(value, entry)
+
+
+def bench_bibtex(size, repeat):
+    """Time `encode`, `decode`, and every encoder separately.
+
+    Args:
+        size (int): Number of entries.
+        repeat (int): Number of runs.
+
+    Returns:
+        dict[str, float]: Best time in seconds for every benchmark.
+    """
+    raw = generate_raw(size)
+    bibtex = generate_bibtex(size)
+    library = generate_library(size)
+    results = {
+        "encode(str)": _best(lambda: encode(bibtex), repeat),
+        "encode(list)": _best(lambda: encode(raw), repeat),
+        "decode": _best(lambda: decode(library), repeat),
+    }
+    for field, encoder in sorted(encoders.items()):
+        raw_values = [entry[field] for entry in raw if field in entry]
+        values = [(entry[field], entry) for entry in library if field in entry]
+        if not raw_values:
+            # The synthetic library does not have this field.
+            continue
+        results["encoders[{}].encode".format(field)] = _best(
+            lambda: _encode_values(encoder, raw_values), repeat
+        )
+        results["encoders[{}].decode".format(field)] = _best(
+            lambda: _decode_values(encoder, values), repeat
+        )
+    return results
+
+
+def bench_update_bibliography(size, repeat):
+    """Time `update_bibliography.main` on a library of JSON files, both a full
+    rebuild and an update in which no file has changed.
+
+    Args:
+        size (int): Number of entries.
+        repeat (int): Number of runs.
+
+    Returns:
+        dict[str, float]: Best time in seconds for every benchmark.
+    """
+    import update_bibliography
+
+    directory = tempfile.mkdtemp()
+    original = dict(config)
+    try:
+        resources = os.path.join(directory, "resources")
+        os.mkdir(resources)
+        for i, entry in enumerate(generate_library(size)):
+            with open(os.path.join(resources, "{}.json".format(i)), "w") as f:
+                json.dump([entry], f, sort_keys=True, indent=4)
+        config["resource_path"] = resources
+        config["catalogue_path"] = directory
+        config["cache_path"] = os.path.join(directory, "cache")
+        os.mkdir(config["cache_path"])
+
+        def run(full):
+            args = argparse.Namespace(
+                full=full, snapshot=False, workers=1, profile=None
+            )
+            return lambda: update_bibliography.main(args)
+
+        return {
+            "update_bibliography(full)": _best(run(True), repeat),
+            "update_bibliography(unchanged)": _best(run(False), repeat),
+        }
+    finally:
+        config.clear()
+        config.update(original)
+        shutil.rmtree(directory)
+
+
+def _commit():
+    try:
+        out = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=root, stderr=subprocess.DEVNULL
+        )
+        return out.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold, min_time):
+    """Print the results next to a baseline.
+
+    Args:
+        results (dict): Results.
+        baseline (dict): Results to compare with.
+        threshold (float): Ratio of times above which a benchmark regressed.
+        min_time (float): Benchmarks which take less time than this in the
+            baseline are too noisy to regress.
+
+    Returns:
+        list[str]: Names of the benchmarks which regressed.
+    """
+    print(
+        "{:<40} {:>12} {:>12} {:>8}".format("benchmark", "baseline", "current", "ratio")
+    )
+    regressions = []
+    for name, seconds in results["results"].items():
+        if name not in baseline["results"]:
+            continue
+        ratio = seconds / max(baseline["results"][name], 1e-9)
+        flag = ""
+        if ratio > threshold and baseline["results"][name] >= min_time:
+            regressions.append(name)
+            flag = "  regression"
+        print(
+            "{:<40} {:>12.4f} {:>12.4f} {:>7.2f}x{}".format(
+                name, baseline["results"][name], seconds, ratio, flag
+            )
+        )
+    return regressions
+
+
+def main(args):
+    warnings.simplefilter("ignore")
+    # Time the encoders themselves, not the cache.
+    config["encoder_cache_size"] = 0
+    encoder_cache_clear()
+
+    results = {}
+    for size in args.sizes:
+        timings = bench_bibtex(size, args.repeat)
+        if size <= args.max_update_size:
+            timings.update(bench_update_bibliography(size, args.repeat))
+        for name, seconds in timings.items():
+            results["{} [{}]".format(name, size)] = seconds
+            if not args.compare:
+                print("{:<40} {:>12.4f}".format("{} [{}]".format(name, size), seconds))
+    results = {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold, args.min_time):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    desc = (
+        "Time the encode and decode hot paths on synthetic libraries, store the "
+        "results as JSON, and compare them with earlier results."
+    )
+    parser = argparse.ArgumentParser(prog="run.py", description=desc)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000],
+        help="library sizes; add 100000 for a full run",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs")
+    parser.add_argument(
+        "--max-update-size",
+        type=int,
+        default=10000,
+        help="largest library on which to time update_bibliography.py",
+    )
+    parser.add_argument("--output", help="file to store the results in as JSON")
+    parser.add_argument("--compare", help="results to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="ratio of times above which a benchmark counts as a regression",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.005,
+        help="time in seconds below which benchmarks are too noisy to regress",
+    )
+    main(parser.parse_args())
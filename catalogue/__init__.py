@@ -2,7 +2,89 @@
 
 from __future__ import absolute_import, division, print_function
 
-from .alfred import *
-from .bibtex import *
-from .bin import *
-from .utils import *
+import importlib
+import sys
+
+# Names exported by the package and the submodules which define them. The
+# submodules are only imported when one of their names is first accessed, so
+# that scripts which only need a few submodules start up quickly.
+_exports = {
+    "alfred": ["list_json"],
+    "arxiv": ["arxiv_id", "ResponseCache", "fetch_arxiv_batch"],
+    "bibtex": [
+        "generate_file_name",
+        "is_arxiv",
+        "fetch_arxiv",
+        "compact_entry",
+        "expand_entry",
+        "encode_entry",
+        "encode",
+        "encode_iter",
+        "decode_entry",
+        "decode_iter",
+        "decode_to",
+        "decode",
+        "encoder_cache_info",
+        "encoder_cache_clear",
+        "protected_terms_key",
+    ],
+    "bin": ["find", "mdfind", "fzf", "pbcopy", "pbpaste", "subl", "trash"],
+    "cache": ["DecodeCache"],
+    "dedup": ["normalised_key", "find_duplicates", "preferred", "merge_entries"],
+    "fuzzy": ["FuzzyMatcher", "fuzzy_search"],
+    "index": ["FileIndex"],
+    "journal": ["Journal"],
+    "reader": ["read_bibtex"],
+    "search": ["tokenise", "ContentIndex"],
+    "snapshot": ["Snapshot", "write_snapshot", "sync_snapshot"],
+    "text": ["extract_text", "TextStore", "default_store"],
+    "utils": [
+        "ext_change",
+        "write_tmp",
+        "write_atomic",
+        "sync_directory",
+        "file_filter",
+        "list_files",
+        "search_content",
+    ],
+}
+_locations = {name: module for module, names in _exports.items() for name in names}
+_submodules = set(_exports) | {"client", "parallel", "profiling", "server"}
+
+__all__ = list(_locations)
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # Module-level `__getattr__` is not supported, so import everything.
+    from .alfred import *
+    from .arxiv import *
+    from .bibtex import *
+    from .bin import *
+    from .cache import *
+    from .dedup import *
+    from .fuzzy import *
+    from .index import *
+    from .journal import *
+    from .reader import *
+    from .search import *
+    from .snapshot import *
+    from .text import *
+    from .utils import *
+else:
+
+    def __getattr__(name):
+        if name in _locations:
+            value = getattr(
+                importlib.import_module("." + _locations[name], __name__), name
+            )
+            # Cache the value, so `__getattr__` is not called again.
+            globals()[name] = value
+            return value
+        elif name in _submodules:
+            return importlib.import_module("." + name, __name__)
+        else:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(__name__, name)
+            )
+
+    def __dir__():
+        return sorted(set(globals()) | set(_locations))
@@ -0,0 +1,208 @@
+import json
+import os
+import re
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import catalogue.utils
+from config import config
+
+__all__ = ["arxiv_id", "ResponseCache", "fetch_arxiv_batch"]
+
+_version_pattern = re.compile(r"v[0-9]+$")
+
+
+def arxiv_id(info):
+    """Get the identifier of an arXiv paper as used by the arXiv API.
+
+    Args:
+        info (tuple[str, str]): arXiv info from :func:`.bibtex.is_arxiv`.
+
+    Returns:
+        str: Identifier.
+    """
+    cat, num = info
+    return cat + "/" + num if cat else num
+
+
+class ResponseCache(object):
+    """Cache of the responses of the arXiv API, stored on disk.
+
+    For every identifier, the cache stores the entry returned by the API,
+    which is `None` if the API did not return an entry, together with the
+    time at which the entry was fetched. Entries expire after a fixed time.
+
+    Args:
+        path (str): Directory to store the responses in.
+        ttl (float): Seconds after which an entry expires.
+    """
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+
+    def _path(self, identifier):
+        return os.path.join(self.path, identifier.replace("/", "_") + ".json")
+
+    def get(self, identifier):
+        """Get a cached entry.
+
+        Args:
+            identifier (str): Identifier.
+
+        Returns:
+            tuple[bool, dict]: Whether the entry is cached and has not expired,
+                and the entry.
+        """
+        try:
+            with open(self._path(identifier)) as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return False, None
+        if time.time() - content["time"] > self.ttl:
+            return False, None
+        return True, content["entry"]
+
+    def set(self, identifier, entry):
+        """Cache an entry.
+
+        Args:
+            identifier (str): Identifier.
+            entry (dict or None): Entry.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        catalogue.utils.write_atomic(
+            self._path(identifier), json.dumps({"time": time.time(), "entry": entry})
+        )
+
+
+class _RateLimiter(object):
+    def __init__(self, interval):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next = 0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.next > now:
+                time.sleep(self.next - now)
+            self.next = max(now, self.next) + self.interval
+
+
+# Rate limiters for every URL, shared by all calls in a process.
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _limiter(url, delay):
+    with _limiters_lock:
+        if url not in _limiters:
+            _limiters[url] = _RateLimiter(delay)
+        _limiters[url].interval = delay
+        return _limiters[url]
+
+
+def _convert(entry):
+    # Construct raw content of entry.
+    year, month = map(int, entry["published"].split("-")[:2])
+    return {
+        "type": "article",
+        "title": entry["title"],
+        "author": " and ".join([x["name"] for x in entry["authors"]]),
+        "year": year,
+        "month": month,
+        "eprint": _version_pattern.sub("", entry["id"].split("/abs/")[-1]),
+        "journal": "arXiv E-Prints",
+    }
+
+
+def _fetch(url, identifiers, limiter):
+    # Import lazily: importing `feedparser` and `urllib.request` is slow.
+    import feedparser
+    import urllib.parse
+    import urllib.request
+
+    query = urllib.parse.urlencode(
+        {"id_list": ",".join(identifiers), "max_results": len(identifiers)}
+    )
+    limiter.wait()
+    with urllib.request.urlopen(url + "?" + query, timeout=60) as response:
+        feed = feedparser.parse(response.read())
+
+    entries = {}
+    for entry in feed["entries"]:
+        # If the query is invalid, the API returns a single error entry.
+        if "/abs/" not in entry.get("id", ""):
+            raise ValueError(entry.get("summary", "invalid query"))
+        entry = _convert(entry)
+        entries[entry["eprint"]] = entry
+    return entries
+
+
+def fetch_arxiv_batch(
+    identifiers,
+    batch_size=None,
+    workers=None,
+    delay=None,
+    cache=None,
+    url=None,
+):
+    """Fetch the raw BiBTeX for many arXiv papers. Papers are looked up in
+    batches, by `id_list` queries. Entries in the cache are not fetched again.
+
+    Args:
+        identifiers (list[str]): Identifiers; see :func:`.arxiv.arxiv_id`.
+        batch_size (int, optional): Number of identifiers per query. Defaults
+            to `arxiv_batch_size`.
+        workers (int, optional): Number of queries to run simultaneously.
+            Defaults to `arxiv_workers`.
+        delay (float, optional): Seconds between the starts of queries, also
+            across calls. Defaults to `arxiv_delay`.
+        cache (:class:`.arxiv.ResponseCache`, optional): Cache. Defaults to a
+            cache in `cache_path` with expiry `arxiv_ttl`.
+        url (str, optional): URL of the API. Defaults to `arxiv_url`.
+
+    Returns:
+        dict[str, dict]: For every identifier, the raw BiBTeX or `None` if
+            the paper could not be found. Identifiers which could not be
+            looked up because a query failed are left out.
+    """
+    batch_size = batch_size or config["arxiv_batch_size"]
+    workers = workers or config["arxiv_workers"]
+    delay = config["arxiv_delay"] if delay is None else delay
+    url = url or config["arxiv_url"]
+    if cache is None:
+        cache = ResponseCache(
+            os.path.join(config["cache_path"], "arxiv"), config["arxiv_ttl"]
+        )
+
+    results = {}
+    missing = []
+    for identifier in dict.fromkeys(identifiers):
+        cached, entry = cache.get(identifier)
+        if cached:
+            results[identifier] = entry
+        else:
+            missing.append(identifier)
+
+    batches = [missing[i : i + batch_size] for i in range(0, len(missing), batch_size)]
+    limiter = _limiter(url, delay)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_fetch, url, batch, limiter) for batch in batches]
+        for batch, future in zip(batches, futures):
+            try:
+                entries = future.result()
+            except (OSError, ValueError) as e:
+                warnings.warn(
+                    f"Could not query arXiv for {len(batch)} paper(s): {e}.",
+                    stacklevel=2,
+                )
+                continue
+            for identifier in batch:
+                entry = entries.get(identifier)
+                cache.set(identifier, entry)
+                results[identifier] = entry
+    return results
@@ -1,22 +1,48 @@
 import abc
+import collections
 import datetime
+import functools
+import io
+import os
 import re
+import threading
 import unicodedata
 import warnings
 from string import ascii_uppercase as uppercase, ascii_lowercase as lowercase, digits
-from subprocess import Popen, PIPE
 
-import bibtexparser as bp
-import feedparser
 from plum import Dispatcher
-from titlecase import titlecase
 
+from . import profiling
+from .arxiv import arxiv_id, fetch_arxiv_batch
+from .parallel import parallel_map
+from .reader import read_bibtex
+from .text import default_store
 from config import config
 
-__all__ = ["generate_file_name", "is_arxiv", "fetch_arxiv", "encode", "decode"]
+__all__ = [
+    "generate_file_name",
+    "is_arxiv",
+    "fetch_arxiv",
+    "compact_entry",
+    "expand_entry",
+    "encode_entry",
+    "encode",
+    "encode_iter",
+    "decode_entry",
+    "decode_iter",
+    "decode_to",
+    "decode",
+    "encoder_cache_info",
+    "encoder_cache_clear",
+    "protected_terms_key",
+]
 
 _dispatch = Dispatcher()
 
+_arxiv_pattern = re.compile(
+    r"arXiv:([a-zA-Z\-]*)\/?([0-9\.]+)v([0-9]+) " r"\[?([0-9a-zA-Z. _\-]+)\]?"
+)
+
 
 def get_last_name(name):
     """Get the last name.
@@ -104,6 +130,10 @@ def unicode_to_ascii(x):
 def is_arxiv(fp):
     """Check whether a PDF is from arXiv.
 
+    The identifier is taken from the first line of the first page which
+    mentions arXiv. The text of the PDF is read from the text store, so it is
+    only extracted once.
+
     Args:
         fp (str): File path.
 
@@ -112,14 +142,9 @@ def is_arxiv(fp):
             the PDF if from arXiv and `None` otherwise.
 
     """
-    # Attempt to extract the arXiv number via `pdfgrep`.
-    process = Popen(
-        [config["binaries"]["pdfgrep"], "-m", "1", "-h", "arXiv", fp], stdout=PIPE
-    )
-    out = process.communicate()[0].decode().strip()
-    res = re.match(
-        r"arXiv:([a-zA-Z\-]*)\/?([0-9\.]+)v([0-9]+) " r"\[?([0-9a-zA-Z. _\-]+)\]?", out
-    )
+    lines = default_store().first_page(fp).splitlines()
+    line = next((line for line in lines if "arXiv" in line), "")
+    res = _arxiv_pattern.match(line.strip())
     if res:
         cat, num, _, _ = res.groups()
         return cat, num
@@ -151,6 +176,9 @@ def str_for_file(xs):
 def fetch_arxiv(fp, info=None):
     """Fetch the BiBTeX for an arXiv PDF.
 
+    To fetch the BiBTeX for many PDFs, use :func:`.arxiv.fetch_arxiv_batch`,
+    which shares the cache of responses with this function.
+
     Args:
         fp: Path.
         info (optional): arXiv info from :method:`.bibtex.is_arxiv`.
@@ -161,30 +189,10 @@ def fetch_arxiv(fp, info=None):
     info = info if info else is_arxiv(fp)
 
     if info:
-        cat, num = info
-        feed = feedparser.parse(
-            f"https://export.arxiv.org/api/query?search_query=all:{num}"
-        )
-
-        # Check that results is not ambiguous.
-        num_results = len(feed["entries"])
-        if num_results != 1:
-            raise RuntimeError(
-                f"Query not unambiguous: found {num_results} results."
-            )
-
-        # Construct raw content of entry.
-        entry = feed["entries"][0]
-        year, month = map(int, entry["published"].split("-")[:2])
-        entry = {
-            "type": "article",
-            "title": entry["title"],
-            "author": " and ".join([x["name"] for x in entry["authors"]]),
-            "year": year,
-            "month": month,
-            "eprint": num,
-            "journal": "arXiv E-Prints",
-        }
+        identifier = arxiv_id(info)
+        entry = fetch_arxiv_batch([identifier]).get(identifier)
+        if entry is None:
+            raise RuntimeError(f'Could not fetch arXiv paper "{identifier}".')
         return [entry]
     else:
         return None
@@ -193,6 +201,11 @@ def fetch_arxiv(fp, info=None):
 class Encoder(object):
     __metaclass__ = abc.ABCMeta
 
+    # Fields of the entry which `decode` depends on besides the object.
+    depends_on = ()
+    # Whether results are cached. Cheap encoders are not cached.
+    memoize = True
+
     @abc.abstractmethod
     def encode(self, obj):
         pass
@@ -206,6 +219,8 @@ class Encoder(object):
 
 
 class IdentityEncoder(Encoder):
+    memoize = False
+
     def encode(self, obj):
         return obj
 
@@ -216,43 +231,57 @@ class IdentityEncoder(Encoder):
 class ComposedEncoder(Encoder):
     def __init__(self, *encoders):
         self.encoders = encoders
+        self.depends_on = tuple(
+            sorted({field for encoder in encoders for field in encoder.depends_on})
+        )
+        self.memoize = any(encoder.memoize for encoder in encoders)
 
     def encode(self, obj):
+        prof = profiling.active()
         for encoder in reversed(self.encoders):
-            obj = encoder.encode(obj)
+            if prof is None:
+                obj = encoder.encode(obj)
+            else:
+                obj = _profiled(prof, encoder, "encode", obj)
         return obj
 
     def decode(self, obj, entry):
+        prof = profiling.active()
         for encoder in self.encoders:
-            obj = encoder.decode(obj, entry)
+            if prof is None:
+                obj = encoder.decode(obj, entry)
+            else:
+                obj = _profiled(prof, encoder, "decode", obj, entry)
             if obj is None:
                 return None
         return obj
 
 
-class Peekable(object):
-    def __init__(self, obj):
-        self.obj = obj
-
-    def __next__(self):
-        if len(self.obj) == 0:
-            raise StopIteration
-        else:
-            current = self.obj[0]
-            self.obj = self.obj[1:]
-        return current
+def _profiled(prof, encoder, method, *args):
+    """Call `encode` or `decode` of an encoder and time the call, unless the
+    encoder is composed of other encoders.
 
-    def next(self):
-        return self.__next__()
+    Args:
+        prof (:class:`.profiling.Profile`): Profile to record the time in.
+        encoder (:class:`.bibtex.Encoder`): Encoder.
+        method (str): `encode` or `decode`.
+        *args: Arguments.
 
-    def __iter__(self):
-        return self
+    Returns:
+        object: Result of the call.
+    """
+    f = getattr(encoder, method)
+    if isinstance(encoder, ComposedEncoder):
+        return f(*args)
+    name = "{} {}".format(method, type(encoder).__name__)
+    return prof.time("encoder", name, lambda: f(*args))
 
-    def peek(self, num=1, start=0):
-        return self.obj[start : start + num]
 
-    def skip(self, num=1):
-        self.obj = self.obj[num:]
+def _skip(method, field):
+    # Record that a field is dropped if a profile is active.
+    prof = profiling.active()
+    if prof is not None:
+        prof.skip("field", "{} {}".format(method, field))
 
 
 class StringEncoder(Encoder):
@@ -279,64 +308,88 @@ class StringEncoder(Encoder):
     }
     commands = {v: k for k, v in tex_commands.items()}
 
+    # Patterns for `encode`, compiled once. The passes and the patterns are
+    # those of the original implementation, so the output is the same.
+    _space_pattern = re.compile(r"([^\\])~")
+    _command_patterns = [
+        (
+            re.compile(r"\\" + command + r"([^a-zA-Z])"),
+            re.compile(r"\\" + command + r"$"),
+            "\\" + command,
+            result,
+        )
+        for command, result in tex_commands.items()
+    ]
+    # A modifier must be followed by its letter within ten characters.
+    _modifier_pattern = re.compile(r"(.) *\{?([a-zA-Z])\}?")
+    _modifier_window = 10
+    _non_ascii_pattern = re.compile(r"[^\x00-\x7f]")
+
     def encode(self, obj):
         # Convert hard-coded LaTeX spaces to normal ones. BiBTeX should be able
         # to handle spaces correctly.
-        obj = re.sub(r"([^\\])~", r"\1 ", obj)
-        obj = re.sub(r"^~", " ", obj)
-
-        # Replace LaTeX commands.
-        for command, result in StringEncoder.tex_commands.items():
-            obj = re.sub(r"\\" + command + r"([^a-zA-Z])", result + r"\1", obj)
-            obj = re.sub(r"\\" + command + r"$", result, obj)
-
-        # Convert LaTeX-coded special character to their unicode variants.
-        it = Peekable(obj)
-        out = ""
-        for x in it:
-            if x == "\\":
-                res = re.match(r"^(.) *\{?([a-zA-Z])\}?", it.peek(10))
-                if res:
-                    # Get the letters and modifier.
-                    modifier = res.groups()[0]
-                    letter = res.groups()[1]
-
-                    if modifier not in StringEncoder.tex_mod_map:
-                        raise RuntimeError(
-                            "StringEncoder: cannot map "
-                            'modifier "{}".'.format(modifier)
-                        )
-
-                    # Skip.
-                    it.skip(res.span()[1])
-
-                    out += letter + StringEncoder.tex_mod_map[modifier]
+        if "~" in obj:
+            obj = StringEncoder._space_pattern.sub(r"\1 ", obj)
+            if obj.startswith("~"):
+                obj = " " + obj[1:]
+
+        if "\\" in obj:
+            # Replace LaTeX commands.
+            for pattern, pattern_end, prefix, result in StringEncoder._command_patterns:
+                if prefix in obj:
+                    obj = pattern.sub(result + r"\1", obj)
+                    obj = pattern_end.sub(result, obj)
+
+            # Convert LaTeX-coded special characters to their unicode variants,
+            # scanning from backslash to backslash.
+            out = []
+            start = 0
+            i = obj.find("\\")
+            while i >= 0:
+                res = StringEncoder._modifier_pattern.match(
+                    obj, i + 1, i + 1 + StringEncoder._modifier_window
+                )
+                if not res:
+                    i = obj.find("\\", i + 1)
                     continue
-
-            out += x
+                modifier, letter = res.groups()
+                if modifier not in StringEncoder.tex_mod_map:
+                    raise RuntimeError(
+                        "StringEncoder: cannot map " 'modifier "{}".'.format(modifier)
+                    )
+                out.append(obj[start:i])
+                out.append(letter + StringEncoder.tex_mod_map[modifier])
+                start = res.end()
+                i = obj.find("\\", start)
+            out.append(obj[start:])
+            obj = "".join(out)
 
         # Finally, remove any LaTeX braces.
-        out = out.replace("{", "").replace("}", "")
-        return out
+        return obj.replace("{", "").replace("}", "")
 
     def decode(self, obj, entry):
-        it = Peekable(unicodedata.normalize("NFD", obj))
-        out = ""
-        for x in it:
-            if ord(x) < 128:
-                out += x.encode("ascii").decode()
-            elif x in StringEncoder.mod_map:
-                letter = out[-1]
+        obj = unicodedata.normalize("NFD", obj)
+        out = []
+        start = 0
+        for match in StringEncoder._non_ascii_pattern.finditer(obj):
+            x = match.group()
+            if match.start() > start:
+                out.append(obj[start : match.start()])
+            start = match.end()
+            if x in StringEncoder.mod_map:
+                # The modifier applies to the last character of the output.
+                letter = out[-1][-1]
                 modifier = StringEncoder.mod_map[x]
-                out = out[:-1] + "{{\\{} {}}}".format(modifier, letter)
+                out[-1] = out[-1][:-1] + "{{\\{} {}}}".format(modifier, letter)
             elif x in StringEncoder.commands:
-                out += "{{\\{}}}".format(StringEncoder.commands[x])
+                out.append("{{\\{}}}".format(StringEncoder.commands[x]))
             else:
                 raise RuntimeError(
                     "StringEncoder: cannot translate unicode "
                     "ordinal {}.".format(ord(x))
                 )
-        return out
+        out.append(obj[start:])
+        return "".join(out)
 
 
 class AuthorEncoder(Encoder):
@@ -443,11 +496,54 @@ class TitleEncoder(Encoder):
             else:
                 return None
 
+        # Import lazily: importing `titlecase` is slow.
+        from titlecase import titlecase
+
         # TODO: Make titlecase not touch braces.
         return titlecase(xs, callback=callback)
 
+    # Cached trie of the protected words and the path of the file of protected
+    # words from which it was constructed. The trie is also cleared when the
+    # file changes; see :func:`.bibtex.encode_entry`.
+    _trie = None
+    _trie_path = None
+
+    # Pattern which matches the words of a title: the parts between spaces,
+    # slashes, dashes, colons, and dots.
+    _word_pattern = re.compile(r"[^ /\-:.]+")
+
+    @staticmethod
+    def protected():
+        """Get a trie of the protected words: the words in `_protected` and the
+        words in the file `protected_terms`. The trie is constructed when it is
+        first needed and reconstructed if `protected_terms` changes. Changes
+        to the file are detected once per entry or per run of
+        :func:`.bibtex.encode`, :func:`.bibtex.decode`, and the like, so
+        decoding a title does not access the file system.
+
+        Returns:
+            :class:`.bibtex.Trie`: Trie of protected words.
+        """
+        path = config["protected_terms"]
+        if TitleEncoder._trie is None or TitleEncoder._trie_path != path:
+            words = list(TitleEncoder._protected)
+            if path:
+                try:
+                    words.extend(load_protected_terms(path))
+                except OSError as e:
+                    warnings.warn(
+                        'Could not load protected terms from "{}": {}.'.format(path, e)
+                    )
+            TitleEncoder._trie = Trie(words)
+            TitleEncoder._trie_path = path
+        return TitleEncoder._trie
+
     def decode(self, obj, entry):
-        def process(word):
+        trie = TitleEncoder.protected()
+
+        def process(match):
+            word = match.group()
+
             # Test that it isn't math.
             if len(word) > 2 and word[0] == "$" and word[-1] == "$":
                 return "{" + word + "}"
@@ -459,30 +555,115 @@ class TitleEncoder(Encoder):
             # TODO: deal with false positives
 
             # Check whether it contains a protected word.
-            protected = any([word.startswith(x) for x in TitleEncoder._protected])
             if (
                 word == word.upper()
                 or (
                     len(word) > 1 and word[-1] == "s" and word[:-1] == word[:-1].upper()
                 )
-                or protected
+                or trie.is_prefix_of(word)
             ):
                 return "{" + word + "}"
             else:
                 return word
 
-        return _split_map_join(process, [obj], [" ", "/", "-", ":", "."])[0]
+        return TitleEncoder._word_pattern.sub(process, obj)
 
 
-def _split_map_join(f, xs, splitters):
-    if len(splitters) == 0:
-        return map(f, xs)
-    else:
-        s, splitters = splitters[0], splitters[1:]
-        return [s.join(_split_map_join(f, x.split(s), splitters)) for x in xs]
+class Trie(object):
+    """Trie of words, which finds whether a word starts with any of the words
+    in time linear in the length of the word.
+
+    Args:
+        words (iterable[str]): Words.
+    """
+
+    # Key which marks the end of a word. Every other key is a single character.
+    _end = ""
+
+    def __init__(self, words):
+        self.root = {}
+        for word in words:
+            node = self.root
+            for char in word:
+                node = node.setdefault(char, {})
+            node[Trie._end] = True
+
+    def is_prefix_of(self, word):
+        """Check whether a word starts with any of the words in the trie.
+
+        Args:
+            word (str): Word.
+
+        Returns:
+            bool: `True` if `word` starts with a word in the trie.
+        """
+        node = self.root
+        if Trie._end in node:
+            return True
+        for char in word:
+            node = node.get(char)
+            if node is None:
+                return False
+            if Trie._end in node:
+                return True
+        return False
+
+
+def protected_terms_key():
+    """Get the version of the file of protected words `protected_terms`, so
+    caches of decoded titles can detect that the file changed.
+
+    Returns:
+        list or None: Path, modification time in nanoseconds, and size of the
+            file, or `None` if `protected_terms` is not set. If the file does
+            not exist, the modification time and size are `None`.
+    """
+    path = config["protected_terms"]
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return [path, None, None]
+    return [path, stat.st_mtime_ns, stat.st_size]
+
+
+# Version of the file of protected words which the trie of protected words and
+# the cache of encoded and decoded fields were built with.
+_protected_version = None
+# Marks that the version of the file of protected words must be read.
+_unknown = object()
+
+
+def _use_protected_terms(key):
+    # Clear the trie and the cache if the file of protected words changed.
+    global _protected_version
+    if key is _unknown:
+        key = protected_terms_key()
+    if key != _protected_version:
+        _protected_version = key
+        TitleEncoder._trie = None
+        encoder_cache_clear()
+
+
+def load_protected_terms(path):
+    """Load protected words from a file: one word per line. Empty lines and
+    lines starting with `#` are ignored.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        list[str]: Protected words.
+    """
+    with open(path) as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
 
 
 class IntEncoder(Encoder):
+    memoize = False
+
     def encode(self, obj):
         # TODO: Handle long forms.
         return int(obj)
@@ -517,30 +698,76 @@ class PagesEncoder(Encoder):
 
 
 class MonthEncoder(Encoder):
-    specs = [
-        range(1, 13),
-        [datetime.date(2008, i, 1).strftime("%B") for i in range(1, 13)],
-        [datetime.date(2008, i, 1).strftime("%b") for i in range(1, 13)],
-        [datetime.date(2008, i, 1).strftime("%b").lower() for i in range(1, 13)],
-    ]
+    _specs = None
+    _exact = None
+    _contained = None
+
+    @staticmethod
+    def specs():
+        """Get the formats of months. The formats are constructed when they are
+        first needed.
+
+        Returns:
+            list[list]: Formats of months.
+        """
+        if MonthEncoder._specs is None:
+            MonthEncoder._specs = [
+                range(1, 13),
+                [datetime.date(2008, i, 1).strftime("%B") for i in range(1, 13)],
+                [datetime.date(2008, i, 1).strftime("%b") for i in range(1, 13)],
+                [
+                    datetime.date(2008, i, 1).strftime("%b").lower()
+                    for i in range(1, 13)
+                ],
+            ]
+        return MonthEncoder._specs
+
+    @staticmethod
+    def _tables():
+        """Construct the lookup tables from the formats of months.
+
+        Returns:
+            tuple[dict, list]: Dictionary which maps every lowercase format of
+                a month to the index of the month, and, for every format, the
+                lowercase format of every month.
+        """
+        if MonthEncoder._exact is None:
+            contained = []
+            for spec in MonthEncoder.specs():
+                spec = [str(month).lower() for month in spec]
+                # Formats which only differ in case give the same hits.
+                if spec not in contained:
+                    contained.append(spec)
+            exact = {}
+            for spec in contained:
+                for i, month in enumerate(spec):
+                    exact.setdefault(month, i)
+            MonthEncoder._exact, MonthEncoder._contained = exact, contained
+        return MonthEncoder._exact, MonthEncoder._contained
 
     def encode(self, obj):
-        return MonthEncoder.specs[0][self._match(obj)]
+        return MonthEncoder.specs()[0][self._match(obj)]
 
     def decode(self, obj, entry):
-        return MonthEncoder.specs[2][self._match(obj)]
+        return MonthEncoder.specs()[2][self._match(obj)]
 
     def _match(self, obj):
-        for spec in MonthEncoder.specs:
-            # Test for exact hits.
-            hits = [str(month).lower() == str(obj).lower() for month in spec]
-            if sum(hits) == 1:
-                return hits.index(True)
-
-            # Test for contained hits.
-            hits = [str(month).lower() in str(obj).lower() for month in spec]
-            if sum(hits) == 1:
-                return hits.index(True)
+        exact, contained = MonthEncoder._tables()
+        key = str(obj).lower()
+
+        # Test for exact hits. An exact hit for one format cannot be a
+        # contained hit for an earlier format, so the formats need not be
+        # tested in order.
+        try:
+            return exact[key]
+        except KeyError:
+            pass
+
+        # Test for contained hits.
+        for spec in contained:
+            hits = [i for i, month in enumerate(spec) if month in key]
+            if len(hits) == 1:
+                return hits[0]
         raise RuntimeError('Could not match month "{}".'.format(obj))
 
 
@@ -557,6 +784,8 @@ class ArXivEPrintEncoder(Encoder):
 
 
 class ArXivFilter(Encoder):
+    depends_on = ("eprint",)
+
     def encode(self, obj):
         return obj
 
@@ -616,122 +845,500 @@ encoders = {
 }
 
 
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "maxsize", "currsize"]
+)
+
+
+class _LRUCache(object):
+    """Cache of bounded size which evicts the least recently used item.
+
+    Args:
+        maxsize (int): Maximum number of items.
+    """
+
+    missing = object()
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._items[key]
+            except KeyError:
+                self.misses += 1
+                return _LRUCache.missing
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._items))
+
+
+_cache = None
+
+
+def _encoder_cache():
+    # The size is read from the config on every call, so the cache also works
+    # in worker processes. Decoded titles depend on the protected words, so
+    # the cache is cleared if the file of protected words changes; see
+    # :func:`_use_protected_terms`.
+    global _cache
+    maxsize = config["encoder_cache_size"]
+    if maxsize <= 0:
+        return None
+    if _cache is None or _cache.maxsize != maxsize:
+        _cache = _LRUCache(maxsize)
+    return _cache
+
+
+def encoder_cache_info():
+    """Get the statistics of the cache of encoded and decoded fields in this
+    process. The cache is enabled by setting `encoder_cache_size`.
+
+    Returns:
+        :class:`.bibtex.CacheInfo`: Hits, misses, maximum size, and current
+            size. If the cache is not enabled, `None` is returned.
+    """
+    cache = _encoder_cache()
+    return cache.info() if cache else None
+
+
+def encoder_cache_clear():
+    """Clear the cache of encoded and decoded fields in this process."""
+    global _cache
+    _cache = None
+
+
+def _freeze(obj):
+    # Convert lists to tuples, so they can be used in keys.
+    return tuple(obj) if isinstance(obj, list) else obj
+
+
+def _cached(encoder, key, compute):
+    cache = _encoder_cache() if encoder.memoize else None
+    if cache is None:
+        return compute()
+    try:
+        res = cache.get(key)
+    except TypeError:
+        # The key cannot be hashed.
+        return compute()
+    if res is _LRUCache.missing:
+        res = compute()
+        cache.set(key, res)
+    # Copy lists, so callers cannot modify the cached result.
+    return list(res) if isinstance(res, list) else res
+
+
+def _encode_field(field, obj):
+    """Encode a field, using the cache if it is enabled.
+
+    Args:
+        field (str): Field.
+        obj (object): Raw value.
+
+    Returns:
+        object: Encoded value.
+    """
+    encoder = encoders[field]
+    key = ("encode", field, _freeze(obj))
+    prof = profiling.active()
+    if prof is None:
+        return _cached(encoder, key, lambda: encoder.encode(obj))
+    return prof.time(
+        "field",
+        "encode " + field,
+        lambda: _cached(encoder, key, lambda: _profiled(prof, encoder, "encode", obj)),
+    )
+
+
+def _decode_field(field, obj, entry):
+    """Decode a field, using the cache if it is enabled.
+
+    Args:
+        field (str): Field.
+        obj (object): Encoded value.
+        entry (dict): Encoded entry.
+
+    Returns:
+        object: Decoded value.
+    """
+    encoder = encoders[field]
+    key = (
+        "decode",
+        field,
+        _freeze(obj),
+        tuple(_freeze(entry.get(k)) for k in encoder.depends_on),
+    )
+    prof = profiling.active()
+    if prof is None:
+        return _cached(encoder, key, lambda: encoder.decode(obj, entry))
+    return prof.time(
+        "field",
+        "decode " + field,
+        lambda: _cached(
+            encoder, key, lambda: _profiled(prof, encoder, "decode", obj, entry)
+        ),
+    )
+
+
+def _reproduce(obj):
+    """Reproduce a raw field from its encoding, if the encoding is simple: a
+    string, which is reproduced as is; an integer, which is reproduced as a
+    string; or pages, which are reproduced as a range.
+
+    Args:
+        obj (object): Encoded field.
+
+    Returns:
+        object: Raw field or `None` if it cannot be reproduced.
+    """
+    if isinstance(obj, str):
+        return obj
+    elif isinstance(obj, int) and not isinstance(obj, bool):
+        return str(obj)
+    elif (
+        isinstance(obj, list)
+        and 1 <= len(obj) <= 2
+        and all(isinstance(x, int) for x in obj)
+    ):
+        return "--".join(str(x) for x in obj)
+    else:
+        return None
+
+
+def _reproducible(entry):
+    # Fields of an encoded entry which can stand in for raw fields.
+    return [k for k in entry if k in encoders or k in {"type", "id"}]
+
+
+def compact_entry(entry):
+    """Replace the raw dictionary of an encoded entry by the raw fields which
+    cannot be reproduced from the encoded fields, stored under `raw_diff`. See
+    :func:`.bibtex.expand_entry`.
+
+    Args:
+        entry (dict): Encoded entry.
+
+    Returns:
+        dict: Compacted entry. If the entry has no raw dictionary, the entry is
+            returned unchanged.
+    """
+    if "raw" not in entry:
+        return entry
+    raw = entry["raw"]
+    compacted = {k: v for k, v in entry.items() if k != "raw"}
+    reproducible = _reproducible(compacted)
+    diff = {}
+    for k, v in raw.items():
+        if k not in reproducible or _reproduce(compacted[k]) != v:
+            diff[k] = v
+    for k in reproducible:
+        if k not in raw:
+            # Record that the field is not in the raw dictionary.
+            diff[k] = None
+    compacted["raw_diff"] = diff
+    return compacted
+
+
+def expand_entry(entry):
+    """Reconstruct the raw dictionary of an entry compacted by
+    :func:`.bibtex.compact_entry`.
+
+    Raw fields which are reproduced from encoded fields follow the encoded
+    fields, so editing an encoded string, integer, or pages field edits the
+    raw field too.
+
+    Args:
+        entry (dict): Compacted entry.
+
+    Returns:
+        dict: Raw dictionary, with the keys sorted.
+    """
+    diff = entry["raw_diff"]
+    raw = {k: _reproduce(entry[k]) for k in _reproducible(entry) if k not in diff}
+    raw.update({k: v for k, v in diff.items() if v is not None})
+    return {k: raw[k] for k in sorted(raw)}
+
+
+def encode_entry(entry, generate_ids=False, compact=False, protected=_unknown):
+    """Encode a single parsed BiBTeX entry.
+
+    Args:
+        entry (dict): Parsed BiBTeX entry or encoded entry with a raw dictionary
+            representation available, possibly compacted.
+        generate_ids (bool, optional): Overwrite the ID.
+        compact (bool, optional): Only store the raw fields which cannot be
+            reproduced from the encoded fields. Defaults to `False`.
+        protected (list, optional): Version of the file of protected words
+            from :func:`.bibtex.protected_terms_key`. Pass it to avoid reading
+            it for every entry. Defaults to reading it.
+
+    Returns:
+        dict: Encoded entry.
+    """
+    _use_protected_terms(protected)
+
+    # Extract raw where possible.
+    if "raw" in entry:
+        parsed_entry = entry["raw"]
+    elif "raw_diff" in entry:
+        parsed_entry = expand_entry(entry)
+    else:
+        parsed_entry = entry
+
+    # Encode the entry, skipping fields where the encoding fails.
+    encoded_entry = {}
+    for k, v in parsed_entry.items():
+        if k in encoders:
+            try:
+                encoded_entry[k] = _encode_field(k, v)
+            except RuntimeError:
+                # Could not encode field. Skip it.
+                _skip("encode", k)
+                continue
+
+    # Process special fields.
+    encoded_entry["type"] = parsed_entry["type"].lower()
+    encoded_entry["raw"] = parsed_entry
+
+    # Generate an ID for the entry if required.
+    if generate_ids:
+        encoded_entry["id"] = generate_id(encoded_entry)
+
+    return compact_entry(encoded_entry) if compact else encoded_entry
+
+
 @_dispatch
-def encode(xs: list, generate_ids=False):
+def encode(xs: list, generate_ids=False, workers=1, compact=False):
     """Encode a string containing BiBTeX entries, a list of dictionaries which
     represent the parsed BiBTeX, or a list of encoded entries with a raw
-    dictionary representation available.
+    dictionary representation available, possibly compacted.
 
     TODO: Handle bug in BP: ensure comma after final field.
 
     Args:
         xs (str or list): BiBTeX entries.
         generate_ids (bool, optional): Overwrite the IDs.
+        workers (int, optional): Number of processes to encode with. Defaults
+            to `1`.
+        compact (bool, optional): Only store the raw fields which cannot be
+            reproduced from the encoded fields. See
+            :func:`.bibtex.compact_entry`. Defaults to `False`.
 
     Returns:
         BiBTeX entries represented as a dictionaries.
     """
-    # Extract raw where possible.
-    parsed_entries = [x["raw"] if "raw" in x else x for x in xs]
-
-    # Encode the entries, skipping those where the decoding fails.
-    encoded_entries = []
-    for entry in parsed_entries:
-        encoded_entry = {}
-        for k, v in entry.items():
-            if k in encoders:
-                try:
-                    encoded_entry[k] = encoders[k].encode(v)
-                except RuntimeError:
-                    # Could not encode entry. Skip it.
-                    continue
-        encoded_entries.append(encoded_entry)
+    return list(
+        parallel_map(
+            functools.partial(
+                encode_entry,
+                generate_ids=generate_ids,
+                compact=compact,
+                protected=protected_terms_key(),
+            ),
+            xs,
+            workers=workers,
+        )
+    )
 
-    # Process special fields.
-    for encoded_entry, parsed_entry in zip(encoded_entries, parsed_entries):
-        encoded_entry["type"] = parsed_entry["type"].lower()
-        encoded_entry["raw"] = parsed_entry
 
-        # Generate an ID for the entry if required.
-        if generate_ids:
-            encoded_entry["id"] = generate_id(encoded_entry)
+@_dispatch
+def encode(xs: str, generate_ids=False, workers=1, compact=False):
+    return list(
+        encode_iter(
+            io.StringIO(xs),
+            generate_ids=generate_ids,
+            workers=workers,
+            compact=compact,
+        )
+    )
 
-    return encoded_entries
 
+def _sectioned(xs, name):
+    # Time getting every element under a section of the active profile.
+    xs = iter(xs)
+    while True:
+        with profiling.section(name):
+            try:
+                x = next(xs)
+            except StopIteration:
+                return
+        yield x
 
-@_dispatch
-def encode(xs: str, generate_ids=False):
-    parser = bp.bparser.BibTexParser(common_strings=True, homogenize_fields=True)
-    entries = bp.loads(xs, parser).entries
-
-    # Standardise keys in parsed entries.
-    entries = [
-        {k.encode("ascii").decode().lower(): v for k, v in entry.items()}
-        for entry in entries
-    ]
 
-    # Fix up entries.
-    for entry in entries:
-        # Rename `entrytype` to `type`.
-        entry["type"] = entry["entrytype"]
-        del entry["entrytype"]
+def encode_iter(source, generate_ids=False, workers=1, compact=False):
+    """Encode a BiBTeX file entry by entry. The file is read while the entries
+    are encoded, so large files can be encoded without reading them into
+    memory. See :func:`.reader.read_bibtex`.
 
-    return encode(entries, generate_ids=generate_ids)
+    Args:
+        source (str or file): Path of the file or file object.
+        generate_ids (bool, optional): Overwrite the IDs.
+        workers (int, optional): Number of processes to encode with. Defaults
+            to `1`.
+        compact (bool, optional): Only store the raw fields which cannot be
+            reproduced from the encoded fields. See
+            :func:`.bibtex.compact_entry`. Defaults to `False`.
 
+    Returns:
+        generator[dict]: Encoded entries.
+    """
+    return parallel_map(
+        functools.partial(
+            encode_entry,
+            generate_ids=generate_ids,
+            compact=compact,
+            protected=protected_terms_key(),
+        ),
+        _sectioned(read_bibtex(source), "parse BiBTeX"),
+        workers=workers,
+    )
 
-def decode(obj):
-    """Decode an encoded BiBTeX string.
+
+def decode_entry(entry, protected=_unknown):
+    """Decode a single encoded BiBTeX entry.
 
     Args:
-        obj (object): Encoding.
+        entry (dict): Encoded entry.
+        protected (list, optional): Version of the file of protected words
+            from :func:`.bibtex.protected_terms_key`. Pass it to avoid reading
+            it for every entry. Defaults to reading it.
 
     Returns:
-        str: BiBTeX string.
+        str: BiBTeX string for the entry.
     """
-    # Move crossreferences to end.
-    obj = [entry for entry in obj if entry["type"].lower() != "proceedings"] + [
-        entry for entry in obj if entry["type"].lower() == "proceedings"
-    ]
+    _use_protected_terms(protected)
+    decoded_entry = {}
+    for k, v in entry.items():
+        if k in encoders:
+            res = _decode_field(k, v, entry)
+
+            # Only add the result if is it not `None`.
+            if res is not None:
+                decoded_entry[k] = res
+            else:
+                _skip("decode", k)
+
+    # Check whether `crossref` in included, but `type` isn't appropriate.
+    if "crossref" in decoded_entry and not entry["type"].lower().startswith("in"):
+        warnings.warn(
+            'For ID "{}" with title "{}", a cross-reference is '
+            'used, but the type is "{}".'
+            "".format(entry["id"], decoded_entry["title"], entry["type"])
+        )
+
+    # Convert to text.
+    content = "\n".join(
+        [
+            "    {key} = {{{value}}},".format(key=k, value=v)
+            for k, v in decoded_entry.items()
+        ]
+    )
+    return "@{type}{{{id},\n{content}\n}}\n\n".format(
+        type=entry["type"], id=entry["id"], content=content
+    )
 
-    # Decode the entries.
-    decoded_entries = []
-    for decoded_entry in obj:
-        entry = {}
-        for k, v in decoded_entry.items():
-            if k in encoders:
-                res = encoders[k].decode(v, decoded_entry)
 
-                # Only add the result if is it not `None`.
-                if res is not None:
-                    entry[k] = res
+def _unique(obj):
+    """Order encoded entries for output and drop entries with duplicate IDs.
 
-        # Check whether `crossref` in included, but `type` isn't appropriate.
-        if "crossref" in entry and not decoded_entry["type"].lower().startswith("in"):
+    Entries of type `proceedings` are held back until all other entries have
+    been processed, so they can be cross-referenced.
+
+    Args:
+        obj (iterable[dict]): Encoded entries.
+
+    Returns:
+        generator[dict]: Entries in the order in which they should be output.
+    """
+    processed_ids, proceedings = {}, []
+
+    def process(entry):
+        # Check whether an entry with the same ID has already been output.
+        entry_id = entry["id"].lower()
+        if entry_id in processed_ids:
             warnings.warn(
-                'For ID "{}" with title "{}", a cross-reference is '
-                'used, but the type is "{}".'
-                "".format(decoded_entry["id"], entry["title"], decoded_entry["type"])
+                'Duplicate ID "{}": entry with title "{}" collides with entry '
+                'with title "{}" and is dropped.'.format(
+                    entry["id"], entry.get("title", ""), processed_ids[entry_id]
+                )
             )
+            return False
+        else:
+            processed_ids[entry_id] = entry.get("title", "")
+            return True
 
-        decoded_entries.append(entry)
+    for entry in obj:
+        # Move crossreferences to end.
+        if entry["type"].lower() == "proceedings":
+            proceedings.append(entry)
+        elif process(entry):
+            yield entry
 
-    # Convert to text, minding duplicate entries.
-    out, processed_ids = "", []
-    for decoded_entry, entry in zip(decoded_entries, obj):
-        # Check whether the entry has already been converted to text.
-        if entry["id"].lower() in processed_ids:
-            continue
-        else:
-            processed_ids.append(entry["id"].lower())
+    for entry in proceedings:
+        if process(entry):
+            yield entry
 
-        # Convert to text.
-        content = "\n".join(
-            [
-                "    {key} = {{{value}}},".format(key=k, value=v)
-                for k, v in decoded_entry.items()
-            ]
-        )
-        out += "@{type}{{{id},\n{content}\n}}\n\n" "".format(
-            type=entry["type"], id=entry["id"], content=content
-        )
-    return out
+
+def decode_iter(obj, workers=1):
+    """Decode encoded BiBTeX entry by entry.
+
+    Entries of type `proceedings` are held back until all other entries have
+    been decoded, so they can be cross-referenced. Entries with an ID which has
+    already been decoded are dropped.
+
+    Args:
+        obj (iterable[dict]): Encoded entries.
+        workers (int, optional): Number of processes to decode with. Defaults
+            to `1`.
+
+    Returns:
+        generator[str]: BiBTeX string for every entry.
+    """
+    return parallel_map(
+        functools.partial(decode_entry, protected=protected_terms_key()),
+        _unique(obj),
+        workers=workers,
+    )
+
+
+def decode_to(f, obj, workers=1):
+    """Decode encoded BiBTeX and write it to a file entry by entry.
+
+    Args:
+        f (file): File to write to.
+        obj (iterable[dict]): Encoded entries.
+        workers (int, optional): Number of processes to decode with. Defaults
+            to `1`.
+    """
+    for out in decode_iter(obj, workers=workers):
+        f.write(out)
+
+
+def decode(obj, workers=1):
+    """Decode an encoded BiBTeX string.
+
+    Args:
+        obj (object): Encoding.
+        workers (int, optional): Number of processes to decode with. Defaults
+            to `1`.
+
+    Returns:
+        str: BiBTeX string.
+    """
+    return "".join(decode_iter(obj, workers=workers))
@@ -1,8 +1,8 @@
-import os
 import subprocess as sp
 
 from config import config
-from .utils import file_filter
+
+__all__ = ["find", "mdfind", "fzf", "pbcopy", "pbpaste", "subl", "trash"]
 
 
 def find(path, follow_symlinks=True):
@@ -27,23 +27,19 @@ def mdfind(path, query):
     """Search for content.
 
     Args:
-        path (str): Path to search on.
+        path (str or list[str]): Path or paths to search on. Symbolic links
+            on the paths are not followed.
         query (str): Query to search for.
 
     Returns:
         list[str]: List of files that match the search query.
     """
-    # Search in path.
-    args = [config["binaries"]["mdfind"], "-onlyin", path, query]
+    args = [config["binaries"]["mdfind"]]
+    for p in [path] if isinstance(path, str) else path:
+        args += ["-onlyin", p]
+    args += [query]
     out, _ = sp.Popen(args, stdout=sp.PIPE).communicate()
-    results = filter(None, out.decode().split("\n"))
-
-    # Search for symlinked folders.
-    files = file_filter(find(path, follow_symlinks=True), None)
-    sym_paths = map(os.path.realpath, filter(os.path.islink, files))
-
-    # Recurse and return.
-    return results + [r for p in sym_paths for r in mdfind(p, query)]
+    return list(filter(None, out.decode().split("\n")))
 
 
 def fzf(input, query=None):
@@ -69,11 +65,12 @@ def pbcopy(x):
     """Copy text to clipboard.
 
     Args:
-        x (str): Text to copy.
+        x (str or iterable[str]): Text to copy or chunks of text to copy.
     """
-    sp.Popen([config["binaries"]["pbcopy"]], stdout=sp.PIPE, stdin=sp.PIPE).communicate(
-        input=x.encode()
-    )
+    p = sp.Popen([config["binaries"]["pbcopy"]], stdout=sp.PIPE, stdin=sp.PIPE)
+    for chunk in [x] if isinstance(x, str) else x:
+        p.stdin.write(chunk.encode())
+    p.communicate()
 
 
 def pbpaste():
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+
+from .bibtex import decode_entry, protected_terms_key
+from .parallel import parallel_map
+from .profiling import section
+from .utils import write_atomic
+
+__all__ = ["DecodeCache"]
+
+
+class DecodeCache(object):
+    """Persistent cache of the decoded BiBTeX of JSON files.
+
+    For every JSON file, the cache stores the modification time, size, and
+    hash of the content of the file together with the decoded BiBTeX of every
+    entry in the file. A file is only decoded again if it has changed. The
+    decoded titles depend on the file of protected words, so the cache is
+    cleared if that file changes.
+
+    Args:
+        path (str): Path of the file to store the cache in.
+    """
+
+    # Bump the version whenever the encoders or decoders change their output.
+    version = 3
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.protected_terms = protected_terms_key()
+        if os.path.isfile(path):
+            with open(path) as f:
+                content = json.load(f)
+            if (
+                content.get("version") == DecodeCache.version
+                and content.get("protected_terms") == self.protected_terms
+            ):
+                self.files = content["files"]
+
+    def clear(self):
+        """Clear the cache."""
+        self.files = {}
+
+    def update(self, paths, workers=1, snapshot=None):
+        """Update the cache for a list of JSON files, decoding only files which
+        are not in the cache or which have changed. Files not in `paths` are
+        removed from the cache.
+
+        Args:
+            paths (list[str]): Paths of JSON files.
+            workers (int, optional): Number of processes to decode with.
+                Defaults to `1`.
+            snapshot (:class:`.snapshot.Snapshot`, optional): Read the JSON
+                files and their modification times and sizes from this
+                snapshot rather than from disk.
+        """
+        # If the modification time and size match, trust the cache.
+        stale = []
+        for path in paths:
+            if snapshot:
+                meta = snapshot.files[path]
+                mtime, size = meta["mtime"], meta["size"]
+            else:
+                stat = os.stat(path)
+                mtime, size = stat.st_mtime, stat.st_size
+            cached = self.files.get(path)
+            if cached and cached["mtime"] == mtime and cached["size"] == size:
+                continue
+            stale.append((path, mtime, size, cached["hash"] if cached else None))
+
+        # Otherwise, compare the hash of the content and decode if necessary.
+        results = parallel_map(
+            _decode_file,
+            [
+                (
+                    path,
+                    cached_hash,
+                    snapshot.content(path) if snapshot else None,
+                    self.protected_terms,
+                )
+                for path, _, _, cached_hash in stale
+            ],
+            workers,
+        )
+        for (path, mtime, size, _), (content_hash, blocks) in zip(stale, results):
+            if blocks is None:
+                blocks = self.files[path]["blocks"]
+            self.files[path] = {
+                "mtime": mtime,
+                "size": size,
+                "hash": content_hash,
+                "blocks": blocks,
+            }
+
+        # Remove files which no longer exist.
+        paths = set(paths)
+        self.files = {k: v for k, v in self.files.items() if k in paths}
+
+    def blocks(self, path):
+        """Get the decoded BiBTeX for all entries in a JSON file. The file must
+        be in the cache; see :meth:`.cache.DecodeCache.update`.
+
+        Args:
+            path (str): Path of JSON file.
+
+        Returns:
+            list[tuple[str, str, str]]: For every entry, a tuple containing
+                the type, the ID, and the decoded BiBTeX.
+        """
+        return [tuple(block) for block in self.files[path]["blocks"]]
+
+    def save(self):
+        """Write the cache to disk."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        content = {
+            "version": DecodeCache.version,
+            "protected_terms": self.protected_terms,
+            "files": self.files,
+        }
+        write_atomic(self.path, json.dumps(content))
+
+
+def _decode_file(args):
+    """Decode a JSON file if its content does not match a hash.
+
+    Args:
+        args (tuple[str, str, bytes, list]): Path of the JSON file, the hash
+            to compare with, which may be `None`, the content of the file,
+            which is read from disk if it is `None`, and the version of the
+            file of protected words.
+
+    Returns:
+        tuple[str, list]: Hash of the content of the file and, if the hash does
+            not match, for every entry, a tuple containing the type, the ID,
+            and the decoded BiBTeX. If the hash matches, the second element is
+            `None`.
+    """
+    path, cached_hash, content, protected = args
+    if content is None:
+        with section("read files"):
+            with open(path, "rb") as f:
+                content = f.read()
+    content_hash = hashlib.sha1(content).hexdigest()
+    if content_hash == cached_hash:
+        return content_hash, None
+    with section("parse JSON"):
+        entries = json.loads(content.decode())
+    blocks = [
+        (entry["type"], entry["id"], decode_entry(entry, protected=protected))
+        for entry in entries
+    ]
+    return content_hash, blocks
@@ -0,0 +1,41 @@
+import json
+import socket
+
+__all__ = ["query_server"]
+
+
+def query_server(path, request, timeout=2.0):
+    """Send a query to the query server.
+
+    This module deliberately imports nothing else from the package, so a
+    client starts up quickly.
+
+    Args:
+        path (str): Path of the socket of the server.
+        request (dict): Query; see :meth:`.server.QueryServer.handle`.
+        timeout (float, optional): Timeout in seconds. Defaults to `2`.
+
+    Returns:
+        str or None: Response of the server or `None` if the server is not
+            running or could not handle the query.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    except OSError:
+        # The server is not running, is stale, or is too slow. `socket.timeout`
+        # is an `OSError` too.
+        return None
+    finally:
+        sock.close()
+    response = b"".join(chunks).decode()
+    return response if response else None
@@ -0,0 +1,319 @@
+import json
+import random
+import re
+import zlib
+
+from .bibtex import (
+    compact_entry,
+    encoders,
+    expand_entry,
+    get_last_name,
+    unicode_to_ascii,
+)
+from .search import tokenise
+
+__all__ = ["normalised_key", "find_duplicates", "preferred", "merge_entries"]
+
+# MinHash signatures consist of `_bands` bands of `_rows` hashes. Two titles
+# with Jaccard similarity `s` share a band with probability
+# `1 - (1 - s ** _rows) ** _bands`, which is about 0.5 for `s = 0.3` and more
+# than 0.999 for `s = 0.8`.
+_bands = 8
+_rows = 2
+_prime = (1 << 61) - 1
+_rng = random.Random(0)
+_permutations = [
+    (_rng.randrange(1, _prime), _rng.randrange(0, _prime))
+    for _ in range(_bands * _rows)
+]
+
+_version_pattern = re.compile(r"v[0-9]+$")
+_arxiv_doi_prefix = "10.48550/arxiv."
+
+
+class _UnionFind(object):
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Compress the path.
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            self.parent[max(i, j)] = min(i, j)
+
+
+def _first_author(entry):
+    authors = entry.get("author")
+    if not authors:
+        return None
+    return unicode_to_ascii(get_last_name(authors[0])).lower()
+
+
+def normalised_key(entry):
+    """Generate a key which identifies the paper of an entry, like
+    :func:`.bibtex.generate_id`, but independent of the year, case, accents,
+    and punctuation. Versions of a paper published in different years
+    therefore have the same key.
+
+    Args:
+        entry (dict): Encoded entry.
+
+    Returns:
+        str: Key or `None` if the entry does not have an author or a title.
+    """
+    author = _first_author(entry)
+    title = tokenise(entry.get("title", ""))
+    if not author or not title:
+        return None
+    return "{}:{}".format(author, "_".join(title))
+
+
+def _eprint(entry):
+    # Get the arXiv identifier without version, also from an arXiv DOI.
+    if "eprint" in entry:
+        return _version_pattern.sub("", str(entry["eprint"]).lower())
+    doi = str(entry.get("doi", "")).lower()
+    if doi.startswith(_arxiv_doi_prefix):
+        return _version_pattern.sub("", doi[len(_arxiv_doi_prefix) :])
+    return None
+
+
+def _doi(entry):
+    doi = str(entry.get("doi", "")).lower().strip()
+    if not doi or doi.startswith(_arxiv_doi_prefix):
+        return None
+    return doi
+
+
+def _signature(words):
+    """Compute the MinHash signature of a set of words.
+
+    Args:
+        words (set[str]): Words.
+
+    Returns:
+        list[int]: Signature.
+    """
+    hashes = [zlib.crc32(word.encode()) for word in words]
+    return [min((a * h + b) % _prime for h in hashes) for a, b in _permutations]
+
+
+def _jaccard(x, y):
+    return len(x & y) / len(x | y)
+
+
+def _excluded(entries):
+    """Find the entries which must not be merged: entries which are the target
+    of a crossref and entries of which the library deliberately has identical
+    copies, which are copies with the same ID and the same content.
+
+    Args:
+        entries (list[dict]): Encoded entries.
+
+    Returns:
+        set[int]: Indices of the entries.
+    """
+    targets = {
+        str(entry["crossref"]).lower() for entry in entries if "crossref" in entry
+    }
+    copies = {}
+    for i, entry in enumerate(entries):
+        key = json.dumps(entry, sort_keys=True).lower()
+        copies.setdefault(key, []).append(i)
+    excluded = {i for members in copies.values() if len(members) > 1 for i in members}
+    for i, entry in enumerate(entries):
+        if str(entry.get("id", "")).lower() in targets:
+            excluded.add(i)
+    return excluded
+
+
+def find_duplicates(entries, threshold=0.8, max_bucket=100):
+    """Find entries which are likely the same paper without comparing all
+    pairs of entries.
+
+    Entries are indexed by their DOI, their arXiv identifier, and their
+    :func:`normalised_key`. Entries which share any of these are duplicates.
+    Moreover, entries are grouped into buckets by their ID, ignoring case, and
+    by MinHash of the words of their titles. Entries which share a bucket are
+    duplicates if the Jaccard similarity of the words of the titles is at
+    least `threshold` and the last names of the first authors agree. IDs are
+    not trusted on their own, because different papers can have the same
+    generated ID.
+
+    Duplicates are not transitive: every group consists of the entry chosen
+    by :func:`preferred` and the entries which are duplicates of that entry.
+    Entries which are the target of a crossref and identical copies of an
+    entry are never duplicates, because the library shares them deliberately.
+
+    Args:
+        entries (list[dict]): Encoded entries.
+        threshold (float, optional): Minimum Jaccard similarity of the words of
+            the titles. Defaults to `0.8`.
+        max_bucket (int, optional): Buckets with more entries than this are
+            not compared, because they contain common titles rather than
+            duplicates. Defaults to `100`.
+
+    Returns:
+        list[tuple[list[int], list[str]]]: For every group of duplicates, the
+            indices of the entries and the reasons why the entries are
+            duplicates of the entry which is kept, sorted by the first index.
+    """
+    excluded = _excluded(entries)
+    features = []
+    indexes = {"doi": {}, "eprint": {}, "key": {}}
+    buckets = {}
+    for i, entry in enumerate(entries):
+        words = set(tokenise(entry.get("title", "")))
+        values = {
+            "doi": _doi(entry),
+            "eprint": _eprint(entry),
+            "key": normalised_key(entry),
+        }
+        entry_id = str(entry["id"]).lower() if "id" in entry else None
+        features.append((values, entry_id, words, _first_author(entry)))
+        if i in excluded:
+            continue
+        for name, value in values.items():
+            if value:
+                indexes[name].setdefault(value, []).append(i)
+        if entry_id:
+            buckets.setdefault(("id", entry_id), []).append(i)
+        if words:
+            signature = _signature(words)
+            for band in range(_bands):
+                key = (band,) + tuple(signature[band * _rows : (band + 1) * _rows])
+                buckets.setdefault(key, []).append(i)
+
+    def reasons(i, j):
+        # Determine why two entries are duplicates.
+        values_i, id_i, words_i, author_i = features[i]
+        values_j, id_j, words_j, author_j = features[j]
+        found = [
+            name
+            for name, value in values_i.items()
+            if value and value == values_j[name]
+        ]
+        if (
+            words_i
+            and words_j
+            and _jaccard(words_i, words_j) >= threshold
+            and (None in (author_i, author_j) or author_i == author_j)
+        ):
+            found.append("title")
+            if id_i and id_i == id_j:
+                found.append("id")
+        return found
+
+    # Find candidates with a union-find.
+    candidates = _UnionFind(len(entries))
+    for index in indexes.values():
+        for members in index.values():
+            for j in members[1:]:
+                candidates.union(members[0], j)
+    compared = set()
+    for members in buckets.values():
+        if len(members) < 2 or len(members) > max_bucket:
+            continue
+        for k, i in enumerate(members):
+            for j in members[k + 1 :]:
+                if (i, j) not in compared:
+                    compared.add((i, j))
+                    if reasons(i, j):
+                        candidates.union(i, j)
+
+    components = {}
+    for i in range(len(entries)):
+        components.setdefault(candidates.find(i), []).append(i)
+
+    # Split every set of candidates into groups of the entry to keep and its
+    # duplicates.
+    groups = []
+    for members in components.values():
+        while len(members) > 1:
+            keep = members[preferred([entries[i] for i in members])]
+            group, found, rest = [keep], set(), []
+            for i in members:
+                if i == keep:
+                    continue
+                names = reasons(keep, i)
+                if names:
+                    group.append(i)
+                    found.update(names)
+                else:
+                    rest.append(i)
+            if len(group) > 1:
+                groups.append((sorted(group), sorted(found)))
+            members = rest
+    return sorted(groups)
+
+
+def _published(entry):
+    for field in ["journal", "booktitle"]:
+        if field in entry and "arxiv" not in str(entry[field]).lower():
+            return True
+    return False
+
+
+def preferred(entries):
+    """Choose which of a group of duplicates to keep: a published version
+    over a preprint, then an entry with a DOI, and then the entry with the
+    most fields. Ties are broken by the order of the entries.
+
+    Args:
+        entries (list[dict]): Encoded entries.
+
+    Returns:
+        int: Index of the entry to keep.
+    """
+    scores = [
+        (_published(entry), _doi(entry) is not None, len(entry), -i)
+        for i, entry in enumerate(entries)
+    ]
+    return -max(scores)[-1]
+
+
+def _raw(entry):
+    if "raw" in entry:
+        return entry["raw"]
+    elif "raw_diff" in entry:
+        return expand_entry(entry)
+    else:
+        return None
+
+
+def merge_entries(entries):
+    """Merge a group of duplicates into the entry chosen by :func:`preferred`.
+    Fields which the chosen entry does not have are taken from the other
+    entries, in order, including the raw fields. A compacted entry stays
+    compacted.
+
+    Args:
+        entries (list[dict]): Encoded entries.
+
+    Returns:
+        dict: Merged entry.
+    """
+    keep = entries[preferred(entries)]
+    merged = {k: v for k, v in keep.items() if k != "raw_diff"}
+    raw = _raw(keep)
+    if raw is not None:
+        merged["raw"] = dict(raw)
+    for other in entries:
+        if other is keep:
+            continue
+        other_raw = _raw(other)
+        for field, value in other.items():
+            if field not in encoders or field in merged:
+                continue
+            merged[field] = value
+            if raw is not None and other_raw and field in other_raw:
+                merged["raw"][field] = other_raw[field]
+    return compact_entry(merged) if "raw_diff" in keep else merged
@@ -0,0 +1,276 @@
+import heapq
+import threading
+
+__all__ = ["FuzzyMatcher", "fuzzy_search"]
+
+# Scores and bonuses used by `fzf`.
+_score_match = 16
+_score_gap_start = -3
+_score_gap_extension = -1
+_bonus_boundary = _score_match // 2
+_bonus_boundary_white = _bonus_boundary + 2
+_bonus_boundary_delimiter = _bonus_boundary + 1
+_bonus_non_word = _score_match // 2
+_bonus_camel123 = _bonus_boundary + _score_gap_extension
+_bonus_consecutive = -(_score_gap_start + _score_gap_extension)
+_bonus_first_char_multiplier = 2
+
+# Character classes used by `fzf`. The order matters: classes larger than
+# `_char_non_word` are word characters.
+_char_white = 0
+_char_non_word = 1
+_char_delimiter = 2
+_char_lower = 3
+_char_upper = 4
+_char_letter = 5
+_char_number = 6
+
+
+def _char_class(char):
+    if char.islower():
+        return _char_lower
+    elif char.isupper():
+        return _char_upper
+    elif char.isdigit():
+        return _char_number
+    elif char.isalpha():
+        return _char_letter
+    elif char.isspace():
+        return _char_white
+    elif char in "/,:;|":
+        return _char_delimiter
+    else:
+        return _char_non_word
+
+
+def _compute_bonus(prev_class, char_class):
+    if char_class > _char_non_word:
+        if prev_class == _char_white:
+            return _bonus_boundary_white
+        elif prev_class == _char_delimiter:
+            return _bonus_boundary_delimiter
+        elif prev_class == _char_non_word:
+            return _bonus_boundary
+    if (prev_class == _char_lower and char_class == _char_upper) or (
+        prev_class != _char_number and char_class == _char_number
+    ):
+        return _bonus_camel123
+    elif char_class == _char_non_word or char_class == _char_delimiter:
+        return _bonus_non_word
+    elif char_class == _char_white:
+        return _bonus_boundary_white
+    return 0
+
+
+# Lookup tables for character classes of ASCII characters and bonuses.
+_ascii_classes = {chr(i): _char_class(chr(i)) for i in range(128)}
+_bonuses = [[_compute_bonus(i, j) for j in range(7)] for i in range(7)]
+
+
+def _score(text, folded, pattern, start, end):
+    """Compute the `fzf` score of a match.
+
+    Args:
+        text (str): Original text.
+        folded (str): Text, possibly case folded, to compare with the pattern.
+        pattern (str): Pattern.
+        start (int): Start of the match.
+        end (int): End of the match.
+
+    Returns:
+        int: Score.
+    """
+    score, consecutive, first_bonus = 0, 0, 0
+    prev = pos = start - 1
+    for pattern_index, char in enumerate(pattern):
+        # Jump to the next matching character rather than walking over all
+        # characters in between. The gap between the matches incurs a penalty.
+        pos = folded.find(char, pos + 1, end)
+        if pattern_index > 0 and pos > prev + 1:
+            score += _score_gap_start + (pos - prev - 2) * _score_gap_extension
+            consecutive = 0
+            first_bonus = 0
+        prev = pos
+
+        score += _score_match
+        if pos > 0:
+            char = text[pos - 1]
+            prev_class = _ascii_classes.get(char)
+            if prev_class is None:
+                prev_class = _char_class(char)
+        else:
+            prev_class = _char_white
+        char_class = _ascii_classes.get(text[pos])
+        if char_class is None:
+            char_class = _char_class(text[pos])
+        bonus = _bonuses[prev_class][char_class]
+        if consecutive == 0:
+            first_bonus = bonus
+        else:
+            # Break consecutive chunks at a boundary.
+            if bonus >= _bonus_boundary and bonus > first_bonus:
+                first_bonus = bonus
+            bonus = max(bonus, first_bonus, _bonus_consecutive)
+        if pattern_index == 0:
+            score += bonus * _bonus_first_char_multiplier
+        else:
+            score += bonus
+        consecutive += 1
+    return score
+
+
+def _match_fuzzy(text, folded, pattern):
+    # Find the first occurrence of the pattern.
+    end = -1
+    for char in pattern:
+        end = folded.find(char, end + 1)
+        if end < 0:
+            return None
+    end += 1
+
+    # Find the shortest match which ends there.
+    start = end
+    for char in reversed(pattern):
+        start = folded.rfind(char, 0, start)
+
+    return _score(text, folded, pattern, start, end)
+
+
+def _match_exact(text, folded, pattern):
+    start = folded.find(pattern)
+    if start < 0:
+        return None
+    return _score(text, folded, pattern, start, start + len(pattern))
+
+
+def _match_prefix(text, folded, pattern):
+    if not folded.startswith(pattern):
+        return None
+    return _score(text, folded, pattern, 0, len(pattern))
+
+
+def _match_suffix(text, folded, pattern):
+    if not folded.endswith(pattern):
+        return None
+    start = len(folded) - len(pattern)
+    return _score(text, folded, pattern, start, len(folded))
+
+
+def _parse_query(query):
+    """Parse a query in the extended search syntax of `fzf`.
+
+    Args:
+        query (str): Query.
+
+    Returns:
+        list[tuple]: For every term, a tuple containing the match function,
+            the pattern, whether the term is case sensitive, and whether the
+            term is inverted.
+    """
+    terms = []
+    for term in query.split():
+        inverse = term.startswith("!")
+        if inverse:
+            term = term[1:]
+        if term.startswith("'"):
+            match, term = _match_exact, term[1:]
+        elif term.startswith("^"):
+            match, term = _match_prefix, term[1:]
+        elif term.endswith("$") and len(term) > 1:
+            match, term = _match_suffix, term[:-1]
+        elif inverse:
+            match = _match_exact
+        else:
+            match = _match_fuzzy
+        if term:
+            # Use smart case: only match case if the term contains uppercase.
+            terms.append((match, term, term != term.lower(), inverse))
+    return terms
+
+
+class FuzzyMatcher(object):
+    """Fuzzy matcher which ranks like `fzf --filter`.
+
+    Items are ranked by score, then by length, and then by their original
+    order. The lowercase versions of the items are computed once, so the
+    matcher can be reused for many queries. Moreover, if a query extends the
+    previous query, as happens when the query is typed, only the items which
+    matched the previous query are considered.
+
+    The matcher can be used by several threads at once: the previous query and
+    its matches are read and replaced together.
+
+    Args:
+        items (list[str]): Items to search through.
+    """
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.folded = [item.lower() for item in self.items]
+        self._last = (None, None)
+        self._lock = threading.Lock()
+
+    def search(self, query, limit=None):
+        """Search for a query.
+
+        Args:
+            query (str): Query in the extended search syntax of `fzf`.
+            limit (int, optional): Only return the best `limit` matches.
+
+        Returns:
+            list[str]: Matches, best match first.
+        """
+        terms = _parse_query(query)
+
+        # Extending a query can only remove matches if the previous query had
+        # no inverted or suffix terms.
+        with self._lock:
+            last_query, last_matches = self._last
+        candidates = range(len(self.items))
+        if (
+            last_query is not None
+            and query.startswith(last_query)
+            and all(
+                not inverse and match is not _match_suffix
+                for match, _, _, inverse in _parse_query(last_query)
+            )
+        ):
+            candidates = last_matches
+
+        matches = []
+        for i in candidates:
+            item, folded = self.items[i], self.folded[i]
+            score = 0
+            for match, pattern, case_sensitive, inverse in terms:
+                res = match(item, item if case_sensitive else folded, pattern)
+                if inverse:
+                    if res is not None:
+                        break
+                elif res is None:
+                    break
+                else:
+                    score += res
+            else:
+                matches.append((-score, len(item), i))
+        with self._lock:
+            self._last = (query, [i for _, _, i in matches])
+
+        if limit is None:
+            matches.sort()
+        else:
+            matches = heapq.nsmallest(limit, matches)
+        return [self.items[i] for _, _, i in matches]
+
+
+def fuzzy_search(items, query, limit=None):
+    """Fuzzy search like `fzf --filter`.
+
+    Args:
+        items (list[str]): Items to search through.
+        query (str): Query in the extended search syntax of `fzf`.
+        limit (int, optional): Only return the best `limit` matches.
+
+    Returns:
+        list[str]: Matches, best match first.
+    """
+    return FuzzyMatcher(items).search(query, limit=limit)
@@ -0,0 +1,203 @@
+import json
+import os
+import time
+
+import catalogue.utils
+
+__all__ = ["FileIndex"]
+
+# Resolution of modification times of the coarsest common file systems, like
+# FAT, in nanoseconds.
+_tick_ns = 2 * 10**9
+
+
+class FileIndex(object):
+    """Index of all files on a path, stored on disk.
+
+    Like `find -L`, the index follows symbolic links. Symbolic links which
+    lead to a directory which is already being indexed higher up in the tree
+    are skipped to avoid cycles.
+
+    For every directory, the index stores its modification time, the target of
+    the directory if it is a symbolic link, the names of its subdirectories,
+    and the names of its files grouped by extension. Because adding, removing,
+    or renaming an entry changes the modification time of the directory, only
+    directories with a changed modification time need to be listed again when
+    the index is refreshed. Modification times have a limited resolution, so
+    a change within the same tick as the listing does not change the
+    modification time. Directories which were modified within one tick of
+    when they were listed are therefore always listed again.
+
+    The modification times of the files and the targets of files which are
+    symbolic links are stored separately and only loaded when they are needed,
+    which keeps listing files fast.
+
+    Args:
+        root (str): Path to index.
+        path (str): Path of the file to store the index in.
+    """
+
+    version = 3
+
+    def __init__(self, root, path):
+        self.root = root
+        self.path = path
+        self.path_meta = os.path.splitext(path)[0] + ".meta.json"
+        self.dirs = {}
+        self._meta = None
+        self.changed = False
+        if os.path.isfile(path):
+            with open(path) as f:
+                content = json.load(f)
+            if content.get("version") == FileIndex.version and content["root"] == root:
+                self.dirs = content["dirs"]
+
+    @property
+    def meta(self):
+        """dict: For every directory, the modification times of the files and
+        the targets of the files which are symbolic links."""
+        if self._meta is None:
+            self._meta = {}
+            if self.dirs and os.path.isfile(self.path_meta):
+                with open(self.path_meta) as f:
+                    self._meta = json.load(f)
+        return self._meta
+
+    def info(self, path):
+        """Get the modification time and the target of an indexed file.
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            tuple[float, str]: Modification time and target of the file. The
+                target is `None` if the file is not a symbolic link.
+        """
+        directory, name = os.path.split(path)
+        meta = self.meta[directory]
+        return meta["mtimes"][name], meta["links"].get(name)
+
+    def refresh(self):
+        """Bring the index up to date with the file system."""
+        old_dirs, self.dirs = self.dirs, {}
+        if os.path.isdir(self.root):
+            self._scan(self.root, old_dirs, set())
+        if list(old_dirs) != list(self.dirs):
+            self.changed = True
+            self._meta = {k: v for k, v in self.meta.items() if k in self.dirs}
+
+    def _scan(self, path, old_dirs, ancestors):
+        stat = os.stat(path)
+        cached = old_dirs.get(path)
+
+        if (
+            cached
+            and cached["mtime_ns"] == stat.st_mtime_ns
+            and cached["listed_ns"] - cached["mtime_ns"] > _tick_ns
+        ):
+            # The directory has not changed, so the listing can be reused.
+            listing = cached
+        else:
+            listing = {
+                "mtime_ns": stat.st_mtime_ns,
+                "listed_ns": time.time_ns(),
+                "target": os.path.realpath(path) if os.path.islink(path) else None,
+                "dirs": [],
+                "files": {},
+            }
+            meta = {"mtimes": {}, "links": {}}
+            for entry in os.scandir(path):
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=True)
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    listing["dirs"].append(entry.name)
+                    continue
+                extension = os.path.splitext(entry.name)[1]
+                listing["files"].setdefault(extension, []).append(entry.name)
+                try:
+                    mtime = entry.stat(follow_symlinks=True).st_mtime
+                except OSError:
+                    # Broken symbolic link.
+                    mtime = entry.stat(follow_symlinks=False).st_mtime
+                meta["mtimes"][entry.name] = mtime
+                if entry.is_symlink():
+                    meta["links"][entry.name] = os.path.realpath(entry.path)
+            self.meta[path] = meta
+            self.changed = True
+        self.dirs[path] = listing
+
+        # Recurse into subdirectories, minding cycles.
+        ancestors = ancestors | {(stat.st_dev, stat.st_ino)}
+        for name in listing["dirs"]:
+            subpath = os.path.join(path, name)
+            try:
+                substat = os.stat(subpath)
+            except OSError:
+                # The directory disappeared since it was listed.
+                continue
+            if (substat.st_dev, substat.st_ino) not in ancestors:
+                self._scan(subpath, old_dirs, ancestors)
+
+    def files(self, extensions=None):
+        """List indexed files with certain extensions.
+
+        Args:
+            extensions (str, list[str], or None, optional): Extension or
+                extensions to list. `None` represents a directory. Set to
+                `None` to list all files and directories. Defaults to `None`.
+
+        Returns:
+            list[str]: Files.
+        """
+        if extensions is not None:
+            extensions = extensions if isinstance(extensions, list) else [extensions]
+        out = []
+        for path, listing in self.dirs.items():
+            if extensions is None or None in extensions:
+                out.append(path)
+            prefix = os.path.join(path, "")
+            if extensions is None:
+                for names in listing["files"].values():
+                    out.extend(prefix + name for name in names)
+            else:
+                for extension in extensions:
+                    names = listing["files"].get(extension)
+                    if names:
+                        out.extend(prefix + name for name in names)
+        return out
+
+    def roots(self):
+        """List the root and the targets of the indexed symbolic links to
+        directories, leaving out targets inside the other listed directories.
+
+        Returns:
+            list[str]: Root and targets.
+        """
+        targets = {listing["target"] for listing in self.dirs.values()}
+        targets.discard(None)
+        roots = [os.path.realpath(self.root)]
+        for path in sorted(targets, key=len):
+            if not any(
+                path == root or path.startswith(os.path.join(root, ""))
+                for root in roots
+            ):
+                roots.append(path)
+        return roots
+
+    def save(self):
+        """Write the index to disk if it has changed."""
+        if not self.changed:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        catalogue.utils.write_atomic(self.path_meta, json.dumps(self.meta))
+        catalogue.utils.write_atomic(
+            self.path,
+            json.dumps(
+                {"version": FileIndex.version, "root": self.root, "dirs": self.dirs}
+            ),
+        )
+        self.changed = False
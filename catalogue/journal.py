@@ -0,0 +1,199 @@
+import contextlib
+import fcntl
+import json
+import os
+import uuid
+
+import catalogue.utils
+
+__all__ = ["Journal"]
+
+# Prefix of the temporary files of the journal. Recovery removes these files
+# if they are left behind.
+_tmp_prefix = ".tmp-journal-"
+
+
+class Journal(object):
+    """Write-ahead journal for moving a PDF and replacing its JSON.
+
+    Before a move is applied, the new JSON is flushed to disk in a temporary
+    file and the move is recorded in the journal. The steps of a move are
+    idempotent, so a move interrupted by a crash can be completed by applying
+    it again; see :meth:`.journal.Journal.recover`.
+
+    Args:
+        path (str): Path of the journal.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _makedirs(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    @contextlib.contextmanager
+    def lock(self):
+        """Lock the journal, so only one process at a time can use it. The lock
+        is released when the process exits, even if it crashes.
+
+        Raises:
+            RuntimeError: If another process holds the lock.
+        """
+        self._makedirs()
+        with open(self.path + ".lock", "w") as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise RuntimeError(
+                    'Journal "{}" is used by another process.'.format(self.path)
+                )
+            yield
+
+    def _append(self, record, sync=False):
+        self._makedirs()
+        with open(self.path, "a+b") as f:
+            line = json.dumps(record).encode() + b"\n"
+            # Start a new line if the last record was not written completely.
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def records(self):
+        """Read the records in the journal.
+
+        Returns:
+            list[dict]: Records.
+        """
+        if not os.path.isfile(self.path):
+            return []
+        records = []
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Skip a record which was not written completely.
+                    continue
+        return records
+
+    def pending(self):
+        """Get the moves which were recorded, but which did not complete.
+
+        Returns:
+            list[dict]: Moves.
+        """
+        moves = {}
+        for record in self.records():
+            if "id" in record:
+                moves[record["id"]] = record
+            else:
+                moves.pop(record.get("done", record.get("aborted")), None)
+        return list(moves.values())
+
+    def completed(self):
+        """Get the original paths of the PDFs which were moved.
+
+        Returns:
+            set[str]: Paths.
+        """
+        records = self.records()
+        done = {record["done"] for record in records if "done" in record}
+        return {record["pdf"] for record in records if record.get("id") in done}
+
+    def move(self, path_pdf, new_path_pdf, content_json, path_json, new_path_json):
+        """Move a PDF and replace its JSON.
+
+        Args:
+            path_pdf (str): Path of the PDF.
+            new_path_pdf (str): New path of the PDF.
+            content_json (str): New content of the JSON.
+            path_json (str or None): Path of the current JSON, which is
+                removed. Set to `None` if there is no JSON.
+            new_path_json (str): Path to write the new JSON to.
+        """
+        record = {
+            "id": uuid.uuid4().hex,
+            "pdf": path_pdf,
+            "new_pdf": new_path_pdf,
+            "json": path_json,
+            "new_json": new_path_json,
+            "tmp": catalogue.utils.write_tmp(
+                new_path_json, content_json, prefix=_tmp_prefix
+            ),
+        }
+        self._append(record, sync=True)
+        self._apply(record)
+
+    def _apply(self, record):
+        directory = os.path.dirname(os.path.abspath(record["new_json"]))
+        if os.path.exists(record["tmp"]):
+            os.replace(record["tmp"], record["new_json"])
+            catalogue.utils.sync_directory(directory)
+        elif not os.path.exists(record["new_json"]):
+            # The move was not started, so it can be rolled back.
+            self._append({"aborted": record["id"]})
+            return False
+        changed = False
+        if record["pdf"] != record["new_pdf"] and os.path.exists(record["pdf"]):
+            os.rename(record["pdf"], record["new_pdf"])
+            changed = True
+        if (
+            record["json"]
+            and record["json"] != record["new_json"]
+            and os.path.exists(record["json"])
+        ):
+            os.unlink(record["json"])
+            changed = True
+        if changed:
+            catalogue.utils.sync_directory(directory)
+        self._append({"done": record["id"]})
+        return True
+
+    def _sweep(self):
+        # Remove temporary files of moves which were interrupted before they
+        # were recorded.
+        directories = {
+            os.path.dirname(os.path.abspath(record["new_json"]))
+            for record in self.records()
+            if "new_json" in record
+        }
+        for directory in sorted(directories):
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                if name.startswith(_tmp_prefix):
+                    try:
+                        os.unlink(os.path.join(directory, name))
+                    except OSError:
+                        continue
+
+    def recover(self):
+        """Complete the moves which were interrupted. Moves which were not
+        started are rolled back. Finally, temporary files which were left
+        behind in the directories of the moves are removed.
+
+        Returns:
+            tuple[int, int]: Number of moves completed and rolled back.
+        """
+        completed, rolled_back = 0, 0
+        for record in self.pending():
+            if self._apply(record):
+                completed += 1
+            else:
+                rolled_back += 1
+        self._sweep()
+        return completed, rolled_back
+
+    def clear(self):
+        """Clear the journal."""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
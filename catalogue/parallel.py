@@ -0,0 +1,40 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+__all__ = ["parallel_map"]
+
+
+def parallel_map(f, xs, workers=1, chunksize=64):
+    """Apply a function to every element of an iterable, possibly using a pool
+    of processes. The results are returned in the original order.
+
+    The elements are sent to the pool in batches of `workers * chunksize`
+    elements, so results become available before all elements are processed.
+
+    Args:
+        f (function): Function to apply. If `workers > 1`, `f` and the elements
+            must be picklable.
+        xs (iterable): Elements.
+        workers (int, optional): Number of processes. Set to `1` to not use a
+            pool. Defaults to `1`.
+        chunksize (int, optional): Number of elements sent to a process at
+            once. Defaults to `64`.
+
+    Returns:
+        generator: Results.
+    """
+    if workers <= 1:
+        for x in xs:
+            yield f(x)
+        return
+
+    xs = iter(xs)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            batch = list(itertools.islice(xs, workers * chunksize))
+            if len(batch) == 0:
+                break
+            # Use a smaller chunk size for small batches to balance the load.
+            batch_chunksize = max(1, min(chunksize, len(batch) // workers))
+            for res in executor.map(f, batch, chunksize=batch_chunksize):
+                yield res
@@ -0,0 +1,217 @@
+import contextlib
+import json
+import sys
+import threading
+import time
+
+__all__ = ["Profile", "profile", "section"]
+
+# Profile which is currently active.
+_active = None
+
+
+class _Stats(object):
+    def __init__(self):
+        self.times = []
+        self.errors = 0
+        self.skips = 0
+        self.examples = []
+
+
+def _percentile(sorted_times, q):
+    if not sorted_times:
+        return 0.0
+    return sorted_times[min(len(sorted_times) - 1, int(q * len(sorted_times)))]
+
+
+class Profile(object):
+    """Timings of the encoders, the fields, and sections of the scripts.
+
+    Timings are grouped into kinds: `field` for encoding or decoding a field,
+    `encoder` for every encoder which is not composed of other encoders, and
+    `section` for parts of a script, like reading files. For every name, the
+    profile counts the calls, the errors, which are exceptions raised by the
+    call, and the skips, which are fields that are dropped.
+
+    Only calls in the process which activates the profile are recorded, but
+    calls from all threads are.
+    """
+
+    # Number of error messages to keep per name.
+    num_examples = 3
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind, name):
+        key = (kind, name)
+        if key not in self._stats:
+            self._stats[key] = _Stats()
+        return self._stats[key]
+
+    def time(self, kind, name, f):
+        """Call a function and record how long the call takes.
+
+        Args:
+            kind (str): Kind.
+            name (str): Name.
+            f (function): Function to call without arguments.
+
+        Returns:
+            object: Result of the call.
+        """
+        start = time.perf_counter()
+        try:
+            return f()
+        except Exception as e:
+            with self._lock:
+                stats = self._get(kind, name)
+                stats.errors += 1
+                if len(stats.examples) < Profile.num_examples:
+                    stats.examples.append(str(e))
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._get(kind, name).times.append(elapsed)
+
+    def skip(self, kind, name):
+        """Record that a field is dropped.
+
+        Args:
+            kind (str): Kind.
+            name (str): Name.
+        """
+        with self._lock:
+            self._get(kind, name).skips += 1
+
+    def stats(self):
+        """Summarise the timings.
+
+        Returns:
+            dict[str, dict[str, dict]]: For every kind and every name, the
+                number of calls, errors, and skips, the total time, the median
+                and 99th percentile of the time per call, and up to three error
+                messages. Times are in seconds.
+        """
+        with self._lock:
+            items = sorted(self._stats.items())
+        out = {}
+        for (kind, name), stats in items:
+            times = sorted(stats.times)
+            out.setdefault(kind, {})[name] = {
+                "calls": len(times),
+                "errors": stats.errors,
+                "skips": stats.skips,
+                "total": sum(times),
+                "p50": _percentile(times, 0.5),
+                "p99": _percentile(times, 0.99),
+                "examples": list(stats.examples),
+            }
+        return out
+
+    def report(self):
+        """Format the timings as a table, sorted by the total time.
+
+        Returns:
+            str: Report.
+        """
+        lines = []
+        for kind, stats in self.stats().items():
+            lines.append(
+                "{:<32} {:>9} {:>7} {:>7} {:>10} {:>10} {:>10}".format(
+                    kind,
+                    "calls",
+                    "errors",
+                    "skips",
+                    "total (s)",
+                    "p50 (us)",
+                    "p99 (us)",
+                )
+            )
+            ordered = sorted(stats.items(), key=lambda x: x[1]["total"], reverse=True)
+            for name, s in ordered:
+                lines.append(
+                    "{:<32} {:>9} {:>7} {:>7} {:>10.3f} {:>10.1f} {:>10.1f}".format(
+                        name,
+                        s["calls"],
+                        s["errors"],
+                        s["skips"],
+                        s["total"],
+                        1e6 * s["p50"],
+                        1e6 * s["p99"],
+                    )
+                )
+                for example in s["examples"]:
+                    lines.append("    error: {}".format(example))
+            lines.append("")
+        return "\n".join(lines)
+
+    def write(self, path="-"):
+        """Print the report to `stderr` or write the summary of the timings to
+        a file as JSON.
+
+        Args:
+            path (str, optional): Path of the file. Set to `-` to print the
+                report. Defaults to `-`.
+        """
+        if path == "-":
+            print(self.report(), file=sys.stderr)
+        else:
+            self.dump(path)
+
+    def dump(self, path):
+        """Write the summary of the timings to a file as JSON.
+
+        Args:
+            path (str): Path of the file.
+        """
+        with open(path, "w") as f:
+            json.dump(self.stats(), f, indent=4)
+
+
+def active():
+    """Get the profile which is currently active.
+
+    Returns:
+        :class:`.profiling.Profile`: Profile or `None` if no profile is active.
+    """
+    return _active
+
+
+@contextlib.contextmanager
+def profile():
+    """Context manager which activates a new profile.
+
+    Returns:
+        :class:`.profiling.Profile`: Profile.
+    """
+    global _active
+    prof = Profile()
+    previous, _active = _active, prof
+    try:
+        yield prof
+    finally:
+        _active = previous
+
+
+@contextlib.contextmanager
+def section(name):
+    """Context manager which times a section of a script if a profile is
+    active.
+
+    Args:
+        name (str): Name of the section.
+    """
+    current = _active
+    if current is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with current._lock:
+            current._get("section", name).times.append(elapsed)
@@ -0,0 +1,458 @@
+import re
+import warnings
+
+__all__ = ["read_bibtex"]
+
+# Entry types which are read. Entries of other types are skipped.
+standard_types = {
+    "article",
+    "book",
+    "booklet",
+    "conference",
+    "inbook",
+    "incollection",
+    "inproceedings",
+    "manual",
+    "mastersthesis",
+    "misc",
+    "phdthesis",
+    "proceedings",
+    "techreport",
+    "unpublished",
+}
+
+# Strings which are defined before any `@string`.
+common_strings = {
+    "jan": "January",
+    "feb": "February",
+    "mar": "March",
+    "apr": "April",
+    "may": "May",
+    "jun": "June",
+    "jul": "July",
+    "aug": "August",
+    "sep": "September",
+    "oct": "October",
+    "nov": "November",
+    "dec": "December",
+}
+
+# Alternative names of fields.
+alternative_fields = {
+    "keyw": "keyword",
+    "keywords": "keyword",
+    "authors": "author",
+    "editors": "editor",
+    "urls": "url",
+    "link": "url",
+    "links": "url",
+    "subjects": "subject",
+    "xref": "crossref",
+}
+
+_whitespace = re.compile(r"[ \t\n\r]*")
+# Text outside declarations runs up to the next line which starts with `@`.
+_next_declaration = re.compile(r"\n[ \t\n\r]*@")
+_declaration = re.compile(r"@[ \t\n\r]*([a-zA-Z]+)[ \t\n\r]*")
+_keyword_end = re.compile(r"[^a-zA-Z0-9_$]")
+_braces = re.compile(r"[{}]")
+_braces_parentheses_quotes = re.compile(r'[{}()"]')
+_field_name = re.compile(r"[a-zA-Z0-9_\-().+]+")
+_string_name = re.compile(r"[a-zA-Z0-9_\-:]+")
+_integer = re.compile(r"[0-9]+")
+
+
+class _ParseError(Exception):
+    pass
+
+
+class _Stream(object):
+    """Buffer over a file which is read in chunks.
+
+    Args:
+        f (file): File.
+        chunk_size (int): Number of characters to read at once.
+    """
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        # Line number of the start of `text`.
+        self.line_offset = 1
+        self.first = True
+
+    def fill(self):
+        """Read the next chunk. Text before the current position is dropped.
+
+        Returns:
+            bool: `False` if the end of the file is reached.
+        """
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if self.first:
+            # Remove a byte-order mark.
+            if chunk.startswith("\ufeff"):
+                chunk = chunk[1:] or self.f.read(self.chunk_size)
+            self.first = False
+        if not chunk:
+            self.eof = True
+            return False
+        self.line_offset += self.text.count("\n", 0, self.pos)
+        self.text = self.text[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def line(self, pos=None):
+        """Get the line number of a position in the buffer.
+
+        Args:
+            pos (int, optional): Position. Defaults to the current position.
+
+        Returns:
+            int: Line number.
+        """
+        pos = self.pos if pos is None else pos
+        return self.line_offset + self.text.count("\n", 0, pos)
+
+    def match(self, pattern):
+        """Match a pattern at the current position, reading more text if the
+        match could extend beyond the buffer. A pattern which fails to match
+        must fail before the first text which is not whitespace after the
+        current character.
+
+        Args:
+            pattern (regex): Pattern.
+
+        Returns:
+            match: Match or `None`.
+        """
+        while True:
+            res = pattern.match(self.text, self.pos)
+            if res and res.end() < len(self.text):
+                return res
+            if not res and _whitespace.match(self.text, self.pos + 1).end() < len(
+                self.text
+            ):
+                return None
+            if not self.fill():
+                return pattern.match(self.text, self.pos)
+
+    def skip_to_next_declaration(self):
+        """Move to the next line which starts with `@`, or to the end of the
+        file."""
+        while True:
+            res = _next_declaration.search(self.text, self.pos)
+            if res:
+                self.pos = res.end() - 1
+                return
+            # A match can only start at the last newline.
+            last = self.text.rfind("\n", self.pos)
+            self.pos = last if last >= 0 else len(self.text)
+            if not self.fill():
+                self.pos = len(self.text)
+                return
+
+    def at_end(self):
+        """Skip whitespace and check whether the end of the file is reached.
+
+        Returns:
+            bool: `True` if the end of the file is reached.
+        """
+        self.pos = self.match(_whitespace).end()
+        return self.pos >= len(self.text) and not self.fill()
+
+    def body(self, start):
+        """Find the body of a declaration: the text between the delimiters
+        which open at `start`, which are braces or parentheses.
+
+        Args:
+            start (int): Position of the opening delimiter.
+
+        Returns:
+            tuple[str, int]: Body and the position after the closing delimiter,
+                or `None` if the delimiters are not closed.
+        """
+        # Positions are relative to `self.pos`, because reading more text
+        # moves the buffer.
+        offset = start - self.pos
+        parentheses = self.text[start] == "("
+        pattern = _braces_parentheses_quotes if parentheses else _braces
+        depth, quoted, scan = 0, False, offset + 1
+        while True:
+            for res in pattern.finditer(self.text, self.pos + scan):
+                char = res.group()
+                if char == "{":
+                    depth += 1
+                elif char == "}":
+                    depth -= 1
+                    if depth < 0:
+                        if parentheses:
+                            return None
+                        begin = self.pos + offset + 1
+                        return self.text[begin : res.start()], res.end()
+                elif depth == 0 and char == '"':
+                    quoted = not quoted
+                elif depth == 0 and not quoted and char == ")":
+                    begin = self.pos + offset + 1
+                    return self.text[begin : res.start()], res.end()
+            scan = len(self.text) - self.pos
+            if not self.fill():
+                return None
+
+
+def _strip_after_new_lines(s):
+    # Remove leading whitespace on all but the first line.
+    lines = s.splitlines()
+    if len(lines) > 1:
+        lines = [lines[0]] + [line.lstrip() for line in lines[1:]]
+    return "\n".join(lines)
+
+
+def _skip_whitespace(text, i):
+    return _whitespace.match(text, i).end()
+
+
+def _parse_delimited(text, i):
+    """Parse a braced or quoted string.
+
+    Args:
+        text (str): Text.
+        i (int): Position of the opening brace or quote.
+
+    Returns:
+        tuple[str, int]: Content between the delimiters and the position after
+            the closing delimiter.
+    """
+    quoted = text[i] == '"'
+    depth = 0 if quoted else 1
+    for res in _braces_parentheses_quotes.finditer(text, i + 1):
+        char = res.group()
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth < 0:
+                raise _ParseError("unbalanced braces")
+            if depth == 0 and not quoted:
+                return text[i + 1 : res.start()], res.end()
+        elif char == '"' and quoted and depth == 0:
+            return text[i + 1 : res.start()], res.end()
+    raise _ParseError("unterminated value")
+
+
+def _parse_expression(text, i, strings, strip):
+    """Parse a value which consists of strings and names of strings, joined by
+    `#`.
+
+    Args:
+        text (str): Text.
+        i (int): Position of the value.
+        strings (dict[str, str]): Defined strings.
+        strip (bool): Remove leading whitespace on all but the first line of
+            every part which is not the name of a string.
+
+    Returns:
+        tuple[str, int]: Value and the position after the value.
+    """
+    parts = []
+    while True:
+        i = _skip_whitespace(text, i)
+        if i < len(text) and text[i] in '{"':
+            part, i = _parse_delimited(text, i)
+            parts.append(_strip_after_new_lines(part) if strip else part)
+        else:
+            res = _string_name.match(text, i)
+            if not res:
+                raise _ParseError("expected a value")
+            name = res.group().lower()
+            if name not in strings:
+                raise RuntimeError('Undefined string "{}".'.format(name))
+            parts.append(strings[name])
+            i = res.end()
+        j = _skip_whitespace(text, i)
+        if j < len(text) and text[j] == "#":
+            i = j + 1
+        else:
+            return "".join(parts), i
+
+
+def _parse_value(text, i, strings):
+    i = _skip_whitespace(text, i)
+    res = _integer.match(text, i)
+    if res:
+        return res.group(), res.end()
+    return _parse_expression(text, i, strings, strip=True)
+
+
+def _parse_entry(entry_type, body, strings):
+    """Parse the body of an entry.
+
+    Args:
+        entry_type (str): Type of the entry.
+        body (str): Body.
+        strings (dict[str, str]): Defined strings.
+
+    Returns:
+        dict: Entry.
+    """
+    # Parse the key.
+    comma = body.find(",")
+    if comma < 0:
+        raise _ParseError("expected a key")
+    key = body[:comma].strip()
+    if not key or any(c.isspace() for c in key):
+        raise _ParseError('invalid key "{}"'.format(key))
+
+    # Parse the fields. There must be at least one.
+    pairs = []
+    i = comma + 1
+    while True:
+        i = _skip_whitespace(body, i)
+        res = _field_name.match(body, i)
+        if not res:
+            raise _ParseError("expected a field")
+        i = _skip_whitespace(body, res.end())
+        if i >= len(body) or body[i] != "=":
+            raise _ParseError('expected "=" after field "{}"'.format(res.group()))
+        value, i = _parse_value(body, i + 1, strings)
+        pairs.append((res.group(), value))
+        i = _skip_whitespace(body, i)
+        if i >= len(body):
+            break
+        if body[i] != ",":
+            raise _ParseError("expected a comma")
+        # Allow a trailing comma.
+        if _skip_whitespace(body, i + 1) >= len(body):
+            break
+        i += 1
+
+    # If a field occurs more than once, the first occurrence wins. Fields end
+    # up in reverse order, like `bibtexparser` produces them.
+    fields = {k: v for k, v in reversed(pairs)}
+    entry = {}
+    for k, v in fields.items():
+        k = k.lower()
+        entry[alternative_fields.get(k, k)] = "" if not v or v == "{}" else v
+    entry["entrytype"] = entry_type
+    entry["id"] = key
+    entry["type"] = entry.pop("entrytype")
+    return entry
+
+
+def _parse_string(body, strings):
+    """Parse the body of a string definition and define the string.
+
+    Args:
+        body (str): Body.
+        strings (dict[str, str]): Defined strings.
+    """
+    i = _skip_whitespace(body, 0)
+    res = _string_name.match(body, i)
+    if not res:
+        raise _ParseError("expected the name of a string")
+    i = _skip_whitespace(body, res.end())
+    if i >= len(body) or body[i] != "=":
+        raise _ParseError('expected "="')
+    value, i = _parse_expression(body, i + 1, strings, strip=False)
+    if _skip_whitespace(body, i) < len(body):
+        raise _ParseError("unexpected text after string")
+    strings[res.group().lower()] = value
+
+
+def _open(source):
+    if isinstance(source, str):
+        return open(source, encoding="utf-8"), True
+    return source, False
+
+
+def read_bibtex(source, chunk_size=1 << 16):
+    """Read the entries of a BiBTeX file one at a time. Only one entry is in
+    memory at a time, so arbitrarily large files can be read.
+
+    The entries are the same as produced by `bibtexparser` with
+    `common_strings=True` and `homogenize_fields=True`: field names are
+    lowercase and alternative names of fields are replaced, strings defined
+    by `@string` and the abbreviations of months are substituted, and entries
+    of a non-standard type are skipped. Comments and preambles are skipped. An
+    entry which cannot be parsed is skipped with a warning.
+
+    Args:
+        source (str or file): Path of the file or file object.
+        chunk_size (int, optional): Number of characters to read at once.
+
+    Returns:
+        generator[dict]: Entries, with keys `type` and `id` for the type and
+            the key.
+    """
+    f, close = _open(source)
+    try:
+        stream = _Stream(f, chunk_size)
+        strings = dict(common_strings)
+        while not stream.at_end():
+            if stream.text[stream.pos] != "@":
+                # Skip text outside declarations.
+                stream.skip_to_next_declaration()
+                continue
+
+            res = stream.match(_declaration)
+            line = stream.line()
+            if not res:
+                stream.pos += 1
+                stream.skip_to_next_declaration()
+                continue
+            name = res.group(1).lower()
+            keyword = stream.text[stream.pos + 1 : res.start(1)] == "" and (
+                res.end(1) == len(stream.text)
+                or _keyword_end.match(stream.text, res.end(1))
+            )
+            if keyword and name == "comment":
+                stream.pos += 1
+                stream.skip_to_next_declaration()
+                continue
+
+            found = None
+            if res.end() < len(stream.text) and stream.text[res.end()] in "{(":
+                found = stream.body(res.end())
+            try:
+                if found is None:
+                    raise _ParseError("unbalanced delimiters")
+                body, end = found
+                if keyword and name == "string":
+                    _parse_string(body, strings)
+                    entry = None
+                elif keyword and name == "preamble":
+                    entry = None
+                else:
+                    entry = _parse_entry(name, body, strings)
+            except _ParseError as e:
+                warnings.warn(
+                    "Could not parse BiBTeX on line {}: {}. Skipping it.".format(
+                        line, e
+                    ),
+                    stacklevel=2,
+                )
+                stream.pos += 1
+                stream.skip_to_next_declaration()
+                continue
+            except RuntimeError as e:
+                raise RuntimeError("{} (line {})".format(str(e)[:-1], line))
+
+            stream.pos = end
+            if entry is None:
+                continue
+            if entry["type"] not in standard_types:
+                warnings.warn(
+                    'Entry type "{}" on line {} is not standard. Skipping it.'.format(
+                        entry["type"], line
+                    ),
+                    stacklevel=2,
+                )
+                continue
+            yield entry
+    finally:
+        if close:
+            f.close()
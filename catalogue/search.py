@@ -0,0 +1,227 @@
+import collections
+import functools
+import math
+import os
+import re
+import sqlite3
+import unicodedata
+
+from .parallel import parallel_map
+from .text import extract_text
+
+__all__ = ["tokenise", "ContentIndex"]
+
+_token_pattern = re.compile(r"[^\W_]+")
+_accent_pattern = re.compile("[\u0300-\u036f]")
+
+# Parameters of BM25.
+_k1 = 1.2
+_b = 0.75
+
+_schema = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, doc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc);
+"""
+
+
+def tokenise(text):
+    """Split text into terms: lowercase words without accents.
+
+    Args:
+        text (str): Text.
+
+    Returns:
+        list[str]: Terms.
+    """
+    text = _accent_pattern.sub("", unicodedata.normalize("NFKD", text.lower()))
+    return [term for term in _token_pattern.findall(text) if len(term) <= 64]
+
+
+def _extract_terms(store, path):
+    terms = tokenise(store.text(path) if store else extract_text(path))
+    return len(terms), collections.Counter(terms)
+
+
+class ContentIndex(object):
+    """Inverted index of the content of PDF, DjVu, and EPUB files, stored in
+    an SQLite database.
+
+    For every file, the index stores its modification time, its size, and the
+    number of terms in its text. For every term, the index stores the files
+    which contain the term and how often. Only files which are new or which
+    have changed are extracted again when the index is updated.
+
+    Args:
+        path (str): Path of the database.
+        store (:class:`.text.TextStore`, optional): Store to read the text of
+            the files from. If not given, the text is extracted directly.
+    """
+
+    def __init__(self, path, store=None):
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.store = store
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_schema)
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def clear(self):
+        """Clear the index."""
+        with self.connection:
+            self.connection.execute("DELETE FROM postings")
+            self.connection.execute("DELETE FROM docs")
+
+    def update(self, paths, workers=1):
+        """Update the index for a list of files, extracting only files which
+        are not in the index or which have changed. Files not in `paths` are
+        removed from the index.
+
+        Files which are reached through different symbolic links are
+        indexed only once.
+
+        Args:
+            paths (list[str]): Paths of files.
+            workers (int, optional): Number of processes to extract with.
+                Defaults to `1`.
+
+        Returns:
+            int: Number of files which were indexed.
+        """
+        cursor = self.connection.cursor()
+        cached = {
+            path: (doc, mtime, size)
+            for doc, path, mtime, size in cursor.execute(
+                "SELECT id, path, mtime, size FROM docs"
+            )
+        }
+
+        stale, removed = [], []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Broken symbolic link.
+                continue
+            doc = cached.pop(path, None)
+            if doc and doc[1:] == (stat.st_mtime, stat.st_size):
+                continue
+            if doc:
+                removed.append(doc[0])
+            stale.append((path, os.path.realpath(path), stat))
+        removed.extend(doc for doc, _, _ in cached.values())
+
+        with self.connection:
+            for doc in removed:
+                cursor.execute("DELETE FROM postings WHERE doc = ?", (doc,))
+                cursor.execute("DELETE FROM docs WHERE id = ?", (doc,))
+
+        # Index every target only once.
+        targets = list(collections.OrderedDict.fromkeys(t for _, t, _ in stale))
+        results = parallel_map(
+            functools.partial(_extract_terms, self.store), targets, workers
+        )
+        results = dict(zip(targets, results))
+
+        with self.connection:
+            for path, target, stat in stale:
+                length, counts = results[target]
+                cursor.execute(
+                    "INSERT INTO docs (path, mtime, size, length) VALUES (?, ?, ?, ?)",
+                    (path, stat.st_mtime, stat.st_size, length),
+                )
+                doc = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT INTO postings (term, doc, tf) VALUES (?, ?, ?)",
+                    ((term, doc, tf) for term, tf in counts.items()),
+                )
+        return len(targets)
+
+    def search(self, query, limit=None):
+        """Search for files which contain all terms of a query. The files are
+        ranked with BM25.
+
+        Args:
+            query (str): Query.
+            limit (int, optional): Only return the best `limit` matches.
+
+        Returns:
+            list[str]: Matches, best match first.
+        """
+        terms = list(collections.OrderedDict.fromkeys(tokenise(query)))
+        if not terms:
+            return []
+        cursor = self.connection.cursor()
+        num_docs, total_length = cursor.execute(
+            "SELECT COUNT(*), SUM(length) FROM docs"
+        ).fetchone()
+        if num_docs == 0:
+            return []
+        average_length = max(total_length / num_docs, 1)
+
+        # Start with the rarest term, which restricts the candidates the most.
+        postings = []
+        for term in terms:
+            postings.append(
+                dict(
+                    cursor.execute(
+                        "SELECT doc, tf FROM postings WHERE term = ?", (term,)
+                    )
+                )
+            )
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for tfs in postings[1:]:
+            candidates &= set(tfs)
+        if not candidates:
+            return []
+
+        # Look up the candidates in batches to stay below the limit on the
+        # number of parameters of a query.
+        lengths, paths = {}, {}
+        candidates = list(candidates)
+        for i in range(0, len(candidates), 500):
+            batch = candidates[i : i + 500]
+            for doc, path, length in cursor.execute(
+                "SELECT id, path, length FROM docs WHERE id IN ({})".format(
+                    ",".join("?" * len(batch))
+                ),
+                batch,
+            ):
+                lengths[doc] = length
+                paths[doc] = path
+
+        scores = collections.defaultdict(float)
+        for tfs in postings:
+            idf = math.log(1 + (num_docs - len(tfs) + 0.5) / (len(tfs) + 0.5))
+            for doc in candidates:
+                tf = tfs[doc]
+                norm = _k1 * (1 - _b + _b * lengths[doc] / average_length)
+                scores[doc] += idf * tf * (_k1 + 1) / (tf + norm)
+
+        ranked = sorted(candidates, key=lambda doc: (-scores[doc], paths[doc]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [paths[doc] for doc in ranked]
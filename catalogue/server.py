@@ -0,0 +1,127 @@
+import json
+import os
+import socketserver
+import threading
+import time
+
+import catalogue.alfred
+import catalogue.fuzzy
+import catalogue.index
+import catalogue.utils
+from config import config
+
+__all__ = ["QueryServer", "serve"]
+
+
+class QueryServer(object):
+    """State of the query server: the file index, fuzzy matchers for the
+    extensions that are searched for, and the formatter for Alfred.
+
+    The file index is refreshed in the background, so queries never wait for
+    the file system.
+
+    Args:
+        refresh_interval (float, optional): Seconds between refreshes of the
+            file index. Defaults to `5`.
+    """
+
+    def __init__(self, refresh_interval=5):
+        self.refresh_interval = refresh_interval
+        self.index = catalogue.index.FileIndex(
+            config["resource_path"], os.path.join(config["cache_path"], "files.json")
+        )
+        self.matchers = {}
+        self.lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """Refresh the file index and, if the index changed, drop the fuzzy
+        matchers."""
+        with self.lock:
+            self.index.refresh()
+            if self.index.changed:
+                self.index.save()
+                self.matchers = {}
+
+    def _refresh_forever(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            self.refresh()
+
+    def matcher(self, extensions):
+        """Get the fuzzy matcher for files with certain extensions.
+
+        Args:
+            extensions (list[str]): Extensions.
+
+        Returns:
+            :class:`.fuzzy.FuzzyMatcher`: Fuzzy matcher.
+        """
+        key = tuple(extensions)
+        with self.lock:
+            if key not in self.matchers:
+                self.matchers[key] = catalogue.fuzzy.FuzzyMatcher(
+                    self.index.files(extensions)
+                )
+            return self.matchers[key]
+
+    def handle(self, request):
+        """Handle a query.
+
+        Args:
+            request (dict): Query with keys `query`, `json`, and `content`, as
+                the arguments of `find.py`.
+
+        Returns:
+            str: Results in Alfred's JSON format.
+        """
+        if request.get("json", False):
+            extensions = [".json"]
+        else:
+            extensions = [".pdf", ".djvu", ".epub"]
+        if request.get("content", False):
+            files = catalogue.utils.search_content(request["query"], extensions)
+        else:
+            files = self.matcher(extensions).search(
+                request["query"], limit=config["fuzzy_limit"]
+            )
+        return catalogue.alfred.list_json(files, config["base_path"])
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = json.loads(self.rfile.readline().decode())
+        try:
+            response = self.server.state.handle(request)
+        except Exception:
+            # Send an empty response, so the client falls back to searching
+            # itself.
+            response = ""
+        self.wfile.write(response.encode())
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(path, refresh_interval=5):
+    """Run the query server on a Unix socket until interrupted.
+
+    Args:
+        path (str): Path of the socket.
+        refresh_interval (float, optional): Seconds between refreshes of the
+            file index. Defaults to `5`.
+    """
+    state = QueryServer(refresh_interval=refresh_interval)
+    threading.Thread(target=state._refresh_forever, daemon=True).start()
+
+    # Remove a socket left behind by a previous server.
+    if os.path.exists(path):
+        os.unlink(path)
+    server = _UnixServer(path, _Handler)
+    server.state = state
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.unlink(path)
@@ -0,0 +1,223 @@
+import json
+import mmap
+import os
+import struct
+
+from .utils import write_atomic
+
+__all__ = ["Snapshot", "write_snapshot", "sync_snapshot"]
+
+# Header: magic bytes, version, offset of the index, and length of the index.
+_magic = b"CATSNAP\x00"
+_version = 1
+_header = struct.Struct("<8sIQQ")
+
+
+class Snapshot(object):
+    """Snapshot of the library: all entries of all JSON files in one file.
+
+    The file starts with a header, which is followed by the entries, every
+    entry stored as JSON, and ends with an index. For every JSON file, the
+    index stores the modification time and size of the file and which entries
+    belong to the file. For every entry, the index stores its offset, its
+    length, its ID, and its type.
+
+    The file is memory mapped and entries are only parsed when they are
+    accessed.
+
+    Args:
+        path (str): Path of the snapshot.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, offset, length = _header.unpack_from(self._map)
+            if magic != _magic or version != _version:
+                raise ValueError('"{}" is not a valid snapshot.'.format(path))
+            index = json.loads(self._map[offset : offset + length].decode())
+        except (struct.error, ValueError):
+            self._map.close()
+            raise ValueError('"{}" is not a valid snapshot.'.format(path))
+        self.files = index["files"]
+        self._entries = index["entries"]
+
+    def close(self):
+        """Close the snapshot."""
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def raw(self, i):
+        """Get an entry as JSON.
+
+        Args:
+            i (int): Index of the entry.
+
+        Returns:
+            bytes: Entry as JSON.
+        """
+        offset, length, _, _ = self._entries[i]
+        return self._map[offset : offset + length]
+
+    def entry(self, i):
+        """Get an entry.
+
+        Args:
+            i (int): Index of the entry.
+
+        Returns:
+            dict: Entry.
+        """
+        return json.loads(self.raw(i).decode())
+
+    def header(self, i):
+        """Get the ID and type of an entry without parsing the entry.
+
+        Args:
+            i (int): Index of the entry.
+
+        Returns:
+            tuple[str, str]: ID and type.
+        """
+        _, _, entry_id, entry_type = self._entries[i]
+        return entry_id, entry_type
+
+    def indices(self, path):
+        """Get the indices of the entries of a JSON file.
+
+        Args:
+            path (str): Path of the JSON file.
+
+        Returns:
+            range: Indices.
+        """
+        start, stop = self.files[path]["entries"]
+        return range(start, stop)
+
+    def entries(self, path=None):
+        """Iterate over entries.
+
+        Args:
+            path (str, optional): Only iterate over the entries of this JSON
+                file.
+
+        Returns:
+            generator[dict]: Entries.
+        """
+        for i in range(len(self)) if path is None else self.indices(path):
+            yield self.entry(i)
+
+    def content(self, path):
+        """Get the content of a JSON file as stored in the snapshot.
+
+        Args:
+            path (str): Path of the JSON file.
+
+        Returns:
+            bytes: Entries of the file as a JSON list.
+        """
+        return b"[" + b",".join(self.raw(i) for i in self.indices(path)) + b"]"
+
+
+def write_snapshot(path, files):
+    """Write a snapshot. The snapshot is first written to a temporary file,
+    which then replaces `path`.
+
+    Args:
+        path (str): Path of the snapshot.
+        files (iterable[tuple]): For every JSON file, a tuple containing the
+            path, the modification time, the size, and, for every entry in
+            the file, a tuple containing the ID, the type, and the entry as
+            JSON.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    def write(f):
+        f.write(b"\0" * _header.size)
+        index = {"files": {}, "entries": []}
+        offset = _header.size
+        for path_json, mtime, size, entries in files:
+            start = len(index["entries"])
+            for entry_id, entry_type, raw in entries:
+                f.write(raw)
+                index["entries"].append((offset, len(raw), entry_id, entry_type))
+                offset += len(raw)
+            index["files"][path_json] = {
+                "mtime": mtime,
+                "size": size,
+                "entries": (start, len(index["entries"])),
+            }
+        index = json.dumps(index).encode()
+        f.write(index)
+        f.seek(0)
+        f.write(_header.pack(_magic, _version, offset, len(index)))
+
+    write_atomic(path, write)
+
+
+def _load(path):
+    with open(path) as f:
+        entries = json.load(f)
+    return [
+        (entry["id"], entry["type"], json.dumps(entry).encode()) for entry in entries
+    ]
+
+
+def sync_snapshot(path, paths):
+    """Bring a snapshot up to date with JSON files. Only files which are not in
+    the snapshot or which have changed are read.
+
+    Args:
+        path (str): Path of the snapshot. The snapshot is created if it does
+            not exist.
+        paths (list[str]): Paths of the JSON files.
+
+    Returns:
+        int: Number of files which were read.
+    """
+    old = None
+    if os.path.isfile(path):
+        try:
+            old = Snapshot(path)
+        except ValueError:
+            # Rebuild an invalid snapshot.
+            pass
+
+    num_read = 0
+
+    def files():
+        nonlocal num_read
+        for path_json in paths:
+            stat = os.stat(path_json)
+            cached = old.files.get(path_json) if old else None
+            if (
+                cached
+                and cached["mtime"] == stat.st_mtime
+                and cached["size"] == stat.st_size
+            ):
+                entries = [
+                    old.header(i) + (old.raw(i),) for i in old.indices(path_json)
+                ]
+            else:
+                entries = _load(path_json)
+                num_read += 1
+            yield path_json, stat.st_mtime, stat.st_size, entries
+
+    try:
+        write_snapshot(path, files())
+    finally:
+        if old:
+            old.close()
+    return num_read
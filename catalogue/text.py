@@ -0,0 +1,192 @@
+import hashlib
+import html
+import os
+import re
+import shutil
+import subprocess as sp
+import warnings
+import zipfile
+import zlib
+
+import catalogue.utils
+from config import config
+
+__all__ = ["extract_text", "TextStore", "default_store"]
+
+_tag_pattern = re.compile(r"<[^>]*>")
+
+
+# Converters which could not be run and for which a warning has been issued.
+_missing = set()
+
+
+def _run(args):
+    try:
+        p = sp.Popen(args, stdout=sp.PIPE, stderr=sp.DEVNULL)
+    except OSError as e:
+        # Warn once rather than silently returning no text for every file.
+        if args[0] not in _missing:
+            _missing.add(args[0])
+            warnings.warn(
+                'Could not run "{}", so no text is extracted: {}.'.format(args[0], e)
+            )
+        raise
+    # A converter which fails can still write part of the text, which must not
+    # be mistaken for the text of the file.
+    out, _ = p.communicate()
+    if p.returncode != 0:
+        raise sp.CalledProcessError(p.returncode, args)
+    return out.decode("utf-8", "replace")
+
+
+def _extract_pdf(path):
+    return _run([config["binaries"]["pdftotext"], "-q", "-enc", "UTF-8", path, "-"])
+
+
+def _extract_djvu(path):
+    return _run([config["binaries"]["djvutxt"], path])
+
+
+def _extract_epub(path):
+    # An EPUB is a ZIP archive of (X)HTML documents.
+    chunks = []
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            if os.path.splitext(name)[1].lower() in {".html", ".htm", ".xhtml"}:
+                content = archive.read(name).decode("utf-8", "replace")
+                chunks.append(html.unescape(_tag_pattern.sub(" ", content)))
+    return "\n".join(chunks)
+
+
+_extractors = {".pdf": _extract_pdf, ".djvu": _extract_djvu, ".epub": _extract_epub}
+_errors = (OSError, sp.CalledProcessError, zipfile.BadZipFile)
+
+
+def _extract(path):
+    extractor = _extractors.get(os.path.splitext(path)[1].lower())
+    return extractor(path) if extractor else ""
+
+
+def extract_text(path):
+    """Extract the text of a PDF, DjVu, or EPUB file.
+
+    PDFs are converted with `pdftotext` and DjVu files with `djvutxt`. EPUBs
+    are read directly. If a converter cannot be run, a warning is issued the
+    first time.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        str: Text of the file. If the text cannot be extracted, the empty
+            string is returned.
+    """
+    try:
+        return _extract(path)
+    except _errors:
+        return ""
+
+
+class TextStore(object):
+    """Persistent cache of the text of PDF, DjVu, and EPUB files.
+
+    The text of a file is stored under its device, inode, modification time,
+    and size, so the text is extracted again only if the file changes.
+    Renaming or moving a file within the file system, or reaching it
+    through a symbolic link, does not change its key. Every text is stored
+    compressed in a separate file, so processes can share the store.
+
+    Args:
+        path (str): Directory to store the texts in.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _entry(self, path):
+        stat = os.stat(path)
+        key = "{}-{}-{}-{}".format(
+            stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+        )
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.path, digest[:2], digest + ".z")
+
+    def text(self, path):
+        """Get the text of a file, extracting it if it is not in the store.
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            str: Text of the file. If the text cannot be extracted, the empty
+                string is returned.
+        """
+        try:
+            entry = self._entry(path)
+        except OSError:
+            return ""
+        if os.path.isfile(entry):
+            with open(entry, "rb") as f:
+                return zlib.decompress(f.read()).decode()
+        try:
+            text = _extract(path)
+        except _errors:
+            # Do not store the failure, so the extraction is attempted again.
+            return ""
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        catalogue.utils.write_atomic(entry, zlib.compress(text.encode()))
+        return text
+
+    def prune(self, paths):
+        """Remove the texts of files which are not in a list of files, like
+        files which were deleted or which changed.
+
+        Args:
+            paths (list[str]): Paths of the files of which to keep the texts.
+
+        Returns:
+            int: Number of texts removed.
+        """
+        keep = set()
+        for path in paths:
+            try:
+                keep.add(self._entry(path))
+            except OSError:
+                continue
+        num_removed = 0
+        for root, _, names in os.walk(self.path):
+            for name in names:
+                entry = os.path.join(root, name)
+                if name.endswith(".z") and entry not in keep:
+                    try:
+                        os.remove(entry)
+                    except FileNotFoundError:
+                        # Another process removed the text.
+                        continue
+                    num_removed += 1
+        return num_removed
+
+    def first_page(self, path):
+        """Get the text of the first page of a file: the text up to the first
+        form feed, which `pdftotext` and `djvutxt` insert between pages.
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            str: Text of the first page.
+        """
+        return self.text(path).split("\f", 1)[0]
+
+    def clear(self):
+        """Clear the store."""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def default_store():
+    """Get the text store in `cache_path`.
+
+    Returns:
+        :class:`.text.TextStore`: Text store.
+    """
+    return TextStore(os.path.join(config["cache_path"], "text"))
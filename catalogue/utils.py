@@ -1,8 +1,20 @@
 import os
+import tempfile
 
 import catalogue.bin
+import catalogue.index
 from config import config
 
+__all__ = [
+    "ext_change",
+    "write_tmp",
+    "write_atomic",
+    "sync_directory",
+    "file_filter",
+    "list_files",
+    "search_content",
+]
+
 
 def ext_change(path, new_extension):
     """Change the extension of a file.
@@ -21,6 +33,77 @@ def ext_change(path, new_extension):
     return base + new_extension
 
 
+def write_tmp(path, content, sync=True, prefix=".tmp-"):
+    """Write content to a new temporary file in the directory of `path`, so
+    the temporary file can replace `path`.
+
+    Args:
+        path (str): Path which the temporary file will replace.
+        content (str, bytes, or function): Content to write or a function
+            which writes the content to a file opened in binary mode.
+        sync (bool, optional): Flush the temporary file to disk. Defaults to
+            `True`.
+        prefix (str, optional): Prefix of the name of the temporary file.
+            Defaults to `".tmp-"`.
+
+    Returns:
+        str: Path of the temporary file.
+    """
+    fd, path_tmp = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix=prefix
+    )
+    try:
+        with os.fdopen(fd, "w" if isinstance(content, str) else "wb") as f:
+            if callable(content):
+                content(f)
+            else:
+                f.write(content)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(path_tmp)
+        raise
+    return path_tmp
+
+
+def write_atomic(path, content, sync=False):
+    """Write a file atomically: the content is first written to a temporary
+    file in the same directory, which then replaces `path`. See
+    :func:`.utils.write_tmp`.
+
+    Args:
+        path (str): Path to write to.
+        content (str, bytes, or function): Content to write or a function
+            which writes the content to a file opened in binary mode.
+        sync (bool, optional): Flush the temporary file to disk before it
+            replaces `path`. Defaults to `False`.
+    """
+    path_tmp = write_tmp(path, content, sync=sync)
+    try:
+        os.replace(path_tmp, path)
+    except BaseException:
+        os.unlink(path_tmp)
+        raise
+
+
+def sync_directory(path):
+    """Flush the entries of a directory to disk, so files which were created,
+    renamed, or removed in the directory survive a crash.
+
+    Args:
+        path (str): Path of the directory.
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        # Directories cannot be opened on Windows.
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
 def file_filter(files, extensions):
     """Filter a list of files according to extensions.
 
@@ -41,17 +124,65 @@ def file_filter(files, extensions):
     return filter(okay, files)
 
 
-def list_files(extensions=None):
+def list_files(extensions=None, indexed=False):
     """List files with certain extensions on `resource_path`.
 
     Args:
         extensions (str, list[str], or None, optional): Extensions to list.
+        indexed (bool, optional): Serve the files from the index stored in
+            `cache_path` rather than from `find`. The index is refreshed
+            before the files are listed. Defaults to `False`.
 
     Returns:
         list[str]: List of files.
     """
+    if indexed:
+        index = catalogue.index.FileIndex(
+            config["resource_path"], os.path.join(config["cache_path"], "files.json")
+        )
+        index.refresh()
+        index.save()
+        return index.files(extensions)
+
     files = catalogue.bin.find(config["resource_path"])
     if extensions is None:
         return files
     else:
         return file_filter(files, extensions)
+
+
+def search_content(query, extensions=None):
+    """Search the content of the files on `resource_path`.
+
+    Depending on `content_backend`, the query is answered by Spotlight or by
+    the content index stored in `cache_path`. Spotlight does not follow
+    symbolic links, so it searches the targets of the symbolic links to
+    directories on `resource_path` too.
+
+    Args:
+        query (str): Query to search for.
+        extensions (str, list[str], or None, optional): Extensions to search
+            for.
+
+    Returns:
+        list[str]: List of files.
+    """
+    if config["content_backend"] == "index":
+        # Import lazily: importing `catalogue.search` is slow.
+        import catalogue.search
+
+        with catalogue.search.ContentIndex(
+            os.path.join(config["cache_path"], "content.sqlite")
+        ) as index:
+            files = index.search(query)
+    else:
+        index = catalogue.index.FileIndex(
+            config["resource_path"], os.path.join(config["cache_path"], "files.json")
+        )
+        index.refresh()
+        index.save()
+        files = catalogue.bin.mdfind(index.roots(), query)
+    if extensions is None:
+        return files
+    else:
+        return list(file_filter(files, extensions))
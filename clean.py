@@ -1,59 +1,264 @@
 import argparse
 import json
 import os
+import sys
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-from catalogue.bibtex import encode, is_arxiv, fetch_arxiv, generate_file_name
+from catalogue.arxiv import arxiv_id, fetch_arxiv_batch
+from catalogue.bibtex import encode, is_arxiv, generate_file_name
+from catalogue.journal import Journal
+from catalogue.profiling import profile, section
+from config import config
 
 
-def main(args):
-    for path_pdf in args.files:
-        # Verify path.
-        if not os.path.isfile(path_pdf):
-            print('"{}" is not a file.'.format(path_pdf))
-        if not os.path.splitext(path_pdf)[1] == ".pdf":
-            print('"{}" is not a PDF.'.format(path_pdf))
-
-        # Parse path and determine whether a JSON exists.
-        name, _ = os.path.splitext(os.path.basename(path_pdf))
-        base = os.path.dirname(path_pdf)
-        path_json = os.path.join(base, name + ".json")
-        has_json = os.path.isfile(path_json)
-
-        # If JSON is available, load it.
-        if has_json:
-            with open(path_json) as f:
-                bibtex = json.load(f)
-        else:
-            bibtex = None
+def extract(path_pdf):
+    """Extraction stage: load the BiBTeX of a PDF and check whether the PDF is
+    from arXiv.
+
+    Args:
+        path_pdf (str): Path of the PDF.
+
+    Returns:
+        dict: Job for the later stages.
+    """
+    # Verify path.
+    if not os.path.isfile(path_pdf):
+        raise ValueError('"{}" is not a file.'.format(path_pdf))
+    if not os.path.splitext(path_pdf)[1] == ".pdf":
+        raise ValueError('"{}" is not a PDF.'.format(path_pdf))
+
+    # Determine whether a JSON exists. If so, load it.
+    path_json = os.path.splitext(path_pdf)[0] + ".json"
+    if os.path.isfile(path_json):
+        with open(path_json) as f:
+            bibtex = json.load(f)
+    else:
+        path_json, bibtex = None, None
+
+    # Check whether the PDF is from arXiv.
+    info = is_arxiv(path_pdf)
+    return {
+        "path": path_pdf,
+        "path_json": path_json,
+        "bibtex": bibtex,
+        "arxiv": arxiv_id(info) if info else None,
+    }
+
+
+def update(job, raw):
+    """Encode stage: overwrite the BiBTeX of a job by the BiBTeX from arXiv.
+
+    Args:
+        job (dict): Job from :func:`extract`.
+        raw (dict or None): Raw BiBTeX from arXiv.
+    """
+    if raw is None:
+        raise RuntimeError('Could not fetch arXiv paper "{}".'.format(job["arxiv"]))
+    arxiv_bibtex = encode([raw], generate_ids=True, compact=config["compact_raw"])
+
+    # If BiBTeX exists, preserve key, but overwrite BiBTeX.
+    if job["bibtex"]:
+        arxiv_bibtex[0]["id"] = job["bibtex"][0]["id"]
+
+    job["bibtex"] = arxiv_bibtex
+
+
+def commit(job, journal):
+    """Commit stage: write the BiBTeX and rename the PDF.
+
+    Args:
+        job (dict): Job.
+        journal (:class:`.journal.Journal`): Journal to record the commit in.
+
+    Returns:
+        str: New path of the PDF.
+    """
+    path_pdf, bibtex = job["path"], job["bibtex"]
+    if not bibtex:
+        return path_pdf
+
+    # Determine new paths.
+    base = os.path.dirname(path_pdf)
+    name = generate_file_name(bibtex[0])
+    new_path_pdf = os.path.join(base, name + ".pdf")
+    new_path_json = os.path.join(base, name + ".json")
+    if os.path.exists(new_path_pdf) and not os.path.samefile(new_path_pdf, path_pdf):
+        raise RuntimeError('"{}" already exists.'.format(new_path_pdf))
+
+    journal.move(
+        path_pdf,
+        new_path_pdf,
+        json.dumps(bibtex, sort_keys=True, indent=4),
+        job["path_json"],
+        new_path_json,
+    )
+    return new_path_pdf
+
+
+def _extract_section(path_pdf):
+    with section("extract"):
+        return extract(path_pdf)
+
+
+def _fetch_section(identifiers):
+    with section("fetch arXiv"):
+        return fetch_arxiv_batch(identifiers)
 
-        # Check whether the PDF is from arXiv. If so, fetch and update BiBTeX.
-        info = is_arxiv(path_pdf)
-        if info:
-            arxiv_bibtex = encode(fetch_arxiv(path_pdf, info), generate_ids=True)
 
-            # If BiBTeX exists, preserve key, but overwrite BiBTeX.
-            if has_json:
-                arxiv_bibtex[0]["id"] = bibtex[0]["id"]
+def run(files, workers=8, progress=False, resume=False):
+    """Clean many PDFs in a pipeline.
 
-            # Overwrite BiBTeX.
-            bibtex = arxiv_bibtex
+    The PDFs are extracted by a pool of threads. The arXiv PDFs are collected
+    into batches, which are fetched by a second pool while the extraction
+    continues. Finally, every PDF is encoded and committed. Failures only
+    affect the PDF for which they occur.
 
-        # Determine new paths paths.
-        if bibtex:
-            name = generate_file_name(bibtex[0])
-            new_path_pdf = os.path.join(base, name + ".pdf")
-            new_path_json = os.path.join(base, name + ".json")
+    Commits are recorded in a journal in `cache_path`, which is locked while
+    the PDFs are cleaned. Commits which were interrupted by a previous run are
+    completed and reported first. Only then is the journal cleared, unless the
+    run is resumed. The journal is also cleared once all PDFs are processed.
+
+    Args:
+        files (list[str]): Paths of the PDFs.
+        workers (int, optional): Number of threads to extract with. Defaults
+            to `8`.
+        progress (bool, optional): Print progress to `stderr`. Defaults to
+            `False`.
+        resume (bool, optional): Resume an interrupted run: skip PDFs which
+            were committed by that run. Defaults to `False`.
+
+    Returns:
+        dict[str, object]: For every PDF, the new path of the PDF, or the
+            exception if cleaning the PDF failed.
+
+    Raises:
+        RuntimeError: If another process is cleaning PDFs.
+    """
+    files = list(files)
+    journal = Journal(os.path.join(config["cache_path"], "clean.journal"))
+    with journal.lock():
+        completed, rolled_back = journal.recover()
+        if completed or rolled_back:
+            print(
+                "Completed {} and rolled back {} interrupted commit(s).".format(
+                    completed, rolled_back
+                ),
+                file=sys.stderr,
+            )
+        if resume:
+            done = journal.completed()
+            files = [path for path in files if path not in done]
         else:
-            new_path_pdf = path_pdf
-            new_path_json = path_json
+            journal.clear()
+
+        results = {}
+
+        def record(path, result):
+            results[path] = result
+            if progress:
+                print(
+                    "\r{}/{}".format(len(results), len(files)), end="", file=sys.stderr
+                )
+
+        def finish(job, raw=None):
+            try:
+                if job["arxiv"]:
+                    update(job, raw)
+                with section("commit"):
+                    new_path = commit(job, journal)
+                record(job["path"], new_path)
+            except Exception as e:
+                record(job["path"], e)
+
+        def finish_fetched(future):
+            try:
+                entries = future.result()
+            except Exception as e:
+                warnings.warn("Could not fetch arXiv papers: {}.".format(e))
+                entries = {}
+            for job in fetches.pop(future):
+                finish(job, entries.get(job["arxiv"]))
+
+        batch = []
+        fetches = {}
+        with ThreadPoolExecutor(max_workers=workers) as extract_pool:
+            with ThreadPoolExecutor(max_workers=config["arxiv_workers"]) as fetch_pool:
+                extractions = {
+                    extract_pool.submit(_extract_section, path): path for path in files
+                }
+                num_extracting = len(extractions)
+                not_done = set(extractions)
+                while not_done:
+                    done, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future in fetches:
+                            finish_fetched(future)
+                            continue
+                        num_extracting -= 1
+                        try:
+                            job = future.result()
+                        except Exception as e:
+                            record(extractions[future], e)
+                            continue
+                        if not job["arxiv"]:
+                            finish(job)
+                            continue
+                        batch.append(job)
+
+                    # Send a batch when it is full or when all PDFs are extracted.
+                    if batch and (
+                        len(batch) >= config["arxiv_batch_size"] or not num_extracting
+                    ):
+                        identifiers = [job["arxiv"] for job in batch]
+                        future = fetch_pool.submit(_fetch_section, identifiers)
+                        fetches[future] = batch
+                        not_done.add(future)
+                        batch = []
+        journal.clear()
+        if progress:
+            print(file=sys.stderr)
+        return results
+
+
+def report(results):
+    """Print a summary of the results of :func:`run`.
 
-        # Move PDF and JSON.
-        os.rename(path_pdf, new_path_pdf)
-        if has_json:
-            os.unlink(path_json)
-        if bibtex:
-            with open(new_path_json, "w") as f:
-                json.dump(bibtex, f, sort_keys=True, indent=4)
+    Args:
+        results (dict[str, object]): Results.
+    """
+    failures = {k: v for k, v in results.items() if isinstance(v, Exception)}
+    renamed = [k for k, v in results.items() if k not in failures and k != v]
+    print(
+        "Cleaned {} file(s): {} renamed, {} unchanged, {} failed.".format(
+            len(results),
+            len(renamed),
+            len(results) - len(renamed) - len(failures),
+            len(failures),
+        )
+    )
+    for path, e in sorted(failures.items()):
+        print('Failed to clean "{}": {}'.format(path, e))
+
+
+def main(args):
+    def run_args():
+        return run(
+            args.files,
+            workers=args.workers,
+            progress=sys.stderr.isatty(),
+            resume=args.resume,
+        )
+
+    if args.profile is None:
+        results = run_args()
+    else:
+        with profile() as prof:
+            try:
+                results = run_args()
+            finally:
+                prof.write(args.profile)
+    report(results)
 
 
 if __name__ == "__main__":
@@ -62,4 +267,25 @@ if __name__ == "__main__":
     parser.add_argument(
         "files", type=str, help="files", action="store", default=False, nargs="+"
     )
+    parser.add_argument(
+        "--workers",
+        help="number of threads to extract PDFs with",
+        type=int,
+        action="store",
+        default=8,
+    )
+    parser.add_argument(
+        "--resume",
+        help="skip files which were cleaned by an interrupted run",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--profile",
+        help="print a profile of the encoders and the stages to stderr, or write "
+        "it as JSON to the given file",
+        nargs="?",
+        const="-",
+        default=None,
+    )
     main(parser.parse_args())
@@ -18,4 +18,25 @@ def main(args):
 if __name__ == "__main__":
     desc = "Clean all unprocessed arXiv PDFs."
     parser = argparse.ArgumentParser(prog="clean_arxiv.py", description=desc)
+    parser.add_argument(
+        "--workers",
+        help="number of threads to extract PDFs with",
+        type=int,
+        action="store",
+        default=8,
+    )
+    parser.add_argument(
+        "--resume",
+        help="skip files which were cleaned by an interrupted run",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--profile",
+        help="print a profile of the encoders and the stages to stderr, or write "
+        "it as JSON to the given file",
+        nargs="?",
+        const="-",
+        default=None,
+    )
     main(parser.parse_args())
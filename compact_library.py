@@ -0,0 +1,81 @@
+import argparse
+import json
+
+import catalogue.utils
+from catalogue.bibtex import compact_entry, expand_entry
+
+
+def convert(entries, expand=False):
+    """Compact or expand the raw dictionaries of entries.
+
+    Args:
+        entries (list[dict]): Encoded entries.
+        expand (bool, optional): Expand instead of compact. Defaults to
+            `False`.
+
+    Returns:
+        list[dict]: Converted entries.
+    """
+    converted = []
+    for entry in entries:
+        if expand:
+            if "raw_diff" in entry:
+                raw = expand_entry(entry)
+                entry = {k: v for k, v in entry.items() if k != "raw_diff"}
+                entry["raw"] = raw
+        else:
+            compacted = compact_entry(entry)
+            # Only compact if the raw dictionary can be reconstructed.
+            if "raw" in entry and expand_entry(compacted) == entry["raw"]:
+                entry = compacted
+        converted.append(entry)
+    return converted
+
+
+def main(args):
+    paths = catalogue.utils.list_files([".json"], indexed=True)
+    size_before, size_after, num_changed = 0, 0, 0
+    for path in paths:
+        with open(path) as f:
+            content = f.read()
+        entries = json.loads(content)
+        new_content = json.dumps(
+            convert(entries, expand=args.expand), sort_keys=True, indent=4
+        )
+        size_before += len(content.encode())
+        size_after += len(new_content.encode())
+        if new_content != content:
+            num_changed += 1
+            if not args.dry_run:
+                catalogue.utils.write_atomic(path, new_content)
+    print(
+        "{} {} of {} file(s): {:.2f} MB to {:.2f} MB ({:+.1f}%).".format(
+            "Would convert" if args.dry_run else "Converted",
+            num_changed,
+            len(paths),
+            size_before / 1e6,
+            size_after / 1e6,
+            100 * (size_after - size_before) / max(size_before, 1),
+        )
+    )
+
+
+if __name__ == "__main__":
+    desc = (
+        "Convert the JSON files of the library to store only the raw BiBTeX "
+        "fields which cannot be reproduced from the encoded fields."
+    )
+    parser = argparse.ArgumentParser(prog="compact_library.py", description=desc)
+    parser.add_argument(
+        "--expand",
+        help="convert back to storing all raw fields",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--dry-run",
+        help="only report the change in size",
+        action="store_true",
+        default=False,
+    )
+    main(parser.parse_args())
@@ -3,8 +3,38 @@ config = {
     "resource_path": "/Users/Wessel/Dropbox/Resources",
     # Path to this repository
     "catalogue_path": "/Users/Wessel/Dropbox/Projects/PyLib/Catalogue",
+    # Path to store caches and indices
+    "cache_path": "/Users/Wessel/Dropbox/Projects/PyLib/Catalogue/cache",
     # Prefix to remove from displayed paths
     "base_path": "/Users/Wessel/Dropbox",
+    # Fuzzy search backend: "fzf" to use the `fzf` binary or "python" to use the
+    # built-in matcher, which only returns the best `fuzzy_limit` matches
+    "fuzzy_backend": "fzf",
+    "fuzzy_limit": 50,
+    # Socket of the query server started by `serve.py`
+    "server_socket": "/Users/Wessel/Dropbox/Projects/PyLib/Catalogue/cache/server.sock",
+    # Content search backend: "mdfind" to use Spotlight or "index" to use the
+    # content index in `cache_path`, which is updated by `index_content.py`
+    "content_backend": "mdfind",
+    # arXiv API: URL, number of papers per query, number of simultaneous
+    # queries, seconds between queries, and seconds after which cached
+    # responses expire
+    "arxiv_url": "https://export.arxiv.org/api/query",
+    "arxiv_batch_size": 100,
+    "arxiv_workers": 1,
+    "arxiv_delay": 3,
+    "arxiv_ttl": 7 * 24 * 60 * 60,
+    # Store only the raw BiBTeX fields which cannot be reproduced from the
+    # encoded fields when writing JSON; see `compact_library.py`
+    "compact_raw": False,
+    # Number of encoded and decoded fields to cache, which speeds up encoding
+    # and decoding repeated journals, authors, and publishers; 0 disables the
+    # cache
+    "encoder_cache_size": 0,
+    # File with words to keep capitalised in titles in addition to the built-in
+    # ones, one per line; words starting with a protected word are also kept
+    # capitalised
+    "protected_terms": None,
     # System binaries
     "binaries": {
         "find": "/usr/bin/find",
@@ -14,6 +44,7 @@ config = {
         "pbpaste": "/usr/bin/pbpaste",
         "pbcopy": "/usr/bin/pbcopy",
         "trash": "/usr/local/bin/trash",
-        "pdfgrep": "/usr/local/bin/pdfgrep",
+        "pdftotext": "/usr/local/bin/pdftotext",
+        "djvutxt": "/usr/local/bin/djvutxt",
     },
 }
@@ -2,15 +2,18 @@ import argparse
 import json
 
 import catalogue.bin
-from catalogue.bibtex import decode
+from catalogue.bibtex import decode_iter
+
+
+def load(paths):
+    for path in paths:
+        with open(path) as f:
+            for entry in json.load(f):
+                yield entry
 
 
 def main(args):
-    entries = []
-    for entry in args.path:
-        with open(entry) as f:
-            entries.extend(json.load(f))
-    catalogue.bin.pbcopy(decode(entries))
+    catalogue.bin.pbcopy(decode_iter(load(args.path)))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+
+import catalogue.bin
+import catalogue.utils
+from catalogue.dedup import find_duplicates, merge_entries, preferred
+
+
+def load(paths):
+    """Load the entries of JSON files.
+
+    Args:
+        paths (list[str]): Paths of the JSON files.
+
+    Returns:
+        tuple[dict[str, list[dict]], list[tuple[str, int]]]: For every file,
+            its entries, and, for every entry, the path of its file and its
+            position in the file.
+    """
+    files, locations = {}, []
+    for path in sorted(paths):
+        with open(path) as f:
+            files[path] = json.load(f)
+        locations.extend((path, i) for i in range(len(files[path])))
+    return files, locations
+
+
+def report(groups, files, locations):
+    """Print the groups of duplicates. The entry which is kept when merging is
+    marked by `*`.
+
+    Args:
+        groups (list[tuple[list[int], list[str]]]): Groups of duplicates from
+            :func:`.dedup.find_duplicates`.
+        files (dict[str, list[dict]]): Entries of every file.
+        locations (list[tuple[str, int]]): File and position of every entry.
+    """
+    for indices, reasons in groups:
+        entries = [files[path][i] for path, i in (locations[j] for j in indices)]
+        keep = preferred(entries)
+        print("Duplicates by {}:".format(", ".join(reasons)))
+        for k, (j, entry) in enumerate(zip(indices, entries)):
+            print(
+                '  {} "{}" in "{}": {}'.format(
+                    "*" if k == keep else " ",
+                    entry.get("id"),
+                    locations[j][0],
+                    entry.get("title"),
+                )
+            )
+    num_entries = sum(len(indices) for indices, _ in groups)
+    print(
+        "Found {} group(s) of duplicates with {} entries in total.".format(
+            len(groups), num_entries
+        )
+    )
+
+
+def merge(groups, files, locations, dry_run=False):
+    """Merge every group of duplicates into one entry, see
+    :func:`.dedup.merge_entries`. The merged entry replaces the entry which
+    is kept and the other entries are removed from their files. A file which
+    has no entries left is moved to trash together with its PDF.
+
+    Args:
+        groups (list[tuple[list[int], list[str]]]): Groups of duplicates from
+            :func:`.dedup.find_duplicates`.
+        files (dict[str, list[dict]]): Entries of every file.
+        locations (list[tuple[str, int]]): File and position of every entry.
+        dry_run (bool, optional): Only print what would be changed. Defaults
+            to `False`.
+
+    Returns:
+        tuple[int, int]: Number of files changed and moved to trash.
+    """
+    updated = {path: list(entries) for path, entries in files.items()}
+    changed = set()
+    for indices, _ in groups:
+        group = [locations[j] for j in indices]
+        entries = [files[path][i] for path, i in group]
+        keep = preferred(entries)
+        for k, (path, i) in enumerate(group):
+            updated[path][i] = merge_entries(entries) if k == keep else None
+            changed.add(path)
+
+    num_changed, num_trashed = 0, 0
+    for path in sorted(changed):
+        remaining = [entry for entry in updated[path] if entry is not None]
+        if remaining:
+            num_changed += 1
+            if dry_run:
+                print('Would update "{}".'.format(path))
+            else:
+                content = json.dumps(remaining, sort_keys=True, indent=4)
+                catalogue.utils.write_atomic(path, content)
+            continue
+        num_trashed += 1
+        path_pdf = catalogue.utils.ext_change(path, ".pdf")
+        for path_trash in [path, path_pdf]:
+            if not os.path.exists(path_trash):
+                continue
+            if dry_run:
+                print('Would move "{}" to trash.'.format(path_trash))
+            else:
+                catalogue.bin.trash(path_trash)
+    return num_changed, num_trashed
+
+
+def main(args):
+    files, locations = load(catalogue.utils.list_files([".json"], indexed=True))
+    entries = [files[path][i] for path, i in locations]
+    groups = find_duplicates(entries, threshold=args.threshold)
+    report(groups, files, locations)
+    if args.merge:
+        num_changed, num_trashed = merge(groups, files, locations, dry_run=args.dry_run)
+        print(
+            "{} {} file(s) and {} {} file(s) to trash.".format(
+                "Would update" if args.dry_run else "Updated",
+                num_changed,
+                "would move" if args.dry_run else "moved",
+                num_trashed,
+            )
+        )
+
+
+if __name__ == "__main__":
+    desc = (
+        "Find entries in the library which are likely the same paper, like an "
+        "arXiv version and a published version, and optionally merge them."
+    )
+    parser = argparse.ArgumentParser(prog="deduplicate.py", description=desc)
+    parser.add_argument(
+        "--threshold",
+        help="minimum similarity of the words of two titles",
+        type=float,
+        action="store",
+        default=0.8,
+    )
+    parser.add_argument(
+        "--merge",
+        help="merge every group into the entry marked by *",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--dry-run",
+        help="only print what merging would change",
+        action="store_true",
+        default=False,
+    )
+    main(parser.parse_args())
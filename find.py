@@ -2,22 +2,40 @@ import argparse
 
 import catalogue.alfred
 import catalogue.bin
+import catalogue.client
+import catalogue.fuzzy
 import catalogue.utils
 from config import config
 
 
 def main(args):
     query = " ".join(args.query)
+
+    # Let the query server handle the query if it is running.
+    if config["server_socket"]:
+        out = catalogue.client.query_server(
+            config["server_socket"],
+            {"query": query, "json": args.json, "content": args.content},
+        )
+        if out is not None:
+            print(out)
+            return
+
     if args.json:
         extensions = [".json"]
     else:
         extensions = [".pdf", ".djvu", ".epub"]
     if args.content:
-        files = catalogue.bin.mdfind(config["resource_path"], query)
-        files = catalogue.utils.file_filter(files, extensions)
+        files = catalogue.utils.search_content(query, extensions)
+    elif config["fuzzy_backend"] == "python":
+        files = catalogue.fuzzy.fuzzy_search(
+            catalogue.utils.list_files(extensions, indexed=True),
+            query,
+            limit=config["fuzzy_limit"],
+        )
     else:
         files = catalogue.bin.fzf(
-            "\n".join(catalogue.utils.list_files(extensions)), query
+            "\n".join(catalogue.utils.list_files(extensions, indexed=True)), query
         )
     print(catalogue.alfred.list_json(files, config["base_path"]))
 
@@ -0,0 +1,367 @@
+import argparse
+import functools
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import catalogue.utils
+from catalogue.bibtex import encode_entry, generate_file_name, protected_terms_key
+from catalogue.parallel import parallel_map
+from catalogue.profiling import profile, section
+from catalogue.reader import read_bibtex
+from config import config
+
+
+def list_bibtex(sources):
+    """List BiBTeX files.
+
+    Args:
+        sources (list[str]): BiBTeX files and directories to search for BiBTeX
+            files.
+
+    Returns:
+        list[str]: Paths of the BiBTeX files.
+    """
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                paths.extend(
+                    os.path.join(root, name)
+                    for name in sorted(files)
+                    if os.path.splitext(name)[1] == ".bib"
+                )
+        elif os.path.isfile(source):
+            paths.append(source)
+        else:
+            raise ValueError('"{}" is not a file or directory.'.format(source))
+    return paths
+
+
+def _read_files(paths):
+    for path in paths:
+        try:
+            for raw in read_bibtex(path):
+                yield path, raw
+        except (OSError, UnicodeDecodeError, RuntimeError) as e:
+            # Report the error and continue with the next file.
+            yield path, RuntimeError('Could not read "{}": {}'.format(path, e))
+
+
+def _encode(item, compact, protected):
+    path, raw = item
+    if isinstance(raw, Exception):
+        return path, raw
+    # Return the exception instead of raising it, so one entry which cannot be
+    # encoded does not stop the import.
+    try:
+        return path, encode_entry(
+            raw, generate_ids=True, compact=compact, protected=protected
+        )
+    except Exception as e:
+        return path, RuntimeError(
+            'Could not encode entry "{}": {!r}.'.format(raw.get("id"), e)
+        )
+
+
+def encode_files(paths, workers=1):
+    """Encode BiBTeX files entry by entry, generating IDs. All files are
+    encoded by the same pool of processes.
+
+    Args:
+        paths (list[str]): Paths of the BiBTeX files.
+        workers (int, optional): Number of processes to encode with. Defaults
+            to `1`.
+
+    Returns:
+        generator[tuple[str, object]]: For every entry, the path of the BiBTeX
+            file and the encoded entry, or the exception if encoding the entry
+            failed. If reading a file fails, the exception is generated
+            instead of the remaining entries of the file.
+    """
+    encode = functools.partial(
+        _encode, compact=config["compact_raw"], protected=protected_terms_key()
+    )
+    return parallel_map(encode, _read_files(paths), workers=workers)
+
+
+def write_files(files, threads=8, batch_size=256):
+    """Write files with a pool of threads. The files are written in batches:
+    all files of a batch are first written to temporary files and flushed to
+    disk, which then replace the files. Finally, the directories of the batch
+    are flushed to disk. Every file is therefore either absent or complete,
+    even if the import is interrupted.
+
+    Args:
+        files (iterable[tuple[str, str]]): For every file, the path and the
+            content.
+        threads (int, optional): Number of threads to write with. Defaults to
+            `8`.
+        batch_size (int, optional): Number of files to write before flushing
+            their directories to disk. Defaults to `256`.
+
+    Returns:
+        int: Number of files written.
+    """
+    files = list(files)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for start in range(0, len(files), batch_size):
+            batch = files[start : start + batch_size]
+            paths_tmp = list(pool.map(lambda x: catalogue.utils.write_tmp(*x), batch))
+            for (path, _), path_tmp in zip(batch, paths_tmp):
+                os.replace(path_tmp, path)
+            directories = {os.path.dirname(os.path.abspath(path)) for path, _ in batch}
+            list(pool.map(catalogue.utils.sync_directory, sorted(directories)))
+    return len(files)
+
+
+def _library_ids(paths):
+    ids = {}
+    for path in paths:
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for entry in entries:
+            if "id" in entry:
+                label = {"id": entry["id"], "file": path}
+                ids.setdefault(entry["id"].lower(), []).append(label)
+    return ids
+
+
+def run(
+    sources,
+    pdfs,
+    library=(),
+    workers=1,
+    threads=8,
+    batch_size=256,
+    overwrite=False,
+    dry_run=False,
+    progress=False,
+):
+    """Import BiBTeX files: encode every entry, generating its ID, and write
+    it to the JSON of the PDF named after the entry by
+    :func:`.bibtex.generate_file_name`.
+
+    An entry is not written if no PDF or more than one PDF has its name, if
+    more than one entry matches the same PDF, or if the PDF already has a JSON
+    and `overwrite` is not set. Entries with the same ID as another entry or
+    as an entry in the library are written, but are reported as collisions.
+
+    Args:
+        sources (list[str]): BiBTeX files and directories to search for BiBTeX
+            files.
+        pdfs (iterable[str]): Paths of the PDFs in the library.
+        library (iterable[str], optional): Paths of the JSON in the library.
+            Entries in these files are checked for ID collisions too.
+        workers (int, optional): Number of processes to encode with. Defaults
+            to `1`.
+        threads (int, optional): Number of threads to write with. Defaults to
+            `8`.
+        batch_size (int, optional): Number of files to write before flushing
+            their directories to disk. Defaults to `256`.
+        overwrite (bool, optional): Overwrite existing JSON. Defaults to
+            `False`.
+        dry_run (bool, optional): Do not write anything. Defaults to `False`.
+        progress (bool, optional): Print progress to `stderr`. Defaults to
+            `False`.
+
+    Returns:
+        dict: Results: the number of entries, the written JSON, and, for every
+            kind of problem, the entries for which it occurred. Entries are
+            identified by their ID and the BiBTeX or JSON file.
+    """
+    # Index the PDFs by name.
+    by_name = {}
+    for path_pdf in pdfs:
+        name = os.path.splitext(os.path.basename(path_pdf))[0]
+        by_name.setdefault(name, []).append(path_pdf)
+
+    results = {
+        "entries": 0,
+        "written": [],
+        "existing": [],
+        "failed": [],
+        "unmatched": [],
+        "ambiguous": [],
+        "conflicts": [],
+        "collisions": {},
+    }
+    with section("library"):
+        ids = _library_ids(library)
+    matches = {}
+    with section("encode"):
+        for path_bib, entry in encode_files(list_bibtex(sources), workers=workers):
+            results["entries"] += 1
+            if progress:
+                print("\r{}".format(results["entries"]), end="", file=sys.stderr)
+            if isinstance(entry, Exception):
+                results["failed"].append({"file": path_bib, "error": str(entry)})
+                continue
+
+            label = {"id": entry["id"], "file": path_bib}
+            ids.setdefault(entry["id"].lower(), []).append(label)
+            try:
+                name = generate_file_name(entry)
+            except (KeyError, IndexError):
+                # The entry lacks the author, year, or title.
+                name = None
+            candidates = by_name.get(name, [])
+            if len(candidates) == 0:
+                results["unmatched"].append(label)
+            elif len(candidates) > 1:
+                results["ambiguous"].append(dict(label, pdfs=candidates))
+            else:
+                matches.setdefault(candidates[0], []).append((label, entry))
+    if progress:
+        print(file=sys.stderr)
+
+    files = []
+    for path_pdf, matched in sorted(matches.items()):
+        if len(matched) > 1:
+            results["conflicts"].append(
+                {"pdf": path_pdf, "entries": [label for label, _ in matched]}
+            )
+            continue
+        path_json = catalogue.utils.ext_change(path_pdf, ".json")
+        if os.path.exists(path_json) and not overwrite:
+            results["existing"].append(path_json)
+            continue
+        _, entry = matched[0]
+        files.append((path_json, json.dumps([entry], sort_keys=True, indent=4)))
+    results["written"] = [path for path, _ in files]
+    # Entries in JSON which is overwritten do not collide.
+    written = set(results["written"])
+    for entry_id, labels in ids.items():
+        labels = [label for label in labels if label["file"] not in written]
+        if len(labels) > 1:
+            results["collisions"][labels[0]["id"]] = labels
+
+    if not dry_run:
+        with section("write"):
+            write_files(files, threads=threads, batch_size=batch_size)
+    return results
+
+
+def report(results, dry_run=False):
+    """Print a summary of the results of :func:`run` and the ID collisions.
+
+    Args:
+        results (dict): Results.
+        dry_run (bool, optional): The results are of a dry run. Defaults to
+            `False`.
+    """
+    print(
+        "Imported {} entries: {} {}, {} with existing JSON, {} failed, "
+        "{} unmatched, {} matching more than one PDF, {} matching the same PDF "
+        "as another entry, and {} ID collision(s).".format(
+            results["entries"],
+            len(results["written"]),
+            "would be written" if dry_run else "written",
+            len(results["existing"]),
+            len(results["failed"]),
+            len(results["unmatched"]),
+            len(results["ambiguous"]),
+            sum(len(conflict["entries"]) for conflict in results["conflicts"]),
+            len(results["collisions"]),
+        )
+    )
+    for entry_id, labels in sorted(results["collisions"].items()):
+        print(
+            'ID "{}" occurs {} times: {}.'.format(
+                entry_id,
+                len(labels),
+                ", ".join('"{}" in "{}"'.format(x["id"], x["file"]) for x in labels),
+            )
+        )
+
+
+def main(args):
+    def run_args():
+        return run(
+            args.sources,
+            catalogue.utils.list_files([".pdf"], indexed=True),
+            library=catalogue.utils.list_files([".json"], indexed=True),
+            workers=args.workers,
+            threads=args.threads,
+            batch_size=args.batch_size,
+            overwrite=args.overwrite,
+            dry_run=args.dry_run,
+            progress=sys.stderr.isatty(),
+        )
+
+    if args.profile is None:
+        results = run_args()
+    else:
+        with profile() as prof:
+            try:
+                results = run_args()
+            finally:
+                prof.write(args.profile)
+    report(results, dry_run=args.dry_run)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    desc = (
+        "Import BiBTeX files: write every entry to the JSON of the PDF in the "
+        "library which is named after the entry."
+    )
+    parser = argparse.ArgumentParser(prog="import_bibtex.py", description=desc)
+    parser.add_argument(
+        "sources", help="BiBTeX files or directories with BiBTeX files", nargs="+"
+    )
+    parser.add_argument(
+        "--workers",
+        help="number of processes to encode with",
+        type=int,
+        action="store",
+        default=1,
+    )
+    parser.add_argument(
+        "--threads",
+        help="number of threads to write JSON with",
+        type=int,
+        action="store",
+        default=8,
+    )
+    parser.add_argument(
+        "--batch-size",
+        help="number of JSON files to write before flushing them to disk",
+        type=int,
+        action="store",
+        default=256,
+    )
+    parser.add_argument(
+        "--overwrite",
+        help="overwrite existing JSON",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--dry-run",
+        help="only report what would be written",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--report",
+        help="write the unmatched entries and other problems as JSON to this file",
+        action="store",
+        default=None,
+    )
+    parser.add_argument(
+        "--profile",
+        help="print a profile of the encoders and the stages to stderr, or write "
+        "it as JSON to the given file",
+        nargs="?",
+        const="-",
+        default=None,
+    )
+    main(parser.parse_args())
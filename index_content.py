@@ -0,0 +1,43 @@
+import argparse
+import os
+
+import catalogue.utils
+from catalogue.search import ContentIndex
+from catalogue.text import default_store
+from config import config
+
+
+def main(args):
+    store = default_store()
+    path = os.path.join(config["cache_path"], "content.sqlite")
+    with ContentIndex(path, store=store) as index:
+        if args.full:
+            store.clear()
+            index.clear()
+        files = catalogue.utils.list_files([".pdf", ".djvu", ".epub"], indexed=True)
+        num_indexed = index.update(files, workers=args.workers)
+    # Remove the texts of deleted or changed files.
+    num_removed = store.prune(files)
+    print(
+        f"Indexed {num_indexed} new or changed file(s) and removed {num_removed} "
+        "stale text(s)."
+    )
+
+
+if __name__ == "__main__":
+    desc = "Update the content index searched by find.py --content."
+    parser = argparse.ArgumentParser(prog="index_content.py", description=desc)
+    parser.add_argument(
+        "--full",
+        help="extract all files instead of only new or changed files",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--workers",
+        help="number of processes to extract with",
+        type=int,
+        action="store",
+        default=1,
+    )
+    main(parser.parse_args())
@@ -4,11 +4,16 @@ import json
 import catalogue.bin
 from catalogue.bibtex import encode
 from catalogue.utils import ext_change
+from config import config
 
 
 def main(args):
     out = json.dumps(
-        encode(catalogue.bin.pbpaste(), generate_ids=True), indent=4, sort_keys=True
+        encode(
+            catalogue.bin.pbpaste(), generate_ids=True, compact=config["compact_raw"]
+        ),
+        indent=4,
+        sort_keys=True,
     )
     print(out)
     if args.write:
@@ -0,0 +1,21 @@
+import argparse
+
+import catalogue.server
+from config import config
+
+
+def main(args):
+    catalogue.server.serve(config["server_socket"], refresh_interval=args.refresh)
+
+
+if __name__ == "__main__":
+    desc = "Run a server which keeps the file index warm and answers find.py."
+    parser = argparse.ArgumentParser(prog="serve.py", description=desc)
+    parser.add_argument(
+        "--refresh",
+        help="seconds between refreshes of the file index",
+        type=float,
+        action="store",
+        default=5,
+    )
+    main(parser.parse_args())
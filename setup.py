@@ -3,7 +3,6 @@ from setuptools import find_packages, setup
 requirements = [
     "numpy>=1.16",
     "titlecase",
-    "bibtexparser",
     "feedparser",
     "plum-dispatch>=1",
 ]
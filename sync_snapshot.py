@@ -0,0 +1,27 @@
+import argparse
+import os
+
+import catalogue.utils
+from catalogue.snapshot import sync_snapshot
+from config import config
+
+
+def main(args):
+    path = os.path.join(config["cache_path"], "library.snapshot")
+    if args.full and os.path.exists(path):
+        os.remove(path)
+    paths = list(catalogue.utils.list_files([".json"], indexed=True))
+    num_read = sync_snapshot(path, paths)
+    print(f"Read {num_read} new or changed file(s) of {len(paths)}.")
+
+
+if __name__ == "__main__":
+    desc = "Bring the snapshot of the library up to date with the JSON files."
+    parser = argparse.ArgumentParser(prog="sync_snapshot.py", description=desc)
+    parser.add_argument(
+        "--full",
+        help="read all files instead of only new or changed files",
+        action="store_true",
+        default=False,
+    )
+    main(parser.parse_args())
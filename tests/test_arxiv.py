@@ -0,0 +1,116 @@
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from catalogue.arxiv import ResponseCache, fetch_arxiv_batch
+from catalogue.bibtex import fetch_arxiv
+from config import config
+
+_feed = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+<title>arXiv Query</title>
+{entries}
+</feed>
+"""
+
+_entry = """<entry>
+<id>http://arxiv.org/abs/{identifier}v2</id>
+<published>2020-03-01T00:00:00Z</published>
+<title>{title}</title>
+<author><name>First Author</name></author>
+<author><name>Second Author</name></author>
+</entry>
+"""
+
+_papers = {"1234.56789": "Paper One", "math/0501001": "Paper Two"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.queries.append(self.path)
+        if self.server.fail:
+            self.send_error(500)
+            return
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        entries = [
+            _entry.format(identifier=identifier, title=_papers[identifier])
+            for identifier in query["id_list"][0].split(",")
+            if identifier in _papers
+        ]
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(_feed.format(entries="".join(entries)).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def server():
+    server = HTTPServer(("127.0.0.1", 0), _Handler)
+    server.queries = []
+    server.fail = False
+    server.url = "http://127.0.0.1:{}/api/query".format(server.server_port)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_arxiv_batch(server, tmp_path):
+    cache = ResponseCache(str(tmp_path / "arxiv"), 60)
+    identifiers = ["1234.56789", "math/0501001", "9999.99999"]
+
+    def fetch():
+        return fetch_arxiv_batch(
+            identifiers, batch_size=2, workers=2, delay=0, cache=cache, url=server.url
+        )
+
+    results = fetch()
+    assert len(server.queries) == 2
+    assert results["1234.56789"] == {
+        "type": "article",
+        "title": "Paper One",
+        "author": "First Author and Second Author",
+        "year": 2020,
+        "month": 3,
+        "eprint": "1234.56789",
+        "journal": "arXiv E-Prints",
+    }
+    assert results["math/0501001"]["eprint"] == "math/0501001"
+    assert results["9999.99999"] is None
+
+    # The second time, all responses come from the cache.
+    assert fetch() == results
+    assert len(server.queries) == 2
+
+    # Expired responses are fetched again.
+    cache.ttl = -1
+    assert fetch() == results
+    assert len(server.queries) == 4
+
+
+def test_fetch_arxiv_batch_failure(server, tmp_path):
+    server.fail = True
+    cache = ResponseCache(str(tmp_path / "arxiv"), 60)
+    with pytest.warns(UserWarning, match="Could not query arXiv"):
+        results = fetch_arxiv_batch(
+            ["1234.56789"], delay=0, cache=cache, url=server.url
+        )
+    assert results == {}
+
+    # Failures are not cached.
+    server.fail = False
+    results = fetch_arxiv_batch(["1234.56789"], delay=0, cache=cache, url=server.url)
+    assert results["1234.56789"]["title"] == "Paper One"
+
+
+def test_fetch_arxiv(server, tmp_path, monkeypatch):
+    monkeypatch.setitem(config, "arxiv_url", server.url)
+    monkeypatch.setitem(config, "arxiv_delay", 0)
+    monkeypatch.setitem(config, "cache_path", str(tmp_path / "cache"))
+    assert fetch_arxiv(None, ("", "1234.56789"))[0]["title"] == "Paper One"
+    with pytest.raises(RuntimeError):
+        fetch_arxiv(None, ("", "9999.99999"))
@@ -1,4 +1,26 @@
-from catalogue.bibtex import AuthorEncoder, StringEncoder
+import io
+import os
+
+import pytest
+
+from catalogue.bibtex import (
+    AuthorEncoder,
+    MonthEncoder,
+    StringEncoder,
+    TitleEncoder,
+    Trie,
+    compact_entry,
+    decode,
+    decode_entry,
+    decode_iter,
+    decode_to,
+    encode,
+    encode_iter,
+    encoder_cache_clear,
+    encoder_cache_info,
+    expand_entry,
+)
+from config import config
 
 
 def test_authorencoder():
@@ -33,3 +55,217 @@ def test_stringencoder():
         assert StringEncoder().encode("pre{{\\{} {{e}}}}post".format(k)) == res
         assert StringEncoder().encode("pre{{\\{}  {{e}}}}post" "".format(k)) == res
         assert StringEncoder().decode(res, None) == "pre{{\\{} e}}post".format(k)
+
+    # Test encoding of TeX commands and hard-coded spaces.
+    assert StringEncoder().encode("{\\AA}ngstr\\\"om") == "\u212Bngstro\u0308m"
+    assert StringEncoder().encode("S\\o ren~and \\aa{}") == "S\xF8 ren and \xE5"
+    assert StringEncoder().encode("~x\\~n") == " xn\u0303"
+    assert StringEncoder().decode("S\xF8ren \xE6", None) == "S{\\o}ren {\\ae}"
+
+    # The output should be that of the original implementation, also for
+    # unusual input.
+    assert StringEncoder().encode("A\\\\O") == "A\\\xD8"
+    assert StringEncoder().encode("Title\\\\\nSubtitle") == "Title\\\\\nSubtitle"
+    assert StringEncoder().encode("a~~") == "a ~"
+    assert StringEncoder().encode("a~~~b") == "a ~ b"
+    with pytest.raises(RuntimeError, match="cannot map modifier"):
+        StringEncoder().encode("A\\\\x")
+    assert StringEncoder().decode("e\u0301\u0302x", None) == "{\\' e{\\^ }}x"
+    entry = encode([{"type": "book", "id": "x", "title": "Title\\\\\nSubtitle"}])
+    assert entry[0]["title"] == "Title\\\\\nSubtitle"
+
+
+def test_monthencoder():
+    for month in [4, "4", "04", "apr", "Apr.", "April", "APRIL", "1 April 2020"]:
+        assert MonthEncoder().encode(month) == 4
+    assert MonthEncoder().decode(12, None) == "Dec"
+    assert MonthEncoder().encode("Sept.") == 9
+    assert MonthEncoder().encode("May") == 5
+
+    # Ambiguous and unknown months should raise an error.
+    for month in ["jan--feb", "Summer", 13]:
+        with pytest.raises(RuntimeError, match="Could not match month"):
+            MonthEncoder().encode(month)
+
+
+def test_trie():
+    trie = Trie(["Bayes", "GP", "Gauss"])
+    assert trie.is_prefix_of("Bayesian")
+    assert trie.is_prefix_of("GP")
+    assert trie.is_prefix_of("Gaussian")
+    assert not trie.is_prefix_of("Bay")
+    assert not trie.is_prefix_of("Gamma")
+    assert not trie.is_prefix_of("")
+    assert Trie([""]).is_prefix_of("anything")
+
+
+def test_titleencoder(tmp_path, monkeypatch):
+    def decode(title):
+        return TitleEncoder().decode(title, None)
+
+    assert decode("A GP-Based Model: Bayesian/$x$ Inference") == (
+        "{A} {GP}-Based Model: {Bayesian}/{$x$} Inference"
+    )
+    assert decode("Using ODEs and 3D Priors") == "Using {ODEs} and {3D} Priors"
+    # Only the concatenation of "Fisher" and "Fokker" is protected.
+    assert decode("Fisher Information") == "Fisher Information"
+
+    # Load additional protected words from a file.
+    path = tmp_path / "protected.txt"
+    path.write_text("# Comment\n\nFisher\nLaplace\n")
+    with monkeypatch.context() as m:
+        m.setitem(config, "protected_terms", str(path))
+        assert decode("Fisher-Laplace Information") == (
+            "{Fisher}-{Laplace} Information"
+        )
+    assert decode("Fisher Information") == "Fisher Information"
+
+
+def test_titleencoder_protected_terms_change(tmp_path, monkeypatch, encoder_cache):
+    path = tmp_path / "protected.txt"
+    path.write_text("Fisher\n")
+    monkeypatch.setitem(config, "protected_terms", str(path))
+    entry = {"type": "article", "id": "key", "title": "Laplace Approximations"}
+    assert "{Laplace}" not in decode_entry(entry)
+
+    # Changing the file should rebuild the trie and clear the encoder cache,
+    # even if the path stays the same.
+    path.write_text("Fisher\nLaplace\n")
+    assert "{Laplace}" in decode_entry(entry)
+
+
+def test_protected_terms_read_once(tmp_path, monkeypatch, encoder_cache):
+    path = tmp_path / "protected.txt"
+    path.write_text("Laplace\n")
+    monkeypatch.setitem(config, "protected_terms", str(path))
+    entries = [{"type": "article", "id": str(i), "title": "Laplace"} for i in range(5)]
+
+    # The file of protected words should be checked once per run rather than
+    # for every title.
+    stats = []
+    stat = os.stat
+
+    def counted_stat(*args, **kw_args):
+        stats.append(args)
+        return stat(*args, **kw_args)
+
+    monkeypatch.setattr(os, "stat", counted_stat)
+    assert decode(entries).count("{Laplace}") == 5
+    assert len(stats) == 1
+
+
+def test_decode_iter():
+    entries = [
+        {"type": "proceedings", "id": "proc", "title": "Proceedings"},
+        {"type": "inproceedings", "id": "a", "title": "A", "crossref": "proc"},
+        {"type": "article", "id": "b", "title": "B"},
+        {"type": "article", "id": "A", "title": "Duplicate"},
+    ]
+    expected = [decode_entry(entries[i]) for i in [1, 2, 0]]
+
+    # Check that proceedings are moved to the end and that duplicates are
+    # dropped.
+    with pytest.warns(UserWarning, match="Duplicate ID"):
+        assert list(decode_iter(iter(entries))) == expected
+    with pytest.warns(UserWarning, match="Duplicate ID"):
+        assert decode(entries) == "".join(expected)
+    f = io.StringIO()
+    with pytest.warns(UserWarning, match="Duplicate ID"):
+        decode_to(f, entries)
+    assert f.getvalue() == "".join(expected)
+
+
+def test_compact():
+    raw = {
+        "type": "Article",
+        "id": "key",
+        "title": "A {GP} model",
+        "author": "Last, First",
+        "journal": "Journal",
+        "year": "2020",
+        "pages": "1--10",
+        "month": "jan",
+        "abstract": "Abstract.",
+    }
+    encoded = encode([raw])[0]
+    encoded["id"] = "key"
+    compacted = compact_entry(encoded)
+    assert "raw" not in compacted
+
+    # Fields which are reproduced from the encoded fields should not be stored.
+    assert compacted["raw_diff"] == {
+        "type": "Article",
+        "title": "A {GP} model",
+        "author": "Last, First",
+        "month": "jan",
+        "abstract": "Abstract.",
+    }
+    assert expand_entry(compacted) == raw
+
+    # Re-encoding and decoding should not change.
+    assert encode([compacted]) == encode([encoded])
+    assert decode([compacted]) == decode([encoded])
+    assert encode([raw], compact=True)[0]["raw_diff"]["id"] == "key"
+
+    # Fields which are not raw fields should not be reconstructed.
+    encoded = encode([{"type": "article", "title": "Title"}])[0]
+    encoded["id"] = "generated"
+    compacted = compact_entry(encoded)
+    assert compacted["raw_diff"] == {"id": None}
+    assert expand_entry(compacted) == {"type": "article", "title": "Title"}
+
+
+@pytest.fixture()
+def encoder_cache(monkeypatch):
+    monkeypatch.setitem(config, "encoder_cache_size", 4)
+    encoder_cache_clear()
+    yield
+    monkeypatch.undo()
+    encoder_cache_clear()
+
+
+def test_encoder_cache(encoder_cache):
+    raw = {
+        "type": "article",
+        "id": "key",
+        "author": "Last, First",
+        "journal": "arXiv preprint",
+        "year": "2020",
+    }
+    entry = encode([raw])[0]
+    entry["id"] = "key"
+    assert encoder_cache_info().misses == 2
+    assert encode([raw])[0] == {k: v for k, v in entry.items() if k != "id"}
+    assert encoder_cache_info().hits == 2
+
+    # Cached lists should not be modified by callers.
+    entry["author"].append("Other")
+    assert encode([raw])[0]["author"] == ["First Last"]
+
+    # The journal of an arXiv paper depends on the eprint.
+    assert "journal = {arXiv preprint}" in decode_entry(entry)
+    entry["eprint"] = "1234.5678"
+    assert "journal = {arXiv preprint arXiv:1234.5678}" in decode_entry(entry)
+
+    # The cache should be bounded.
+    assert encoder_cache_info().currsize == 4
+
+
+def test_encode_iter(tmp_path):
+    text = (
+        "@article{key1, title = {First Title}, author = {Last, First}, year = 2020}\n"
+        "@article{key2, title = {Second Title}, author = {Other, Name}, year = 2021}\n"
+    )
+    path = str(tmp_path / "library.bib")
+    with open(path, "w") as f:
+        f.write(text)
+
+    entries = encode_iter(path)
+    assert not isinstance(entries, list)
+    entries = list(entries)
+    assert entries == encode(text)
+    assert [entry["raw"]["id"] for entry in entries] == ["key1", "key2"]
+    assert entries[0]["author"] == ["First Last"]
+    assert list(encode_iter(io.StringIO(text), generate_ids=True)) == encode(
+        text, generate_ids=True
+    )
@@ -0,0 +1,64 @@
+import json
+
+from catalogue.bibtex import decode_entry
+from catalogue.cache import DecodeCache
+from config import config
+
+
+def _entry(entry_id, title):
+    return {"type": "article", "id": entry_id, "title": title, "year": 2020}
+
+
+def test_decodecache(tmp_path):
+    path_json = str(tmp_path / "paper.json")
+    path_cache = str(tmp_path / "cache.json")
+
+    with open(path_json, "w") as f:
+        json.dump([_entry("a", "First")], f)
+    cache = DecodeCache(path_cache)
+    cache.update([path_json])
+    assert cache.blocks(path_json) == [
+        ("article", "a", decode_entry(_entry("a", "First")))
+    ]
+    cache.save()
+
+    # Check that the cache is loaded from disk.
+    cache = DecodeCache(path_cache)
+    assert cache.files[path_json]["blocks"][0][1] == "a"
+
+    # Changing the file should invalidate the cache.
+    with open(path_json, "w") as f:
+        json.dump([_entry("b", "Second Title")], f)
+    cache.update([path_json], workers=2)
+    assert cache.blocks(path_json) == [
+        ("article", "b", decode_entry(_entry("b", "Second Title")))
+    ]
+
+    # Files which are not listed should be removed.
+    cache.update([])
+    assert cache.files == {}
+
+
+def test_decodecache_protected_terms(tmp_path, monkeypatch):
+    path_json = str(tmp_path / "paper.json")
+    path_cache = str(tmp_path / "cache.json")
+    path_terms = str(tmp_path / "protected.txt")
+    with open(path_json, "w") as f:
+        json.dump([_entry("a", "Laplace Approximations")], f)
+    with open(path_terms, "w") as f:
+        f.write("Fisher\n")
+    monkeypatch.setitem(config, "protected_terms", path_terms)
+
+    cache = DecodeCache(path_cache)
+    cache.update([path_json])
+    cache.save()
+    assert "{Laplace}" not in cache.blocks(path_json)[0][2]
+    assert DecodeCache(path_cache).files
+
+    # Changing the protected words should invalidate the cache.
+    with open(path_terms, "w") as f:
+        f.write("Fisher\nLaplace\n")
+    cache = DecodeCache(path_cache)
+    assert cache.files == {}
+    cache.update([path_json])
+    assert "{Laplace}" in cache.blocks(path_json)[0][2]
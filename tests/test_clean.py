@@ -0,0 +1,98 @@
+import json
+import os
+import stat
+
+from catalogue.journal import Journal
+from clean import report, run
+from config import config
+from .test_arxiv import server
+
+_pdftotext = """#!/bin/sh
+case "$4" in
+    *arxiv.pdf) printf 'arXiv:1234.56789v2 [stat.ML] 1 Jan 2020\\n' ;;
+    *unknown.pdf) printf 'arXiv:9999.99999v1 [stat.ML] 1 Jan 2020\\n' ;;
+    *) printf 'Title\\n' ;;
+esac
+"""
+
+_bibtex = [
+    {
+        "type": "article",
+        "id": "Old:2019:Key",
+        "author": ["Some Author"],
+        "year": 2019,
+        "title": "Title",
+    }
+]
+
+
+def _write(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_run(server, tmp_path, monkeypatch, capsys):
+    path_bin = str(tmp_path / "pdftotext")
+    _write(path_bin, _pdftotext)
+    os.chmod(path_bin, os.stat(path_bin).st_mode | stat.S_IEXEC)
+    monkeypatch.setitem(
+        config, "binaries", dict(config["binaries"], pdftotext=path_bin)
+    )
+    monkeypatch.setitem(config, "cache_path", str(tmp_path / "cache"))
+    monkeypatch.setitem(config, "arxiv_url", server.url)
+    monkeypatch.setitem(config, "arxiv_delay", 0)
+    monkeypatch.setitem(config, "arxiv_batch_size", 1)
+
+    res = tmp_path / "res"
+    res.mkdir()
+    for name in ["arxiv.pdf", "unknown.pdf", "json.pdf", "clash.pdf", "plain.pdf"]:
+        _write(str(res / name), name)
+    _write(str(res / "json.json"), json.dumps(_bibtex))
+    _write(str(res / "clash.json"), json.dumps(_bibtex))
+    _write(str(res / "text.txt"), "")
+
+    files = sorted(str(path) for path in res.iterdir() if path.suffix != ".json")
+    results = run(files, workers=3)
+    assert len(server.queries) == 2
+
+    # The arXiv PDF is renamed with the BiBTeX from arXiv.
+    assert results[str(res / "arxiv.pdf")] == str(res / "Author, 2020, Paper One.pdf")
+    with open(str(res / "Author, 2020, Paper One.json")) as f:
+        assert json.load(f)[0]["eprint"] == "1234.56789"
+
+    # Exactly one of the two PDFs with the same BiBTeX is renamed.
+    renamed = str(res / "Author, 2019, Title.pdf")
+    clashes = [results[str(res / "json.pdf")], results[str(res / "clash.pdf")]]
+    assert renamed in clashes
+    assert any(isinstance(result, RuntimeError) for result in clashes)
+    assert os.path.isfile(renamed)
+
+    # Failures are isolated.
+    assert isinstance(results[str(res / "unknown.pdf")], RuntimeError)
+    assert isinstance(results[str(res / "text.txt")], ValueError)
+    assert results[str(res / "plain.pdf")] == str(res / "plain.pdf")
+
+    report(results)
+    out = capsys.readouterr().out
+    assert "Cleaned 6 file(s): 2 renamed, 1 unchanged, 3 failed." in out
+
+
+def test_run_resume(tmp_path, monkeypatch):
+    monkeypatch.setitem(config, "cache_path", str(tmp_path / "cache"))
+    res = tmp_path / "res"
+    res.mkdir()
+    _write(str(res / "a.pdf"), "a")
+
+    # Simulate a run which was interrupted after committing `a.pdf`.
+    journal = Journal(str(tmp_path / "cache" / "clean.journal"))
+    journal.move(
+        str(res / "a.pdf"),
+        str(res / "b.pdf"),
+        json.dumps(_bibtex),
+        None,
+        str(res / "b.json"),
+    )
+
+    assert run([str(res / "a.pdf")], resume=True) == {}
+    assert journal.records() == []
+    assert isinstance(run([str(res / "a.pdf")])[str(res / "a.pdf")], ValueError)
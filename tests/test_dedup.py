@@ -0,0 +1,173 @@
+import json
+
+import catalogue.bin
+from catalogue.bibtex import compact_entry, encode, expand_entry
+from catalogue.dedup import find_duplicates, merge_entries, normalised_key, preferred
+from deduplicate import load, merge, report
+
+_bibtex = """
+@article{preprint,
+    author = {M{\\"u}ller, Anna and Turner, Richard E.},
+    title = {Sparse {G}aussian Processes},
+    journal = {arXiv preprint arXiv:2001.00001},
+    eprint = {2001.00001},
+    year = 2020,
+}
+@inproceedings{published,
+    author = {Muller, Anna},
+    title = {Sparse Gaussian processes},
+    booktitle = {Advances in Neural Information Processing Systems},
+    doi = {10.1000/abc},
+    pages = {1--10},
+    year = 2021,
+}
+@article{retitled,
+    author = {M{\\"u}ller, A.},
+    title = {Sparse Gaussian processes: a review},
+    journal = {Journal of Machine Learning Research},
+    doi = {https://doi.org/10.1000/ABC},
+    year = 2022,
+}
+@article{similar,
+    author = {Other, Name},
+    title = {Sparse Gaussian processes},
+    journal = {Journal of Machine Learning Research},
+    year = 2020,
+}
+@article{arxivdoi,
+    author = {Other, Name},
+    title = {Kalman Filters},
+    doi = {10.48550/arXiv.2002.00002},
+    year = 2020,
+}
+@article{versioned,
+    author = {Someone, Else},
+    title = {Kalman Filtering},
+    eprint = {2002.00002},
+    year = 2020,
+}
+@article{first,
+    author = {Turner, Richard},
+    title = {Deep Learning with Kalman Filters for Spectral Domains},
+    year = 2020,
+}
+@article{Turner:2020:Deep_Learning_with_Kalman_Filters,
+    author = {Turner, Richard},
+    title = {Deep Learning with Kalman Filters for Hilbert Spaces},
+    year = 2020,
+}
+"""
+
+
+def _entries():
+    return encode(_bibtex, generate_ids=True)
+
+
+def test_normalised_key():
+    entries = _entries()
+    assert normalised_key(entries[0]) == "muller:sparse_gaussian_processes"
+    assert normalised_key(entries[1]) == normalised_key(entries[0])
+    assert normalised_key({"title": "No Author"}) is None
+
+
+def test_find_duplicates():
+    groups = find_duplicates(_entries())
+    # The published versions are found by key, title, and DOI, the arXiv DOI
+    # and the arXiv identifier are found by eprint, and the same title by a
+    # different author is not a duplicate. Different papers with the same
+    # generated ID are not duplicates either.
+    assert groups == [([0, 1, 2], ["doi", "key", "title"]), ([4, 5], ["eprint"])]
+
+
+def test_find_duplicates_title():
+    entries = [
+        {"id": "a", "title": "Sparse Gaussian Processes for Deep Learning"},
+        {"id": "b", "title": "Sparse Gaussian Processes for Deep Learning Models"},
+        {"id": "c", "title": "Sparse Gaussian Processes"},
+    ]
+    assert find_duplicates(entries) == [([0, 1], ["title"])]
+    assert find_duplicates(entries, threshold=0.5) == [([0, 1, 2], ["title"])]
+    entries[1]["id"] = "A"
+    assert find_duplicates(entries) == [([0, 1], ["id", "title"])]
+
+
+def test_find_duplicates_not_transitive():
+    entries = [
+        {"id": "a", "title": "one two three four five"},
+        {"id": "b", "title": "one two three four five six"},
+        {"id": "c", "title": "one two three four five six seven"},
+    ]
+    # The first and the second and the second and the third are similar, but
+    # the first and the third are not.
+    assert find_duplicates(entries) == [([0, 1], ["title"])]
+
+
+def test_find_duplicates_shared():
+    proceedings = {
+        "type": "proceedings",
+        "id": "icml2020",
+        "title": "Proceedings of the International Conference on Machine Learning",
+    }
+    entries = [
+        {"type": "inproceedings", "id": "a", "title": "A", "crossref": "icml2020"},
+        dict(proceedings),
+        {"type": "inproceedings", "id": "b", "title": "B", "crossref": "ICML2020"},
+        dict(proceedings),
+        dict(proceedings, id="other", booktitle="Other"),
+    ]
+    # Crossref targets and identical copies are shared deliberately.
+    assert find_duplicates(entries) == []
+    del entries[0]["crossref"], entries[2]["crossref"]
+    assert find_duplicates(entries) == []
+    # An entry which is not identical is still a duplicate.
+    entries[3] = dict(proceedings, year=2020)
+    assert find_duplicates(entries) == [([1, 3, 4], ["title"])]
+
+
+def test_merge_entries():
+    entries = _entries()[:3]
+    assert preferred(entries) == 1
+    merged = merge_entries(entries)
+    assert merged["booktitle"] == "Advances in Neural Information Processing Systems"
+    assert merged["eprint"] == "2001.00001"
+    assert merged["raw"]["eprint"] == "2001.00001"
+    assert merged["pages"] == entries[1]["pages"]
+    # The published version does not have a journal, so it is taken from the
+    # first other entry.
+    assert merged["journal"] == entries[0]["journal"]
+
+    # A compacted entry should stay compacted.
+    compacted = [entries[0], compact_entry(entries[1])]
+    merged_compacted = merge_entries(compacted)
+    assert "raw" not in merged_compacted
+    assert expand_entry(merged_compacted) == merge_entries(entries[:2])["raw"]
+
+
+def test_merge(tmp_path, monkeypatch, capsys):
+    entries = _entries()
+    paths = []
+    for i, group in enumerate([[0], [1, 3], [2]]):
+        paths.append(str(tmp_path / "{}.json".format(i)))
+        with open(paths[-1], "w") as f:
+            json.dump([entries[j] for j in group], f)
+        with open(paths[-1][:-5] + ".pdf", "w") as f:
+            f.write("")
+    files, locations = load(paths)
+    groups = find_duplicates([files[path][i] for path, i in locations])
+    assert groups == [([0, 1, 3], ["doi", "key", "title"])]
+
+    report(groups, files, locations)
+    out = capsys.readouterr().out
+    assert '* "Muller:2021:Sparse_Gaussian_Processes" in "{}"'.format(paths[1]) in out
+
+    trashed = []
+    monkeypatch.setattr(catalogue.bin, "trash", trashed.append)
+    assert merge(groups, files, locations, dry_run=True) == (1, 2)
+    assert trashed == []
+
+    assert merge(groups, files, locations) == (1, 2)
+    assert sorted(trashed) == sorted(
+        [paths[0], paths[0][:-5] + ".pdf", paths[2], paths[2][:-5] + ".pdf"]
+    )
+    with open(paths[1]) as f:
+        assert json.load(f) == [merge_entries(entries[:3]), entries[3]]
@@ -0,0 +1,59 @@
+import threading
+
+from catalogue.fuzzy import FuzzyMatcher, fuzzy_search
+
+items = [
+    "/res/Rasmussen, 2006, Gaussian Processes for Machine Learning.pdf",
+    "/res/Bruinsma, 2020, Scalable Exact Inference.pdf",
+    "/res/brain.pdf",
+    "/res/Other, 2019, Deep GPs.djvu",
+]
+
+
+def test_fuzzy_search():
+    # Matches at word boundaries rank higher and ties are broken by length.
+    assert fuzzy_search(items, "br") == [items[2], items[1]]
+    assert fuzzy_search(items, "gp") == [items[3], items[0]]
+
+    # Check smart case.
+    assert fuzzy_search(items, "GP") == [items[3], items[0]]
+    assert fuzzy_search(items, "Dee") == [items[3]]
+    assert fuzzy_search(items, "DEE") == []
+
+    # Check the extended search syntax.
+    assert fuzzy_search(items, "'proc") == [items[0]]
+    assert fuzzy_search(items, "pdf$ !2006") == [items[2], items[1]]
+    assert fuzzy_search(items, "^/res/b") == [items[2], items[1]]
+
+
+def test_fuzzymatcher_limit():
+    matcher = FuzzyMatcher(items)
+    assert matcher.search("res", limit=2) == matcher.search("res")[:2]
+
+
+def test_fuzzymatcher_extended_queries():
+    matcher = FuzzyMatcher(items)
+    for query in ["r", "re", "res", "res p", "res pdf", "res pdf !br", "res pdf !bru"]:
+        assert matcher.search(query) == fuzzy_search(items, query)
+
+
+def test_fuzzymatcher_threads():
+    # Threads which type different queries should not see each other's
+    # matches.
+    matcher = FuzzyMatcher(items * 50)
+    queries = [["b", "br", "bra"], ["g", "ga", "gau"], ["d", "de", "dee"]]
+    expected = {q: fuzzy_search(items * 50, q) for qs in queries for q in qs}
+    failures = []
+
+    def type_queries(qs):
+        for _ in range(200):
+            for q in qs:
+                if matcher.search(q) != expected[q]:
+                    failures.append(q)
+
+    threads = [threading.Thread(target=type_queries, args=(qs,)) for qs in queries]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert failures == []
@@ -0,0 +1,38 @@
+import importlib
+import json
+import os
+import subprocess
+import sys
+
+import catalogue
+
+_script = """
+import json
+import sys
+
+import catalogue
+import catalogue.alfred
+import catalogue.client
+import catalogue.fuzzy
+import catalogue.utils
+
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def test_exports():
+    for module, names in catalogue._exports.items():
+        module = importlib.import_module("catalogue." + module)
+        assert sorted(module.__all__) == sorted(names)
+        for name in names:
+            assert getattr(catalogue, name) is getattr(module, name)
+
+
+def test_lazy_import():
+    # The modules needed by `find.py` should not import heavy dependencies.
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    out = subprocess.check_output([sys.executable, "-c", _script], cwd=root)
+    modules = set(json.loads(out.decode()))
+    for heavy in ["feedparser", "plum", "titlecase"]:
+        assert heavy not in modules
+    assert "catalogue.bibtex" not in modules
@@ -0,0 +1,122 @@
+import json
+import os
+
+from import_bibtex import list_bibtex, report, run
+
+_bibtex = """
+@article{a, author = {Last, First}, title = {First Title}, year = 2020}
+@article{b, author = {Other, Name}, title = {Second Title}, year = 2021}
+@article{c, author = {Other, Name}, title = {Second Title}, year = 2021}
+@article{d, author = {No, Pdf}, title = {Third Title}, year = 2022}
+@article{e, author = {Has, Json}, title = {Fourth Title}, year = 2019}
+@misc{f, title = {No Author}}
+"""
+
+
+def _setup(tmp_path):
+    os.mkdir(str(tmp_path / "library"))
+    pdfs = [
+        str(tmp_path / "library" / "{}.pdf".format(name))
+        for name in [
+            "Last, 2020, First Title",
+            "Other, 2021, Second Title",
+            "Has, 2019, Fourth Title",
+        ]
+    ]
+    for path in pdfs:
+        with open(path, "w") as f:
+            f.write("")
+    with open(str(tmp_path / "library" / "Has, 2019, Fourth Title.json"), "w") as f:
+        f.write("[]")
+
+    os.mkdir(str(tmp_path / "bib"))
+    with open(str(tmp_path / "bib" / "library.bib"), "w") as f:
+        f.write(_bibtex)
+    return pdfs
+
+
+def test_list_bibtex(tmp_path):
+    _setup(tmp_path)
+    path = str(tmp_path / "bib" / "library.bib")
+    assert list_bibtex([str(tmp_path / "bib")]) == [path]
+    assert list_bibtex([path]) == [path]
+
+
+def test_run(tmp_path, capsys):
+    pdfs = _setup(tmp_path)
+    path_bib = str(tmp_path / "bib" / "library.bib")
+    results = run([path_bib], pdfs, threads=2, batch_size=1)
+
+    assert results["entries"] == 6
+    path_json = str(tmp_path / "library" / "Last, 2020, First Title.json")
+    assert results["written"] == [path_json]
+    with open(path_json) as f:
+        entries = json.load(f)
+    assert entries[0]["id"] == "Last:2020:First_Title"
+    assert entries[0]["author"] == ["First Last"]
+
+    # Entries which do not match exactly one PDF are not written.
+    assert results["existing"] == [
+        str(tmp_path / "library" / "Has, 2019, Fourth Title.json")
+    ]
+    assert [x["id"] for x in results["unmatched"]] == ["No:2022:Third_Title"]
+    assert [x["id"] for x in results["conflicts"][0]["entries"]] == [
+        "Other:2021:Second_Title",
+        "Other:2021:Second_Title",
+    ]
+    assert list(results["collisions"]) == ["Other:2021:Second_Title"]
+    assert len(results["failed"]) == 1
+    assert not os.path.exists(
+        str(tmp_path / "library" / "Other, 2021, Second Title.json")
+    )
+    # No temporary files should be left behind.
+    assert not [x for x in os.listdir(str(tmp_path / "library")) if x.startswith(".")]
+
+    report(results)
+    out = capsys.readouterr().out
+    assert "Imported 6 entries: 1 written" in out
+    assert 'ID "Other:2021:Second_Title" occurs 2 times' in out
+
+    # Rerunning should not overwrite the JSON.
+    results = run([path_bib], pdfs)
+    assert results["written"] == []
+    assert len(results["existing"]) == 2
+    assert len(run([path_bib], pdfs, overwrite=True)["written"]) == 2
+
+
+def test_run_dry_run(tmp_path):
+    pdfs = _setup(tmp_path)
+    results = run([str(tmp_path / "bib")], pdfs, dry_run=True)
+    assert len(results["written"]) == 1
+    assert not os.path.exists(results["written"][0])
+
+
+def test_run_errors_and_library(tmp_path):
+    pdfs = _setup(tmp_path)
+    # A file which cannot be read should not stop the import of other files.
+    with open(str(tmp_path / "bib" / "broken.bib"), "w") as f:
+        f.write("@article{g, title = undefined}\n")
+    path_library = str(tmp_path / "library" / "Has, 2019, Fourth Title.json")
+    with open(path_library, "w") as f:
+        json.dump([{"id": "last:2020:first_title", "title": "First Title"}], f)
+
+    results = run([str(tmp_path / "bib")], pdfs, library=[path_library], workers=2)
+    assert results["entries"] == 7
+    assert len(results["written"]) == 1
+    errors = [x["error"] for x in results["failed"]]
+    assert len(errors) == 2
+    assert any("broken.bib" in error and "undefined" in error for error in errors)
+
+    # Entries which collide with the library are reported.
+    assert results["collisions"]["last:2020:first_title"] == [
+        {"id": "last:2020:first_title", "file": path_library},
+        {
+            "id": "Last:2020:First_Title",
+            "file": str(tmp_path / "bib" / "library.bib"),
+        },
+    ]
+
+    # Entries in JSON which is overwritten do not collide.
+    results = run([str(tmp_path / "bib")], pdfs, library=[path_library], overwrite=True)
+    assert path_library in results["written"]
+    assert list(results["collisions"]) == ["Other:2021:Second_Title"]
@@ -0,0 +1,69 @@
+import os
+
+from catalogue.index import FileIndex
+
+
+def _touch(path):
+    with open(path, "w"):
+        pass
+
+
+def test_fileindex(tmp_path):
+    root = tmp_path / "res"
+    other = tmp_path / "other"
+    (root / "a").mkdir(parents=True)
+    other.mkdir()
+    _touch(str(root / "x.pdf"))
+    _touch(str(root / "a" / "y.json"))
+    _touch(str(other / "z.pdf"))
+    os.symlink(str(other), str(root / "a" / "link"))
+    os.symlink(str(root), str(root / "a" / "loop"))
+    path_index = str(tmp_path / "files.json")
+
+    index = FileIndex(str(root), path_index)
+    index.refresh()
+    index.save()
+    assert sorted(index.files(".pdf")) == [
+        str(root / "a" / "link" / "z.pdf"),
+        str(root / "x.pdf"),
+    ]
+    assert sorted(index.files([None])) == [
+        str(root),
+        str(root / "a"),
+        str(root / "a" / "link"),
+    ]
+    assert index.roots() == [os.path.realpath(str(root)), os.path.realpath(str(other))]
+
+    # Check that the index is loaded from disk and refreshed incrementally.
+    _touch(str(root / "a" / "new.pdf"))
+    index = FileIndex(str(root), path_index)
+    assert str(root / "a" / "new.pdf") not in index.files(".pdf")
+    index.refresh()
+    assert str(root / "a" / "new.pdf") in index.files(".pdf")
+    assert index.info(str(root / "a" / "new.pdf"))[1] is None
+
+
+def test_fileindex_mtime_resolution(tmp_path):
+    root = tmp_path / "res"
+    root.mkdir()
+    path_index = str(tmp_path / "files.json")
+    index = FileIndex(str(root), path_index)
+    index.refresh()
+
+    # Simulate a change within the same tick as the listing: the modification
+    # time of the directory does not change.
+    mtime_ns = os.stat(str(root)).st_mtime_ns
+    _touch(str(root / "x.pdf"))
+    os.utime(str(root), ns=(mtime_ns, mtime_ns))
+    index.refresh()
+    assert index.files(".pdf") == [str(root / "x.pdf")]
+
+    # A directory which was modified well before it was listed is not listed
+    # again.
+    old_ns = mtime_ns - 3600 * 10**9
+    os.utime(str(root), ns=(old_ns, old_ns))
+    index.refresh()
+    _touch(str(root / "y.pdf"))
+    os.utime(str(root), ns=(old_ns, old_ns))
+    index.refresh()
+    assert index.files(".pdf") == [str(root / "x.pdf")]
@@ -0,0 +1,139 @@
+import os
+
+import pytest
+
+import catalogue.utils
+from catalogue.journal import Journal
+
+
+def _write(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def _setup(tmp_path):
+    _write(str(tmp_path / "a.pdf"), "pdf")
+    _write(str(tmp_path / "a.json"), "old")
+    journal = Journal(str(tmp_path / "cache" / "journal"))
+    args = (
+        str(tmp_path / "a.pdf"),
+        str(tmp_path / "b.pdf"),
+        "new",
+        str(tmp_path / "a.json"),
+        str(tmp_path / "b.json"),
+    )
+    return journal, args
+
+
+def test_move(tmp_path):
+    journal, args = _setup(tmp_path)
+    journal.move(*args)
+    assert sorted(os.listdir(str(tmp_path))) == ["b.json", "b.pdf", "cache"]
+    assert _read(str(tmp_path / "b.json")) == "new"
+    assert journal.pending() == []
+    assert journal.completed() == {str(tmp_path / "a.pdf")}
+
+    journal.clear()
+    assert journal.records() == []
+
+
+def test_recover(tmp_path, monkeypatch):
+    journal, args = _setup(tmp_path)
+
+    # Crash after the new JSON is written, but before the PDF is moved.
+    def crash(*args):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as m:
+        m.setattr(os, "rename", crash)
+        with pytest.raises(KeyboardInterrupt):
+            journal.move(*args)
+    assert len(journal.pending()) == 1
+    assert journal.completed() == set()
+
+    # A partially written record is skipped.
+    with open(journal.path, "a") as f:
+        f.write('{"done": ')
+
+    assert journal.recover() == (1, 0)
+    assert sorted(os.listdir(str(tmp_path))) == ["b.json", "b.pdf", "cache"]
+    assert journal.pending() == []
+    assert journal.completed() == {str(tmp_path / "a.pdf")}
+
+
+def test_roll_back(tmp_path, monkeypatch):
+    journal, args = _setup(tmp_path)
+
+    # Crash after the move is recorded, but before the new JSON is in place,
+    # losing the temporary file.
+    def crash(src, dst):
+        os.unlink(src)
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as m:
+        m.setattr(os, "replace", crash)
+        with pytest.raises(KeyboardInterrupt):
+            journal.move(*args)
+
+    assert journal.recover() == (0, 1)
+    assert sorted(os.listdir(str(tmp_path))) == ["a.json", "a.pdf", "cache"]
+    assert _read(str(tmp_path / "a.json")) == "old"
+    assert journal.pending() == []
+    assert journal.completed() == set()
+
+
+def test_sweep(tmp_path, monkeypatch):
+    journal, args = _setup(tmp_path)
+    journal.move(*args)
+
+    # Crash after the new JSON is written to a temporary file, but before the
+    # move is recorded.
+    def crash(*args, **kw_args):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as m:
+        m.setattr(journal, "_append", crash)
+        with pytest.raises(KeyboardInterrupt):
+            journal.move(
+                str(tmp_path / "b.pdf"),
+                str(tmp_path / "c.pdf"),
+                "newer",
+                str(tmp_path / "b.json"),
+                str(tmp_path / "c.json"),
+            )
+    assert len(os.listdir(str(tmp_path))) == 4
+
+    # Other temporary files are kept.
+    _write(str(tmp_path / ".tmp-other"), "")
+    assert journal.recover() == (0, 0)
+    assert sorted(os.listdir(str(tmp_path))) == [
+        ".tmp-other",
+        "b.json",
+        "b.pdf",
+        "cache",
+    ]
+
+
+def test_sync(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(catalogue.utils, "sync_directory", synced.append)
+    journal, args = _setup(tmp_path)
+    journal.move(*args)
+    # The directory is synced after the JSON is replaced and after the PDF is
+    # moved.
+    assert synced == [str(tmp_path), str(tmp_path)]
+
+
+def test_lock(tmp_path):
+    journal, _ = _setup(tmp_path)
+    with journal.lock():
+        with pytest.raises(RuntimeError, match="used by another process"):
+            with Journal(journal.path).lock():
+                pass
+    with Journal(journal.path).lock():
+        pass
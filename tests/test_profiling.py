@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from catalogue.bibtex import decode_entry, encode
+from catalogue.profiling import profile, section
+
+
+def test_profile():
+    raw = {"type": "article", "title": "A title", "pages": "not pages", "year": "2020"}
+    with profile() as prof:
+        entry = encode([raw])[0]
+        entry["id"] = "key"
+        decode_entry(entry)
+        with section("section"):
+            pass
+    stats = prof.stats()
+
+    # Check the fields.
+    assert stats["field"]["encode title"]["calls"] == 1
+    assert stats["field"]["decode title"]["calls"] == 1
+    assert stats["field"]["encode pages"]["errors"] == 1
+    assert stats["field"]["encode pages"]["skips"] == 1
+    assert "Could not parse pages" in stats["field"]["encode pages"]["examples"][0]
+
+    # Check the encoders which make up the composed title encoder.
+    assert stats["encoder"]["encode TitleEncoder"]["calls"] == 1
+    assert stats["encoder"]["encode StringEncoder"]["calls"] == 1
+    assert "encode ComposedEncoder" not in stats["encoder"]
+
+    assert stats["section"]["section"]["calls"] == 1
+    assert "decode title" in prof.report()
+
+    # Nothing should be recorded when the profile is not active.
+    decode_entry(entry)
+    assert prof.stats()["field"]["decode title"]["calls"] == 1
+
+
+def test_profile_errors(tmp_path):
+    entry = {"type": "article", "id": "key", "pages": [1, 2, 3]}
+    with profile() as prof:
+        with pytest.raises(RuntimeError):
+            decode_entry(entry)
+    assert prof.stats()["field"]["decode pages"]["errors"] == 1
+
+    path = str(tmp_path / "profile.json")
+    prof.write(path)
+    with open(path) as f:
+        assert json.load(f)["encoder"]["decode PagesEncoder"]["errors"] == 1
@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+from catalogue.reader import read_bibtex
+
+
+def _read(text, chunk_size=1 << 16):
+    return list(read_bibtex(io.StringIO(text), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_read_bibtex(chunk_size):
+    text = (
+        "﻿% A comment.\n"
+        '@string{Foo = "x"}\n'
+        "@article{key1,\n"
+        '    title = FOO # " y" # {z},\n'
+        "    month = jan,\n"
+        "    Link = {u},\n"
+        "    Link = {v},\n"
+        "    year = 2020,\n"
+        "}\n"
+        "@comment{@misc{ignored, title = {a}}}\n"
+        '@Misc(key2, author = {First\n      Last}, note = {(a)} # "b)")\n'
+    )
+    assert _read(text, chunk_size) == [
+        {
+            "year": "2020",
+            "url": "u",
+            "month": "January",
+            "title": "x yz",
+            "id": "key1",
+            "type": "article",
+        },
+        {"note": "(a)b)", "author": "First\nLast", "id": "key2", "type": "misc"},
+    ]
+
+
+def test_read_bibtex_path(tmp_path):
+    path = str(tmp_path / "library.bib")
+    with open(path, "w") as f:
+        f.write("@misc{key, title = {Title}}\n")
+    assert list(read_bibtex(path)) == [{"title": "Title", "id": "key", "type": "misc"}]
+
+
+def test_read_bibtex_skip():
+    text = (
+        "@misc{key 1, title = {a}}\n"
+        "@misc{key2, year = 2020a}\n"
+        "@weird{key3, title = {b}}\n"
+        "junk @misc{key4, title = {c}}\n"
+        "@misc{key5, title = {d}, type = {Note}}"
+    )
+    with pytest.warns(UserWarning) as record:
+        entries = _read(text)
+    assert entries == [{"title": "d", "id": "key5", "type": "misc"}]
+    messages = [str(w.message) for w in record]
+    assert any("line 1" in m for m in messages)
+    assert any("line 2" in m for m in messages)
+    assert any('"weird" on line 3' in m for m in messages)
+
+
+def test_read_bibtex_undefined_string():
+    with pytest.raises(RuntimeError, match='Undefined string "und" \\(line 2\\)'):
+        _read("\n@misc{key, title = und}")
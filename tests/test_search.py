@@ -0,0 +1,79 @@
+import os
+import zipfile
+
+from catalogue.search import ContentIndex, tokenise
+from catalogue.text import extract_text
+from catalogue.utils import search_content
+from config import config
+
+
+def _epub(path, text):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("mimetype", "application/epub+zip")
+        archive.writestr(
+            "chapter.xhtml", "<html><body><p>" + text + "</p></body></html>"
+        )
+
+
+def test_tokenise():
+    assert tokenise("Gaussian Processes, Schrödinger & e_x") == [
+        "gaussian",
+        "processes",
+        "schrodinger",
+        "e",
+        "x",
+    ]
+
+
+def test_extract_text(tmp_path):
+    _epub(str(tmp_path / "a.epub"), "Kernel &amp; methods")
+    assert "Kernel & methods" in extract_text(str(tmp_path / "a.epub"))
+    assert extract_text(str(tmp_path / "missing.epub")) == ""
+
+
+def test_contentindex(tmp_path):
+    root = tmp_path / "res"
+    root.mkdir()
+    _epub(str(root / "a.epub"), "gaussian processes for machine learning")
+    _epub(str(root / "b.epub"), "gaussian gaussian gaussian processes")
+    _epub(str(root / "c.epub"), "deep learning")
+    os.symlink(str(root / "c.epub"), str(root / "d.epub"))
+    paths = sorted(str(p) for p in root.iterdir())
+    path_index = str(tmp_path / "content.sqlite")
+
+    with ContentIndex(path_index) as index:
+        # Files reached through a symbolic link are only extracted once.
+        assert index.update(paths) == 3
+        assert index.search("Gaussian processes") == [
+            str(root / "b.epub"),
+            str(root / "a.epub"),
+        ]
+        # Shorter files rank higher. Ties are broken by path.
+        assert index.search("learning", limit=1) == [str(root / "c.epub")]
+        assert index.search("gaussian deep") == []
+        assert index.search("") == []
+
+    # Check that the index is updated incrementally.
+    _epub(str(root / "c.epub"), "deep gaussian processes")
+    os.remove(str(root / "a.epub"))
+    paths.remove(str(root / "a.epub"))
+    with ContentIndex(path_index) as index:
+        assert index.update(paths) == 1
+        assert sorted(index.search("deep gaussian")) == [
+            str(root / "c.epub"),
+            str(root / "d.epub"),
+        ]
+        assert index.search("machine") == []
+
+
+def test_search_content(tmp_path, monkeypatch):
+    (tmp_path / "res").mkdir()
+    _epub(str(tmp_path / "res" / "a.epub"), "variational inference")
+    monkeypatch.setitem(config, "resource_path", str(tmp_path / "res"))
+    monkeypatch.setitem(config, "cache_path", str(tmp_path / "cache"))
+    monkeypatch.setitem(config, "content_backend", "index")
+
+    with ContentIndex(str(tmp_path / "cache" / "content.sqlite")) as index:
+        index.update([str(tmp_path / "res" / "a.epub")])
+    assert search_content("inference", [".epub"]) == [str(tmp_path / "res" / "a.epub")]
+    assert search_content("inference", [".pdf"]) == []
@@ -0,0 +1,49 @@
+import json
+import os
+import socket
+import threading
+import time
+
+from catalogue.client import query_server
+from catalogue.server import serve
+from config import config
+
+
+def test_server(tmp_path, monkeypatch):
+    (tmp_path / "res").mkdir()
+    for name in ["Bruinsma, 2020, Title.pdf", "Other, 2019, Title.pdf", "x.json"]:
+        with open(str(tmp_path / "res" / name), "w"):
+            pass
+    monkeypatch.setitem(config, "resource_path", str(tmp_path / "res"))
+    monkeypatch.setitem(config, "cache_path", str(tmp_path / "cache"))
+    monkeypatch.setitem(config, "base_path", str(tmp_path))
+    path = str(tmp_path / "server.sock")
+
+    # Without a server, the client should return `None`.
+    assert query_server(path, {"query": "bru"}) is None
+
+    threading.Thread(target=serve, args=(path,), daemon=True).start()
+    for _ in range(100):
+        if os.path.exists(path):
+            break
+        time.sleep(0.05)
+
+    items = json.loads(query_server(path, {"query": "bru"}))["items"]
+    assert [item["title"] for item in items] == ["Bruinsma, 2020, Title.pdf"]
+    items = json.loads(query_server(path, {"query": "x", "json": True}))["items"]
+    assert [item["subtitle"] for item in items] == ["/res/x.json"]
+
+
+def test_client_hung_server(tmp_path):
+    # A server which accepts connections but never answers.
+    path = str(tmp_path / "hung.sock")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    sock.listen(1)
+    try:
+        assert query_server(path, {"query": "bru"}, timeout=0.1) is None
+    finally:
+        sock.close()
+
+    # A socket which is left behind by a server which is gone.
+    assert query_server(path, {"query": "bru"}) is None
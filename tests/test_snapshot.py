@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from catalogue.bibtex import decode_entry
+from catalogue.cache import DecodeCache
+from catalogue.snapshot import Snapshot, sync_snapshot
+
+
+def _entry(entry_id, title):
+    return {"type": "article", "id": entry_id, "title": title, "year": 2020}
+
+
+def _write(path, entries):
+    with open(path, "w") as f:
+        json.dump(entries, f)
+
+
+@pytest.fixture()
+def library(tmp_path):
+    paths = []
+    for i in range(3):
+        path = str(tmp_path / "paper{}.json".format(i))
+        _write(path, [_entry("a{}".format(i), "Title {}".format(i))])
+        paths.append(path)
+    # A file with more than one entry.
+    _write(paths[2], [_entry("a2", "Title 2"), _entry("b2", "Other Title")])
+    return paths
+
+
+def test_snapshot(tmp_path, library):
+    path = str(tmp_path / "library.snapshot")
+    assert sync_snapshot(path, library) == 3
+
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == 4
+        assert set(snapshot.files) == set(library)
+        assert snapshot.header(3) == ("b2", "article")
+        assert list(snapshot.entries(library[2])) == [
+            _entry("a2", "Title 2"),
+            _entry("b2", "Other Title"),
+        ]
+        assert list(snapshot.entries())[0] == _entry("a0", "Title 0")
+        assert json.loads(snapshot.content(library[1]).decode()) == [
+            _entry("a1", "Title 1")
+        ]
+
+
+def test_snapshot_sync(tmp_path, library):
+    path = str(tmp_path / "library.snapshot")
+    sync_snapshot(path, library)
+
+    # Nothing changed, so no file should be read.
+    assert sync_snapshot(path, library) == 0
+
+    # Only the changed file should be read.
+    _write(library[0], [_entry("c0", "A Much Longer New Title")])
+    assert sync_snapshot(path, library) == 1
+    with Snapshot(path) as snapshot:
+        assert list(snapshot.entries(library[0])) == [
+            _entry("c0", "A Much Longer New Title")
+        ]
+        assert list(snapshot.entries(library[2]))[1] == _entry("b2", "Other Title")
+
+    # Files which are not listed should be removed.
+    assert sync_snapshot(path, library[1:]) == 0
+    with Snapshot(path) as snapshot:
+        assert set(snapshot.files) == set(library[1:])
+        assert len(snapshot) == 3
+
+
+def test_snapshot_invalid(tmp_path, library):
+    path = str(tmp_path / "library.snapshot")
+    with open(path, "wb") as f:
+        f.write(b"not a snapshot")
+    with pytest.raises(ValueError):
+        Snapshot(path)
+
+    # An invalid snapshot should be rebuilt.
+    assert sync_snapshot(path, library) == 3
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == 4
+
+
+def test_decodecache_snapshot(tmp_path, library):
+    path = str(tmp_path / "library.snapshot")
+    sync_snapshot(path, library)
+
+    from_disk = DecodeCache(str(tmp_path / "disk.json"))
+    from_disk.update(library)
+    from_snapshot = DecodeCache(str(tmp_path / "snapshot.json"))
+    with Snapshot(path) as snapshot:
+        from_snapshot.update(library, snapshot=snapshot)
+
+    for path_json in library:
+        assert from_snapshot.blocks(path_json) == from_disk.blocks(path_json)
+    assert from_snapshot.blocks(library[2])[1] == (
+        "article",
+        "b2",
+        decode_entry(_entry("b2", "Other Title")),
+    )
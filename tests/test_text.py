@@ -0,0 +1,116 @@
+import os
+import stat
+
+import pytest
+
+from catalogue.bibtex import is_arxiv
+from catalogue.text import TextStore
+from config import config
+
+_pdftotext = """#!/bin/sh
+echo run >> "{log}"
+printf 'Title\\narXiv:1234.56789v2 [stat.ML] 1 Jan 2020\\n\\fPage two\\n'
+"""
+
+
+def _fake_pdftotext(tmp_path, monkeypatch):
+    path = str(tmp_path / "pdftotext")
+    log = str(tmp_path / "log")
+    with open(path, "w") as f:
+        f.write(_pdftotext.format(log=log))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    monkeypatch.setitem(config, "binaries", dict(config["binaries"], pdftotext=path))
+
+    def runs():
+        if not os.path.isfile(log):
+            return 0
+        with open(log) as f:
+            return len(f.readlines())
+
+    return runs
+
+
+def test_textstore(tmp_path, monkeypatch):
+    runs = _fake_pdftotext(tmp_path, monkeypatch)
+    path = str(tmp_path / "a.pdf")
+    with open(path, "w") as f:
+        f.write("%PDF")
+    store = TextStore(str(tmp_path / "text"))
+
+    assert store.first_page(path).splitlines() == [
+        "Title",
+        "arXiv:1234.56789v2 [stat.ML] 1 Jan 2020",
+    ]
+    assert store.text(path).endswith("Page two\n")
+    assert runs() == 1
+
+    # Renaming the file keeps the text.
+    os.rename(path, str(tmp_path / "b.pdf"))
+    path = str(tmp_path / "b.pdf")
+    store.text(path)
+    assert runs() == 1
+
+    # Changing the file extracts the text again.
+    with open(path, "w") as f:
+        f.write("%PDF changed")
+    store.text(path)
+    assert runs() == 2
+
+    # Pruning removes the text of the file before it changed.
+    assert store.prune([path]) == 1
+    assert store.prune([path]) == 0
+    store.text(path)
+    assert runs() == 2
+    assert store.prune([]) == 1
+    store.text(path)
+    assert runs() == 3
+
+    store.clear()
+    store.text(path)
+    assert runs() == 4
+    assert store.text(str(tmp_path / "missing.pdf")) == ""
+
+
+def test_textstore_failure(tmp_path, monkeypatch):
+    runs = _fake_pdftotext(tmp_path, monkeypatch)
+    with open(config["binaries"]["pdftotext"], "a") as f:
+        f.write("exit 1\n")
+    path = str(tmp_path / "a.pdf")
+    with open(path, "w") as f:
+        f.write("%PDF")
+    store = TextStore(str(tmp_path / "text"))
+
+    # The text of a failed extraction is not stored.
+    assert store.text(path) == ""
+    assert store.text(path) == ""
+    assert runs() == 2
+
+
+def test_is_arxiv(tmp_path, monkeypatch):
+    runs = _fake_pdftotext(tmp_path, monkeypatch)
+    monkeypatch.setitem(config, "cache_path", str(tmp_path / "cache"))
+    path = str(tmp_path / "a.pdf")
+    with open(path, "w") as f:
+        f.write("%PDF")
+
+    assert is_arxiv(path) == ("", "1234.56789")
+    assert is_arxiv(path) == ("", "1234.56789")
+    assert runs() == 1
+
+
+def test_textstore_missing_converter(tmp_path, monkeypatch):
+    path_bin = str(tmp_path / "missing" / "pdftotext")
+    monkeypatch.setitem(
+        config, "binaries", dict(config["binaries"], pdftotext=path_bin)
+    )
+    store = TextStore(str(tmp_path / "text"))
+    paths = []
+    for name in ["a.pdf", "b.pdf"]:
+        paths.append(str(tmp_path / name))
+        with open(paths[-1], "w") as f:
+            f.write("%PDF")
+
+    # A missing converter should be reported once.
+    with pytest.warns(UserWarning, match="Could not run") as record:
+        assert [store.text(path) for path in paths] == ["", ""]
+    assert len(record) == 1
@@ -0,0 +1,14 @@
+import pytest
+
+from update_bibliography import assemble
+
+
+def test_assemble():
+    blocks = [
+        ("proc.json", "proceedings", "proc", "proc\n"),
+        ("a.json", "inproceedings", "a", "a\n"),
+        ("b.json", "article", "A", "b\n"),
+    ]
+    # Proceedings should be moved to the end and duplicates should be dropped.
+    with pytest.warns(UserWarning, match='Duplicate ID "A": "b.json" collides'):
+        assert list(assemble(blocks)) == ["a\n", "proc\n"]
@@ -3,28 +3,116 @@
 from __future__ import absolute_import, division, print_function
 
 import argparse
-import json
 import os
+import warnings
 
 import catalogue.utils
 from config import config
-from catalogue.bibtex import decode
+from catalogue.cache import DecodeCache
+from catalogue.profiling import profile, section
+from catalogue.snapshot import Snapshot
 
 
-def main(args):
-    entries = []
-    for entry in catalogue.utils.list_files([".json"]):
-        with open(entry) as f:
-            entries.extend(json.load(f))
+def assemble(blocks):
+    """Assemble decoded entries into BiBTeX.
+
+    Args:
+        blocks (list[tuple[str, str, str, str]]): For every entry, a tuple
+            containing the path of the file, the type, the ID, and the decoded
+            BiBTeX.
+
+    Returns:
+        generator[str]: BiBTeX string for every entry.
+    """
+    # Move crossreferences to end.
+    blocks = [block for block in blocks if block[1].lower() != "proceedings"] + [
+        block for block in blocks if block[1].lower() == "proceedings"
+    ]
+
+    # Concatenate, minding duplicate entries.
+    processed_ids = {}
+    for path, _, entry_id, text in blocks:
+        if entry_id.lower() in processed_ids:
+            warnings.warn(
+                'Duplicate ID "{}": "{}" collides with "{}" and is dropped.'
+                "".format(entry_id, path, processed_ids[entry_id.lower()])
+            )
+            continue
+        else:
+            processed_ids[entry_id.lower()] = path
+        yield text
+
 
+def update(args, workers):
     output_dir = os.path.join(config["catalogue_path"], "output")
     if not os.path.isdir(output_dir):
         os.mkdir(output_dir)
 
-    with open(os.path.join(output_dir, "bibliography.bib"), "w") as f:
-        f.write(decode(entries))
+    # Only decode files which are new or have changed, unless a full rebuild is
+    # requested.
+    cache = DecodeCache(os.path.join(config["cache_path"], "bibliography.json"))
+    if args.full:
+        cache.clear()
+    if args.snapshot:
+        path = os.path.join(config["cache_path"], "library.snapshot")
+        with Snapshot(path) as snapshot:
+            paths = list(snapshot.files)
+            with section("decode"):
+                cache.update(paths, workers=workers, snapshot=snapshot)
+    else:
+        with section("list files"):
+            paths = list(catalogue.utils.list_files([".json"]))
+        with section("decode"):
+            cache.update(paths, workers=workers)
+    with section("save cache"):
+        cache.save()
+    blocks = [(path,) + block for path in paths for block in cache.blocks(path)]
+
+    with section("write bibliography"):
+        with open(os.path.join(output_dir, "bibliography.bib"), "w") as f:
+            for text in assemble(blocks):
+                f.write(text)
+
+
+def main(args):
+    if args.profile is None:
+        update(args, args.workers)
+    else:
+        with profile() as prof:
+            try:
+                # Decode in this process, so the encoders are profiled.
+                update(args, 1)
+            finally:
+                prof.write(args.profile)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(prog="update_bibliography.py")
+    parser.add_argument(
+        "--full",
+        help="decode all files instead of only new or changed files",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--snapshot",
+        help="read the library from the snapshot written by sync_snapshot.py",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--workers",
+        help="number of processes to decode with",
+        type=int,
+        action="store",
+        default=1,
+    )
+    parser.add_argument(
+        "--profile",
+        help="print a profile of the encoders to stderr, or write it as JSON to "
+        "the given file; decodes in one process",
+        nargs="?",
+        const="-",
+        default=None,
+    )
     main(parser.parse_args())